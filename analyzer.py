@@ -12,40 +12,67 @@ import re
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 from urllib.parse import urlparse
 
 import requests
-from anthropic import Anthropic
-from bs4 import BeautifulSoup
 from io import BytesIO
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+from llm_cache import LLMResponseCache
+from llm_gateway import INTERACTIVE, LLMGateway, get_llm_gateway
+from page_snapshot import get_snapshot
+from http_client import get_http_client
+
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageTemplate, Frame
 from reportlab.lib import colors
 
-try:
-    from playwright.sync_api import sync_playwright
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
+from browser_pool import get_default_pool, BrowserPoolBusy, PLAYWRIGHT_AVAILABLE
+
+
+# Summary text returned when the Claude call fails
+SUMMARY_ERROR_PREFIX = "Error generating summary: "
 
 
 class WebsiteAnalyzer:
     """Analyzes websites to extract content and generate intelligent summaries."""
 
-    def __init__(self, timeout: int = 10, api_key: Optional[str] = None):
+    # Page settings for HTML/CSS (Playwright) PDF reports
+    PLAYWRIGHT_VIEWPORT = {'width': 1024, 'height': 1280}
+    PLAYWRIGHT_PDF_OPTIONS = {
+        'format': 'A4',
+        'margin': {
+            'top': '0.5in',
+            'right': '0.5in',
+            'bottom': '0.5in',
+            'left': '0.5in'
+        },
+        'print_background': True
+    }
+
+    def __init__(
+        self,
+        timeout: int = 10,
+        api_key: Optional[str] = None,
+        cache: Optional[LLMResponseCache] = None,
+        gateway: Optional[LLMGateway] = None,
+        priority: int = INTERACTIVE
+    ):
         """
         Initialize the analyzer.
 
         Args:
             timeout: Request timeout in seconds
             api_key: Anthropic API key (defaults to ANTHROPIC_API_KEY env var)
+            cache: Optional LLM response cache; None disables caching
+            gateway: LLM gateway Claude calls are scheduled on (defaults to the shared one)
+            priority: Gateway priority class (INTERACTIVE or BATCH)
         """
         self.timeout = timeout
+        self.cache = cache
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
@@ -58,7 +85,8 @@ class WebsiteAnalyzer:
                 "or pass api_key parameter."
             )
 
-        self.client = Anthropic(api_key=self.api_key)
+        self.gateway = gateway or get_llm_gateway()
+        self.priority = priority
 
         # Setup Jinja2 template environment
         templates_dir = Path(__file__).parent / 'templates'
@@ -70,23 +98,26 @@ class WebsiteAnalyzer:
         else:
             self.jinja_env = None
 
-    def analyze(self, url: str) -> Dict:
+    def analyze(self, url: str, reuse: Optional[Callable[[str, str], Optional[Dict]]] = None) -> Dict:
         """
         Analyze a website and generate an intelligent summary.
 
         Args:
             url: The website URL to analyze
+            reuse: Optional callable(url, content_fingerprint) returning an
+                earlier result for the same page content; when it returns
+                one, its summary is reused instead of calling Claude
 
         Returns:
-            Dictionary containing title, meta_description, extracted_content, and summary
+            Dictionary containing title, meta_description, extracted_content,
+            summary, content_fingerprint and whether the summary was reused
         """
         # Ensure URL has a scheme
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
 
         try:
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
-            response.raise_for_status()
+            snapshot = get_snapshot(url, timeout=self.timeout, headers=self.headers)
         except requests.RequestException as e:
             return {
                 'url': url,
@@ -97,87 +128,34 @@ class WebsiteAnalyzer:
                 'success': False
             }
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Extract metadata
-        title = self._extract_title(soup)
-        meta_description = self._extract_meta_description(soup)
+        # Metadata and page content are parsed once by the snapshot
+        content = snapshot.text
 
-        # Extract full page content
-        content = self._extract_full_content(soup)
+        # Unchanged content: the earlier summary still applies
+        previous = reuse(url, snapshot.fingerprint) if reuse else None
+        if previous:
+            summary = previous['summary']
+        else:
+            # Generate intelligent summary using Claude
+            summary = self._generate_summary_with_claude(snapshot.title, snapshot.meta_description, content)
 
-        # Generate intelligent summary using Claude
-        summary = self._generate_summary_with_claude(title, meta_description, content)
+        # A failed Claude call is not a result (and must not be reused later)
+        summary_failed = summary.startswith(SUMMARY_ERROR_PREFIX)
 
         return {
             'url': url,
-            'title': title,
-            'meta_description': meta_description,
+            'title': snapshot.title,
+            'meta_description': snapshot.meta_description,
             'extracted_content': content[:500] if content else None,  # First 500 chars for reference
             'summary': summary,
-            'success': True
+            'success': not summary_failed,
+            'truncated': snapshot.truncated,  # Page exceeded the fetch size limit
+            'page_cache_status': snapshot.cache_status,  # fetched, revalidated (304) or memory
+            'content_fingerprint': snapshot.fingerprint,
+            'reused': bool(previous),
+            'reused_from': previous.get('id') if previous else None  # History id of the reused result
         }
 
-    def _extract_title(self, soup: BeautifulSoup) -> Optional[str]:
-        """Extract the page title."""
-        # Try <title> tag first
-        if soup.title and soup.title.string:
-            return soup.title.string.strip()
-
-        # Try og:title meta tag
-        og_title = soup.find('meta', property='og:title')
-        if og_title and og_title.get('content'):
-            return og_title.get('content').strip()
-
-        # Try H1 as fallback
-        h1 = soup.find('h1')
-        if h1 and h1.get_text():
-            return h1.get_text().strip()
-
-        return None
-
-    def _extract_meta_description(self, soup: BeautifulSoup) -> Optional[str]:
-        """Extract the meta description."""
-        # Try meta name="description"
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc and meta_desc.get('content'):
-            return meta_desc.get('content').strip()
-
-        # Try og:description
-        og_desc = soup.find('meta', property='og:description')
-        if og_desc and og_desc.get('content'):
-            return og_desc.get('content').strip()
-
-        return None
-
-    def _extract_full_content(self, soup: BeautifulSoup) -> str:
-        """
-        Extract meaningful content from the page.
-        Removes scripts, styles, and navigation elements.
-        """
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-
-        # Remove common non-content elements
-        for nav in soup(["nav", "footer", "aside"]):
-            nav.decompose()
-
-        # Get text from main content areas
-        main_content = soup.find('main') or soup.find('article') or soup.find('div', class_=['content', 'main', 'body'])
-
-        if main_content:
-            text = main_content.get_text(separator=' ', strip=True)
-        else:
-            text = soup.get_text(separator=' ', strip=True)
-
-        # Clean up whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-
-        return text[:5000]  # Limit to 5000 chars for API
-
     def _generate_summary_with_claude(
         self,
         title: Optional[str],
@@ -202,26 +180,38 @@ class WebsiteAnalyzer:
 
         context = "\n\n".join(context_parts)
 
-        # Call Claude to generate summary
-        try:
-            message = self.client.messages.create(
-                model="claude-sonnet-4-5",
-                max_tokens=500,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": f"""Based on the following website content, provide a concise summary of what this website is about.
+        request = {
+            "model": "claude-sonnet-4-5",
+            "max_tokens": 500,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": f"""Based on the following website content, provide a concise summary of what this website is about.
 Focus on the main purpose, key features, and target audience. Keep it to 2-3 sentences.
 
 {context}
 
 Summary:"""
-                    }
-                ]
-            )
-            return message.content[0].text.strip()
+                }
+            ]
+        }
+
+        # Serve identical prompts from the response cache
+        cache_key = self.cache.make_key(request) if self.cache else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        # Call Claude to generate summary
+        try:
+            message = self.gateway.create(priority=self.priority, api_key=self.api_key, **request)
+            summary = message.content[0].text.strip()
+            if cache_key:
+                self.cache.set(cache_key, request["model"], summary)
+            return summary
         except Exception as e:
-            return f"Error generating summary: {str(e)}"
+            return f"{SUMMARY_ERROR_PREFIX}{str(e)}"
 
     def generate_pdf(
         self,
@@ -322,7 +312,7 @@ Summary:"""
                 websler_logo = Image(str(websler_path), width=1.0 * inch, height=0.5 * inch, kind='proportional')
             elif logo_path:
                 if logo_path.startswith(('http://', 'https://')):
-                    response = requests.get(logo_path, timeout=self.timeout)
+                    response = get_http_client().get(logo_path, timeout=self.timeout)
                     websler_logo = Image(BytesIO(response.content), width=1.0 * inch, height=0.5 * inch, kind='proportional')
                 else:
                     websler_logo = Image(logo_path, width=1.0 * inch, height=0.5 * inch, kind='proportional')
@@ -463,12 +453,6 @@ Summary:"""
         Returns:
             Path to the generated PDF file
         """
-        if not PLAYWRIGHT_AVAILABLE:
-            raise Exception("Playwright not installed. Install with: pip install playwright")
-
-        if self.jinja_env is None:
-            raise Exception("Template directory not found. Cannot generate HTML-based PDF.")
-
         # Generate filename from URL if not provided
         if not output_path:
             url = result['url']
@@ -481,6 +465,89 @@ Summary:"""
             else:
                 output_path = f"{domain}-summary-report.pdf"
 
+        pdf_bytes = self.generate_pdf_playwright_bytes(
+            result,
+            is_audit=is_audit,
+            logo_path=logo_path,
+            company_name=company_name,
+            company_details=company_details,
+            use_dark_theme=use_dark_theme,
+            audit_data=audit_data,
+            template=template
+        )
+
+        with open(output_path, 'wb') as f:
+            f.write(pdf_bytes)
+
+        return output_path
+
+    def generate_pdf_playwright_bytes(
+        self,
+        result: Dict,
+        is_audit: bool = False,
+        logo_path: Optional[str] = None,
+        company_name: Optional[str] = None,
+        company_details: Optional[str] = None,
+        use_dark_theme: bool = False,
+        audit_data: Optional[Dict] = None,
+        template: str = 'default'
+    ) -> bytes:
+        """
+        Render a professional HTML/CSS PDF in memory using the shared browser pool.
+
+        Takes the same arguments as generate_pdf_playwright() except output_path.
+
+        Returns:
+            PDF file contents
+        """
+        if not PLAYWRIGHT_AVAILABLE:
+            raise Exception("Playwright not installed. Install with: pip install playwright")
+
+        html_content = self.render_report_html(
+            result,
+            is_audit=is_audit,
+            logo_path=logo_path,
+            company_name=company_name,
+            company_details=company_details,
+            use_dark_theme=use_dark_theme,
+            audit_data=audit_data,
+            template=template
+        )
+
+        # Render the PDF on a warm pooled browser
+        try:
+            return get_default_pool().render_pdf(
+                html_content,
+                pdf_options=self.PLAYWRIGHT_PDF_OPTIONS,
+                viewport=self.PLAYWRIGHT_VIEWPORT
+            )
+        except BrowserPoolBusy:
+            raise
+        except Exception as e:
+            raise Exception(f"Failed to generate PDF with Playwright: {str(e)}")
+
+    def render_report_html(
+        self,
+        result: Dict,
+        is_audit: bool = False,
+        logo_path: Optional[str] = None,
+        company_name: Optional[str] = None,
+        company_details: Optional[str] = None,
+        use_dark_theme: bool = False,
+        audit_data: Optional[Dict] = None,
+        template: str = 'default'
+    ) -> str:
+        """
+        Render the HTML report document that Playwright prints to PDF.
+
+        Takes the same arguments as generate_pdf_playwright() except output_path.
+
+        Returns:
+            Complete HTML document
+        """
+        if self.jinja_env is None:
+            raise Exception("Template directory not found. Cannot generate HTML-based PDF.")
+
         # Select template based on type, theme, and template set
         template_prefix = 'jumoki_' if template == 'jumoki' else ''
         if is_audit:
@@ -525,41 +592,7 @@ Summary:"""
             })
 
         # Render HTML template
-        html_content = template.render(context)
-
-        # Generate PDF using Playwright
-        try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page(
-                    viewport={'width': 1024, 'height': 1280}
-                )
-
-                # Set the HTML content
-                page.set_content(html_content)
-
-                # Wait for any images to load
-                page.wait_for_load_state('networkidle')
-
-                # Generate PDF
-                page.pdf(
-                    path=output_path,
-                    format='A4',
-                    margin={
-                        'top': '0.5in',
-                        'right': '0.5in',
-                        'bottom': '0.5in',
-                        'left': '0.5in'
-                    },
-                    print_background=True
-                )
-
-                browser.close()
-
-            return output_path
-
-        except Exception as e:
-            raise Exception(f"Failed to generate PDF with Playwright: {str(e)}")
+        return template.render(context)
 
 
 def main():
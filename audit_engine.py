@@ -4,14 +4,25 @@ WebAudit Pro - Core Audit Engine
 Comprehensive 10-point website evaluation framework.
 """
 
+import functools
 import os
+import re
+import threading
+import time
 import requests
-from typing import Optional, Dict, List, Tuple
-from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional, Dict, List, Tuple
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
-import anthropic
+from pydantic import BaseModel, Field, create_model
+
+from llm_cache import LLMResponseCache
+from llm_gateway import INTERACTIVE, LLMGateway, estimate_input_tokens, get_llm_gateway, usage_to_dict
+from structured_output import StructuredOutputError, complete_structured, tool_definition
+from page_snapshot import PageSnapshot, get_snapshot
+from link_checker import LinkChecker, get_default_link_checker
+from origin_metadata import OriginMetadataCache, get_default_origin_cache
 
 
 @dataclass
@@ -23,6 +34,23 @@ class CriterionScore:
     recommendations: List[str]  # How to improve
 
 
+class CriterionEvaluation(BaseModel):
+    """Schema of one criterion evaluation as returned by Claude."""
+    score: float = Field(ge=0, le=10, description="Score from 0 to 10")
+    observations: List[str] = Field(description="2-3 specific observations (strengths and weaknesses)")
+    recommendations: List[str] = Field(description="2-3 concrete recommendations for improvement")
+
+
+def criterion_key(criterion: str) -> str:
+    """
+    Tool schema property key for a criterion name.
+
+    The API only accepts property keys matching ^[a-zA-Z0-9_.-]{1,64}$, so
+    "SEO & Discovery" is sent as "seo_discovery".
+    """
+    return re.sub(r'[^a-z0-9]+', '_', criterion.lower()).strip('_')[:64]
+
+
 @dataclass
 class AuditResult:
     """Complete audit evaluation result."""
@@ -35,6 +63,9 @@ class AuditResult:
     key_strengths: List[str]  # Top 3-5 strengths
     critical_issues: List[str]  # Top 3-5 issues
     priority_recommendations: List[Dict]  # Ranked recommendations
+    evaluation_stats: Dict = field(default_factory=dict)  # LLM calls, tokens, latency
+    content_fingerprint: str = ''  # Normalized page content hash (see page_snapshot)
+    reused: bool = False  # Scores reused from an earlier audit of unchanged content
 
 
 class WebsiteAuditor:
@@ -50,6 +81,13 @@ class WebsiteAuditor:
     8. Security
     9. Conversion Goals
     10. Technical Quality
+
+    Quick scan (deep_scan=False) is the fast path for the mobile app: it skips
+    the broken-link, sitemap and robots.txt probes, scores the criteria that
+    can be decided from the page markup deterministically, and sends the rest
+    to a smaller model with tighter output limits. Its latency budget is
+    QUICK_SCAN_LATENCY_BUDGET seconds end-to-end for a page that responds
+    promptly; each Claude call in a quick scan is capped at that budget.
     """
 
     CRITERIA = [
@@ -65,49 +103,214 @@ class WebsiteAuditor:
         "Technical Quality"
     ]
 
-    def __init__(self, timeout: int = 10, api_key: Optional[str] = None):
-        """Initialize auditor with timeout and API key."""
+    AUDITOR_INSTRUCTIONS = (
+        "You are a professional website auditor. You evaluate websites against "
+        "specific criteria using the analysis data provided below, and you record "
+        "your evaluations with the tool provided."
+    )
+
+    # Criterion scoring strategies selectable per audit
+    SCORING_MODES = ("per_criterion", "batched")
+
+    MODEL = "claude-sonnet-4-5"
+    MAX_TOKENS = 500
+
+    # Output budget for scoring all criteria in one call
+    BATCHED_MAX_TOKENS = 4000
+
+    # Quick scan settings
+    QUICK_SCAN_MODEL = "claude-haiku-4-5"
+    QUICK_SCAN_MAX_TOKENS = 250
+    QUICK_SCAN_BATCHED_MAX_TOKENS = 1500
+    QUICK_SCAN_LATENCY_BUDGET = 5.0  # seconds
+
+    # Shortest prefix (tools plus system) each model caches, in tokens
+    PROMPT_CACHE_MIN_TOKENS = {MODEL: 1024, QUICK_SCAN_MODEL: 4096}
+
+    # Same for every criterion, so the tool definition is part of the cached prefix
+    CRITERION_TOOL_DESCRIPTION = "Record the evaluation of the requested criterion."
+
+    # Deep scans check up to this many of a page's links within the budget
+    LINK_CHECK_MAX_LINKS = int(os.getenv('LINK_CHECK_MAX_LINKS', 300))
+    LINK_CHECK_BUDGET = float(os.getenv('LINK_CHECK_BUDGET_SECONDS', 5.0))  # seconds
+
+    # Criteria a quick scan scores from page markup without calling Claude
+    DETERMINISTIC_CRITERIA = (
+        "Responsiveness",
+        "Accessibility",
+        "SEO & Discovery",
+        "Security"
+    )
+
+    def __init__(
+        self,
+        timeout: int = 10,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 10,
+        cache: Optional[LLMResponseCache] = None,
+        link_checker: Optional[LinkChecker] = None,
+        origin_cache: Optional[OriginMetadataCache] = None,
+        gateway: Optional[LLMGateway] = None,
+        priority: int = INTERACTIVE
+    ):
+        """
+        Initialize auditor with timeout and API key.
+
+        Args:
+            timeout: Request timeout in seconds for fetching the website
+            api_key: Anthropic API key (defaults to ANTHROPIC_API_KEY env var)
+            max_concurrency: Maximum number of criteria evaluated in parallel
+            cache: Optional LLM response cache; None disables caching
+            link_checker: Link checker for deep scans (defaults to the shared one)
+            origin_cache: robots.txt/sitemap cache for deep scans (defaults to the shared one)
+            gateway: LLM gateway Claude calls are scheduled on (defaults to the shared one)
+            priority: Gateway priority class (INTERACTIVE or BATCH)
+        """
         self.timeout = timeout
+        self.max_concurrency = max(1, max_concurrency)
+        self.cache = cache
+        self.link_checker = link_checker or get_default_link_checker()
+        self.origin_cache = origin_cache or get_default_origin_cache()
         self.api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY environment variable not set")
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.gateway = gateway or get_llm_gateway()
+        self.priority = priority
+        self._stats_lock = threading.Lock()
 
-    def audit(self, url: str, deep_scan: bool = True) -> AuditResult:
+    def audit(
+        self,
+        url: str,
+        deep_scan: bool = True,
+        scoring_mode: str = "per_criterion",
+        progress_callback: Optional[Callable[[str, Dict], None]] = None,
+        reuse: Optional[Callable[[str, str], Optional[Dict]]] = None
+    ) -> AuditResult:
         """
         Perform comprehensive 10-point audit of a website.
 
         Args:
             url: Website URL to audit
             deep_scan: Whether to perform detailed analysis (vs quick scan)
+            scoring_mode: "per_criterion" (one Claude call per criterion) or
+                "batched" (all criteria scored in a single Claude call)
+            progress_callback: Optional callable(stage, data) invoked as the
+                audit progresses: "fetched", "parsed", then "criterion" once
+                per scored criterion (data holds the CriterionScore fields plus
+                "completed" and "total" counts)
+            reuse: Optional callable(url, content_fingerprint) returning an
+                earlier audit (to_dict() form, plus its history "id") of the
+                same page content; when it returns one, its scores are reused
+                without checking links or calling Claude
 
         Returns:
             AuditResult with scores, observations, and recommendations
         """
+        if scoring_mode not in self.SCORING_MODES:
+            raise ValueError(
+                f"Invalid scoring mode: {scoring_mode}. "
+                f"Must be one of: {', '.join(self.SCORING_MODES)}"
+            )
+
+        audit_started = time.perf_counter()
+
+        def notify(stage: str, data: Optional[Dict] = None) -> None:
+            if progress_callback is not None:
+                progress_callback(stage, data or {})
+
+        completed = []
+
+        def on_result(criterion: str, result: Tuple[float, CriterionScore]) -> None:
+            completed.append(criterion)
+            details = result[1]
+            notify("criterion", {
+                "name": criterion,
+                "score": round(details.score, 1),
+                "observations": details.observations,
+                "recommendations": details.recommendations,
+                "completed": len(completed),
+                "total": len(self.CRITERIA),
+            })
+
         # Normalize URL
         url = self._normalize_url(url)
 
         # Fetch and parse website
-        html_content, page_metadata = self._fetch_website(url)
+        if deep_scan:
+            # robots.txt/sitemap probes run while the page downloads
+            self.origin_cache.prefetch(url)
+        snapshot = self._fetch_website(url)
+        html_content, page_metadata = snapshot.html, snapshot.metadata
+        notify("fetched")
+
+        # Unchanged content: the earlier scores still apply
+        previous = reuse(url, snapshot.fingerprint) if reuse else None
+        if previous:
+            notify("parsed")
+            return self._reuse_result(previous, snapshot, deep_scan, scoring_mode, on_result, audit_started)
 
         # Extract content and structure
-        content_analysis = self._analyze_content(html_content, url)
+        content_analysis = self._analyze_content(snapshot, url, deep_scan)
+        notify("parsed")
 
-        # Evaluate each criterion using Claude
-        scores = {}
-        criteria_details = {}
+        # Evaluate all criteria using Claude
+        stats = {
+            "deep_scan": deep_scan,
+            "scoring_mode": scoring_mode,
+            "llm_calls": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "llm_cache_hits": 0,
+            "fallback_criteria": [],
+            "failed_criteria": [],
+            "page_truncated": snapshot.truncated,
+            "page_cache_status": snapshot.cache_status,
+        }
+        started = time.perf_counter()
 
-        for criterion in self.CRITERIA:
-            score, details = self._evaluate_criterion(
-                criterion,
+        # Quick scan scores what it can without Claude
+        results = {}
+        if not deep_scan:
+            for criterion in self.DETERMINISTIC_CRITERIA:
+                results[criterion] = self._score_deterministically(
+                    criterion, page_metadata, content_analysis
+                )
+                on_result(criterion, results[criterion])
+        remaining = [criterion for criterion in self.CRITERIA if criterion not in results]
+
+        if scoring_mode == "batched":
+            results.update(self._evaluate_criteria_batched(
+                remaining,
                 url,
                 html_content,
                 page_metadata,
                 content_analysis,
-                deep_scan
-            )
-            scores[criterion] = score
-            criteria_details[criterion] = details
+                deep_scan,
+                stats,
+                on_result
+            ))
+        else:
+            results.update(self._evaluate_criteria(
+                remaining,
+                url,
+                html_content,
+                page_metadata,
+                content_analysis,
+                deep_scan,
+                stats,
+                on_result
+            ))
+
+        stats["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+        stats["total_seconds"] = round(time.perf_counter() - audit_started, 2)
+        if not deep_scan:
+            stats["latency_budget_seconds"] = self.QUICK_SCAN_LATENCY_BUDGET
+
+        # Keep CRITERIA order regardless of completion order
+        scores = {criterion: results[criterion][0] for criterion in self.CRITERIA}
+        criteria_details = {criterion: results[criterion][1] for criterion in self.CRITERIA}
 
         # Calculate overall score (average of all 10 criteria)
         overall_score = sum(scores.values()) / len(scores)
@@ -128,7 +331,65 @@ class WebsiteAuditor:
             criteria_details=criteria_details,
             key_strengths=strengths,
             critical_issues=issues,
-            priority_recommendations=recommendations
+            priority_recommendations=recommendations,
+            evaluation_stats=stats,
+            content_fingerprint=snapshot.fingerprint
+        )
+
+    def _reuse_result(
+        self,
+        previous: Dict,
+        snapshot: PageSnapshot,
+        deep_scan: bool,
+        scoring_mode: str,
+        on_result: Callable[[str, Tuple[float, CriterionScore]], None],
+        audit_started: float
+    ) -> AuditResult:
+        """Build a new AuditResult from an earlier audit of the same content."""
+        scores = {}
+        criteria_details = {}
+        for criterion in self.CRITERIA:
+            details = previous["criteria_details"][criterion]
+            scores[criterion] = details["score"]
+            criteria_details[criterion] = CriterionScore(
+                name=criterion,
+                score=details["score"],
+                observations=details["observations"],
+                recommendations=details["recommendations"]
+            )
+            on_result(criterion, (scores[criterion], criteria_details[criterion]))
+
+        stats = {
+            "deep_scan": deep_scan,
+            "scoring_mode": scoring_mode,
+            "llm_calls": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "llm_cache_hits": 0,
+            "fallback_criteria": [],
+            "failed_criteria": [],
+            "page_truncated": snapshot.truncated,
+            "page_cache_status": snapshot.cache_status,
+            "reused_from": previous.get("id"),
+            "elapsed_seconds": 0.0,
+            "total_seconds": round(time.perf_counter() - audit_started, 2),
+        }
+
+        return AuditResult(
+            url=previous["url"],
+            website_name=previous["website_name"],
+            audit_timestamp=datetime.utcnow().isoformat(),
+            overall_score=previous["overall_score"],
+            scores=scores,
+            criteria_details=criteria_details,
+            key_strengths=previous["key_strengths"],
+            critical_issues=previous["critical_issues"],
+            priority_recommendations=previous["priority_recommendations"],
+            evaluation_stats=stats,
+            content_fingerprint=snapshot.fingerprint,
+            reused=True
         )
 
     def _normalize_url(self, url: str) -> str:
@@ -137,41 +398,13 @@ class WebsiteAuditor:
             url = 'https://' + url
         return url
 
-    def _fetch_website(self, url: str) -> Tuple[str, Dict]:
-        """Fetch website HTML and extract metadata."""
+    def _fetch_website(self, url: str) -> PageSnapshot:
+        """Fetch website HTML, metadata and structure (shared page snapshot)."""
         try:
-            response = requests.get(
-                url,
-                timeout=self.timeout,
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
-            )
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Extract metadata
-            metadata = {
-                'title': soup.find('title').text if soup.find('title') else '',
-                'meta_description': self._get_meta_content(soup, 'description'),
-                'og_title': self._get_meta_content(soup, 'og:title'),
-                'og_description': self._get_meta_content(soup, 'og:description'),
-                'viewport': self._get_meta_content(soup, 'viewport'),
-                'charset': soup.find('meta', {'charset': True}) is not None,
-                'https': response.url.startswith('https'),
-                'status_code': response.status_code
-            }
-
-            return response.text, metadata
+            return get_snapshot(url, timeout=self.timeout)
         except requests.RequestException as e:
             raise Exception(f"Failed to fetch website: {str(e)}")
 
-    def _get_meta_content(self, soup: BeautifulSoup, name: str) -> str:
-        """Extract meta tag content."""
-        meta = soup.find('meta', {'name': name}) or soup.find('meta', {'property': name})
-        return meta.get('content', '') if meta else ''
-
     def _extract_website_name(self, url: str, metadata: Dict) -> str:
         """Extract website name from URL or title."""
         if metadata.get('title'):
@@ -179,63 +412,189 @@ class WebsiteAuditor:
         parsed = urlparse(url)
         return parsed.netloc.replace('www.', '')
 
-    def _analyze_content(self, html: str, url: str) -> Dict:
-        """Analyze website structure and content."""
-        soup = BeautifulSoup(html, 'html.parser')
+    def _analyze_content(self, snapshot: PageSnapshot, url: str, deep_scan: bool = True) -> Dict:
+        """
+        Analyze website structure and content.
+        Structure counts come from the snapshot's single-pass extraction;
+        network probes (links, sitemap, robots.txt) only run on a deep scan.
+        """
+        structure = snapshot.structure
+        links = self._check_links(snapshot) if deep_scan else {}
+        origin = self.origin_cache.get(url) if deep_scan else None
 
         return {
-            'has_h1': bool(soup.find('h1')),
-            'h1_count': len(soup.find_all('h1')),
-            'has_nav': bool(soup.find('nav')),
-            'has_footer': bool(soup.find('footer')),
-            'has_main': bool(soup.find('main')),
-            'img_count': len(soup.find_all('img')),
-            'img_with_alt': len([img for img in soup.find_all('img') if img.get('alt')]),
-            'form_count': len(soup.find_all('form')),
-            'button_count': len(soup.find_all('button')),
-            'link_count': len(soup.find_all('a')),
-            'broken_links': self._count_broken_links(soup, url),
-            'has_sitemap': self._check_sitemap(url),
-            'has_robots': self._check_robots(url),
-            'word_count': len(soup.get_text().split()),
-            'title_length': len(soup.find('title').text) if soup.find('title') else 0,
+            'has_h1': structure['has_h1'],
+            'h1_count': structure['h1_count'],
+            'has_nav': structure['has_nav'],
+            'has_footer': structure['has_footer'],
+            'has_main': structure['has_main'],
+            'img_count': structure['img_count'],
+            'img_with_alt': structure['img_with_alt'],
+            'form_count': structure['form_count'],
+            'button_count': structure['button_count'],
+            'link_count': structure['link_count'],
+            'broken_links': links.get('broken'),
+            'links_checked': links.get('checked'),
+            'links_unverified': links.get('unverified'),  # No answer in time
+            'links_skipped': links.get('skipped'),  # Not checked within the budget
+            'has_sitemap': origin.has_sitemap if origin else None,
+            'has_robots': origin.has_robots if origin else None,
+            'sitemap_url_count': origin.sitemap_url_count if origin else None,
+            'word_count': structure['word_count'],
+            'title_length': structure['title_length'],
+            'page_text': snapshot.text,  # Readable text, for the cached prompt prefix
         }
 
-    def _count_broken_links(self, soup: BeautifulSoup, base_url: str) -> int:
-        """Count broken links (404s) - quick sample check."""
-        # For performance, only check a few links
-        links = soup.find_all('a', href=True)[:10]
-        broken = 0
-        for link in links:
-            href = link.get('href')
-            if href and href.startswith(('http://', 'https://')):
-                try:
-                    response = requests.head(href, timeout=2)
-                    if response.status_code >= 400:
-                        broken += 1
-                except:
-                    broken += 1
-        return broken
-
-    def _check_sitemap(self, url: str) -> bool:
-        """Check if sitemap.xml exists."""
-        try:
-            parsed = urlparse(url)
-            sitemap_url = f"{parsed.scheme}://{parsed.netloc}/sitemap.xml"
-            response = requests.head(sitemap_url, timeout=2)
-            return response.status_code == 200
-        except:
-            return False
-
-    def _check_robots(self, url: str) -> bool:
-        """Check if robots.txt exists."""
+    def _check_links(self, snapshot: PageSnapshot) -> Dict:
+        """Check the page's links concurrently within the link-check budget."""
+        return self.link_checker.check(
+            snapshot.links,
+            snapshot.final_url,
+            budget_seconds=self.LINK_CHECK_BUDGET,
+            max_links=self.LINK_CHECK_MAX_LINKS
+        )
+
+    def _evaluate_criteria(
+        self,
+        criteria: List[str],
+        url: str,
+        html: str,
+        metadata: Dict,
+        content_analysis: Dict,
+        deep_scan: bool,
+        stats: Optional[Dict] = None,
+        on_result: Optional[Callable] = None,
+        warm_cache: bool = True
+    ) -> Dict[str, Tuple[float, CriterionScore]]:
+        """
+        Evaluate criteria concurrently, at most max_concurrency at a time.
+
+        Each criterion is an independent Claude round trip, so fanning them out
+        brings the wall-clock time down to roughly that of the slowest one.
+        When the shared prefix is cached, the first criterion runs alone:
+        a cache entry is only readable once its first response starts, so
+        concurrent calls would each write the prefix instead of reading it.
+        Returns a mapping of criterion name to (score, details); on_result is
+        called with each criterion and its result as soon as it completes.
+        """
+        if warm_cache and len(criteria) > 1 and any(
+            "cache_control" in block
+            for block in self._build_site_prompt(url, metadata, content_analysis, deep_scan)
+        ):
+            results = self._evaluate_criteria(
+                criteria[:1], url, html, metadata, content_analysis, deep_scan, stats, on_result, warm_cache=False
+            )
+            results.update(self._evaluate_criteria(
+                criteria[1:], url, html, metadata, content_analysis, deep_scan, stats, on_result, warm_cache=False
+            ))
+            return results
+
+        results = {}
+        workers = max(1, min(self.max_concurrency, len(criteria)))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    self._evaluate_criterion,
+                    criterion,
+                    url,
+                    html,
+                    metadata,
+                    content_analysis,
+                    deep_scan,
+                    stats
+                ): criterion
+                for criterion in criteria
+            }
+            # _evaluate_criterion falls back to a default score on failure,
+            # so result() only raises on programming errors
+            for future in as_completed(futures):
+                criterion = futures[future]
+                results[criterion] = future.result()
+                if on_result is not None:
+                    on_result(criterion, results[criterion])
+
+        return results
+
+    def _evaluate_criteria_batched(
+        self,
+        criteria: List[str],
+        url: str,
+        html: str,
+        metadata: Dict,
+        content_analysis: Dict,
+        deep_scan: bool,
+        stats: Optional[Dict] = None,
+        on_result: Optional[Callable] = None
+    ) -> Dict[str, Tuple[float, CriterionScore]]:
+        """
+        Evaluate all criteria in a single Claude call.
+
+        The reply is one tool call holding an evaluation per criterion, keyed
+        by criterion_key() and mapped back to the criterion names; invalid
+        entries are re-requested once in a follow-up turn. Criteria
+        still missing or malformed are re-evaluated with individual
+        per-criterion calls.
+        """
+        if not criteria:
+            return {}
+
+        # One CriterionEvaluation per criterion, keyed by its schema-safe key
+        keys = {criterion: criterion_key(criterion) for criterion in criteria}
+        schema = create_model(
+            'BatchedEvaluation',
+            **{
+                key: (CriterionEvaluation, Field(description=criterion))
+                for criterion, key in keys.items()
+            }
+        )
+        criteria_list = ', '.join(f"{key} ({criterion})" for criterion, key in keys.items())
+
+        prompt = f"""Evaluate the website across these {len(criteria)} criteria: {criteria_list}.
+
+For EACH criterion, based on the analysis data above, provide:
+1. A score from 0-10
+2. 2-3 specific observations (strengths and weaknesses)
+3. 2-3 concrete recommendations for improvement
+
+Record all evaluations with the record_evaluations tool, one entry per criterion key listed above.
+"""
+
+        results = {}
         try:
-            parsed = urlparse(url)
-            robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
-            response = requests.head(robots_url, timeout=2)
-            return response.status_code == 200
-        except:
-            return False
+            reply = self._complete_structured({
+                **self._model_settings(deep_scan, batched=True),
+                "system": self._build_site_prompt(url, metadata, content_analysis, deep_scan),
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ]
+            }, schema, "record_evaluations", "Record the evaluation of every criterion.", stats)
+            reply = reply.model_dump()
+        except StructuredOutputError as e:
+            # Keep the criteria that did validate
+            print(f"⚠️ Batched reply incomplete: {str(e)[:200]}")
+            reply = e.data
+        except Exception as e:
+            print(f"❌ Error in batched evaluation: {str(e)}")
+            reply = {}
+
+        for criterion in criteria:
+            parsed = self._parse_criterion_result(criterion, reply.get(keys[criterion]))
+            if parsed is not None:
+                results[criterion] = parsed
+                if on_result is not None:
+                    on_result(criterion, parsed)
+
+        missing = [criterion for criterion in criteria if criterion not in results]
+        if missing:
+            print(f"⚠️ Batched reply missing or malformed for: {', '.join(missing)}")
+            if stats is not None:
+                stats["fallback_criteria"] = missing
+            results.update(self._evaluate_criteria(
+                missing, url, html, metadata, content_analysis, deep_scan, stats, on_result
+            ))
+
+        return results
 
     def _evaluate_criterion(
         self,
@@ -244,84 +603,49 @@ class WebsiteAuditor:
         html: str,
         metadata: Dict,
         content_analysis: Dict,
-        deep_scan: bool
+        deep_scan: bool,
+        stats: Optional[Dict] = None
     ) -> Tuple[float, CriterionScore]:
         """
         Evaluate a single criterion using Claude AI.
         Returns score (0-10) and detailed observations.
         """
 
-        # Prepare evaluation context for Claude
-        evaluation_context = self._prepare_evaluation_context(
-            criterion, url, metadata, content_analysis, deep_scan
-        )
-
-        # Use Claude to evaluate
-        prompt = f"""You are a professional website auditor evaluating a website's {criterion}.
-
-Website: {url}
-Title: {metadata.get('title', 'N/A')}
-Meta Description: {metadata.get('meta_description', 'N/A')}
-
-Analysis Data:
-{evaluation_context}
+        # Use Claude to evaluate; the site block is a cached system prefix shared
+        # by every criterion, so only this criterion-specific tail varies
+        prompt = f"""Evaluate the website's {criterion}.
 
-Based on this analysis, provide:
+Based on the {criterion} analysis data above, provide:
 1. A score from 0-10 for {criterion}
 2. 2-3 specific observations (strengths and weaknesses)
 3. 2-3 concrete recommendations for improvement
 
-Format your response as JSON:
-{{
-    "score": X,
-    "observations": ["obs1", "obs2", "obs3"],
-    "recommendations": ["rec1", "rec2", "rec3"]
-}}
+Record your evaluation with the record_evaluation tool.
 """
 
         try:
-            message = self.client.messages.create(
-                model="claude-sonnet-4-5",
-                max_tokens=500,
-                messages=[
+            result = self._complete_structured({
+                **self._model_settings(deep_scan),
+                "system": self._build_site_prompt(url, metadata, content_analysis, deep_scan),
+                "messages": [
                     {"role": "user", "content": prompt}
                 ]
-            )
-
-            # Parse Claude's response
-            import json
-            response_text = message.content[0].text
-            print(f"📝 Claude response for {criterion}: {response_text[:100]}...")
-
-            # Extract JSON from response
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-            if json_start >= 0 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                result = json.loads(json_str)
-                print(f"✅ Parsed score for {criterion}: {result.get('score', 'N/A')}")
-            else:
-                # Fallback if JSON parsing fails
-                print(f"⚠️ Failed to find JSON in response for {criterion}")
-                result = {
-                    "score": 5,
-                    "observations": ["Unable to fully evaluate"],
-                    "recommendations": ["Review and improve"]
-                }
-
-            # Ensure score is 0-10
-            score = max(0, min(10, float(result.get("score", 5))))
+            }, CriterionEvaluation, "record_evaluation", self.CRITERION_TOOL_DESCRIPTION, stats)
+            print(f"✅ Parsed score for {criterion}: {result.score}")
 
-            return score, CriterionScore(
+            return result.score, CriterionScore(
                 name=criterion,
-                score=score,
-                observations=result.get("observations", []),
-                recommendations=result.get("recommendations", [])
+                score=result.score,
+                observations=result.observations,
+                recommendations=result.recommendations
             )
 
         except Exception as e:
             # Fallback scoring on error
             print(f"❌ Error evaluating {criterion}: {str(e)}")
+            if stats is not None:
+                with self._stats_lock:
+                    stats["failed_criteria"].append(criterion)
             return 5.0, CriterionScore(
                 name=criterion,
                 score=5.0,
@@ -329,6 +653,258 @@ Format your response as JSON:
                 recommendations=["Manual review recommended"]
             )
 
+    def _build_site_prompt(
+        self,
+        url: str,
+        metadata: Dict,
+        content_analysis: Dict,
+        deep_scan: bool
+    ) -> List[Dict]:
+        """
+        Build the system prefix shared by all criterion prompts.
+
+        It holds the auditor instructions plus the site block: the analysis
+        data for every criterion and the page text. It is byte-identical
+        across the criterion calls of an audit (and across repeat audits of
+        an unchanged page), and together with the criterion tool it is marked
+        for Anthropic's prompt cache when it reaches the model's minimum
+        cacheable length (PROMPT_CACHE_MIN_TOKENS). Shorter prefixes, such as
+        quick scans on the smaller model, are sent unmarked.
+        """
+        sections = []
+        for criterion in self.CRITERIA:
+            evaluation_context = self._prepare_evaluation_context(
+                criterion, url, metadata, content_analysis, deep_scan
+            )
+            sections.append(f"### {criterion}\n{evaluation_context}")
+
+        site_block = f"""Website: {url}
+Title: {metadata.get('title', 'N/A')}
+Meta Description: {metadata.get('meta_description', 'N/A')}
+
+Analysis Data:
+{chr(10).join(sections)}
+
+Page Text:
+{content_analysis.get('page_text') or 'N/A'}
+"""
+
+        system = [
+            {"type": "text", "text": self.AUDITOR_INSTRUCTIONS},
+            {"type": "text", "text": site_block},
+        ]
+        prefix_tokens = estimate_input_tokens({
+            "system": system,
+            "tools": [tool_definition(CriterionEvaluation, "record_evaluation", self.CRITERION_TOOL_DESCRIPTION)],
+        })
+        if prefix_tokens >= self.PROMPT_CACHE_MIN_TOKENS[self._model_settings(deep_scan)["model"]]:
+            system[-1]["cache_control"] = {"type": "ephemeral"}
+        return system
+
+    def _model_settings(self, deep_scan: bool, batched: bool = False) -> Dict:
+        """
+        Model, output limit and timeout for a Claude call in this scan mode.
+
+        Quick-scan calls also carry their latency budget as the gateway
+        deadline, so queueing and retries cannot stretch them past it.
+        """
+        if deep_scan:
+            return {
+                "model": self.MODEL,
+                "max_tokens": self.BATCHED_MAX_TOKENS if batched else self.MAX_TOKENS,
+            }
+        return {
+            "model": self.QUICK_SCAN_MODEL,
+            "max_tokens": self.QUICK_SCAN_BATCHED_MAX_TOKENS if batched else self.QUICK_SCAN_MAX_TOKENS,
+            "timeout": self.QUICK_SCAN_LATENCY_BUDGET,
+            "deadline": self.QUICK_SCAN_LATENCY_BUDGET,
+        }
+
+    def _score_deterministically(
+        self,
+        criterion: str,
+        metadata: Dict,
+        content_analysis: Dict
+    ) -> Tuple[float, CriterionScore]:
+        """
+        Rule-based scoring for criteria decidable from page markup (quick scan).
+        Observations list strengths first, then weaknesses.
+        """
+        strengths = []
+        weaknesses = []
+        recommendations = []
+
+        if criterion == "Responsiveness":
+            viewport = metadata.get('viewport') or ''
+            score = 2.0
+            if viewport:
+                score += 5
+                strengths.append("Viewport meta tag is defined")
+                if 'width=device-width' in viewport:
+                    score += 2
+                    strengths.append("Layout width follows the device width")
+                else:
+                    weaknesses.append("Viewport does not use width=device-width")
+                    recommendations.append("Set the viewport to width=device-width, initial-scale=1")
+                if 'user-scalable=no' in viewport or 'maximum-scale=1' in viewport:
+                    score -= 1
+                    weaknesses.append("Viewport prevents users from zooming")
+                    recommendations.append("Allow pinch-zoom by removing user-scalable=no and maximum-scale=1")
+                else:
+                    score += 1
+            else:
+                weaknesses.append("No viewport meta tag; the page will not adapt to mobile screens")
+                recommendations.append("Add <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">")
+
+        elif criterion == "Accessibility":
+            img_count = content_analysis.get('img_count') or 0
+            img_with_alt = content_analysis.get('img_with_alt') or 0
+            alt_ratio = img_with_alt / img_count if img_count else 1.0
+            score = 2.0 + 5 * alt_ratio
+            if not img_count:
+                pass
+            elif alt_ratio >= 0.9:
+                strengths.append(f"Images have alt text ({img_with_alt}/{img_count})")
+            else:
+                weaknesses.append(f"Only {img_with_alt}/{img_count} images have alt text")
+                recommendations.append("Add descriptive alt text to every meaningful image")
+            if content_analysis.get('has_h1'):
+                score += 2
+                strengths.append("Page has a top-level heading")
+            else:
+                weaknesses.append("No H1 heading for screen reader navigation")
+                recommendations.append("Add a single descriptive H1 heading")
+            if metadata.get('charset'):
+                score += 1
+            else:
+                weaknesses.append("Character set is not declared")
+                recommendations.append("Declare <meta charset=\"utf-8\"> in the document head")
+
+        elif criterion == "SEO & Discovery":
+            score = 2.0
+            title_length = content_analysis.get('title_length') or 0
+            description = metadata.get('meta_description') or ''
+            if 10 <= title_length <= 60:
+                score += 2
+                strengths.append(f"Title length is search-friendly ({title_length} chars)")
+            else:
+                score += 1 if title_length else 0
+                weaknesses.append(f"Title length is {title_length} chars (aim for 10-60)")
+                recommendations.append("Write a concise, descriptive page title of 10-60 characters")
+            if description:
+                score += 2
+                if 50 <= len(description) <= 160:
+                    score += 1
+                    strengths.append("Meta description is present and well sized")
+                else:
+                    weaknesses.append(f"Meta description is {len(description)} chars (aim for 50-160)")
+                    recommendations.append("Rewrite the meta description to 50-160 characters")
+            else:
+                weaknesses.append("No meta description")
+                recommendations.append("Add a meta description summarising the page")
+            if metadata.get('og_title'):
+                score += 1
+                strengths.append("Open Graph title is set for social sharing")
+            else:
+                weaknesses.append("No Open Graph tags for social sharing")
+                recommendations.append("Add og:title and og:description tags")
+            if content_analysis.get('h1_count') == 1:
+                score += 2
+            else:
+                weaknesses.append(f"Page has {content_analysis.get('h1_count', 0)} H1 headings (expected 1)")
+                recommendations.append("Use exactly one H1 heading per page")
+
+        elif criterion == "Security":
+            score = 2.0
+            if metadata.get('https'):
+                score += 6
+                strengths.append("Site is served over HTTPS")
+            else:
+                weaknesses.append("Site is not served over HTTPS")
+                recommendations.append("Serve the site over HTTPS and redirect HTTP traffic")
+            if (metadata.get('status_code') or 0) < 400:
+                score += 1
+            if metadata.get('charset'):
+                score += 1
+            else:
+                weaknesses.append("Character set is not declared, which can enable encoding attacks")
+                recommendations.append("Declare <meta charset=\"utf-8\"> in the document head")
+
+        else:
+            raise ValueError(f"No deterministic scoring for criterion: {criterion}")
+
+        if not recommendations:
+            recommendations.append(f"Run a deep scan for a detailed {criterion} review")
+
+        score = max(0, min(10, score))
+        return score, CriterionScore(
+            name=criterion,
+            score=score,
+            observations=strengths[:2] + weaknesses[:2],
+            recommendations=recommendations[:3]
+        )
+
+    def _parse_criterion_result(
+        self,
+        criterion: str,
+        result: Optional[Dict]
+    ) -> Optional[Tuple[float, CriterionScore]]:
+        """
+        Validate one criterion entry from a batched reply.
+        Returns None if the entry is missing or malformed.
+        """
+        try:
+            evaluation = CriterionEvaluation.model_validate(result)
+        except ValueError:
+            return None
+
+        return evaluation.score, CriterionScore(
+            name=criterion,
+            score=evaluation.score,
+            observations=evaluation.observations,
+            recommendations=evaluation.recommendations
+        )
+
+    def _complete_structured(
+        self,
+        request: Dict,
+        schema,
+        name: str,
+        description: str,
+        stats: Optional[Dict] = None
+    ):
+        """
+        Send a schema-constrained messages.create() request and return the
+        validated reply (see structured_output). Invalid fields are
+        re-requested once; identical requests are answered from the response
+        cache when enabled.
+        """
+        def on_cache_hit() -> None:
+            if stats is not None:
+                with self._stats_lock:
+                    stats["llm_cache_hits"] += 1
+
+        return complete_structured(
+            functools.partial(self.gateway.create, priority=self.priority, api_key=self.api_key),
+            request,
+            schema,
+            name,
+            description,
+            cache=self.cache,
+            on_message=lambda message: self._record_usage(stats, message),
+            on_cache_hit=on_cache_hit
+        )
+
+    def _record_usage(self, stats: Optional[Dict], message) -> None:
+        """Accumulate call count and token usage from a Claude response."""
+        if stats is None:
+            return
+        usage = usage_to_dict(getattr(message, "usage", None))
+        with self._stats_lock:
+            stats["llm_calls"] += 1
+            for key, value in usage.items():
+                stats[key] = stats.get(key, 0) + value
+
     def _prepare_evaluation_context(
         self,
         criterion: str,
@@ -345,7 +921,8 @@ Format your response as JSON:
                 - Has clear main content: {content_analysis.get('has_main')}
                 - Button count: {content_analysis.get('button_count')}
                 - Meta viewport: {metadata.get('viewport') is not None}
-                - Broken links (sample): {content_analysis.get('broken_links')}
+                - Broken links: {content_analysis.get('broken_links')} of {content_analysis.get('links_checked')} checked
+                - Links not verified in time: {(content_analysis.get('links_unverified') or 0) + (content_analysis.get('links_skipped') or 0)}
             """,
             "Performance": f"""
                 - Resource optimization indicators
@@ -353,7 +930,7 @@ Format your response as JSON:
                 - Form complexity: {content_analysis.get('form_count')} forms
                 - Script/CSS optimization potential
             """,
-            "Mobile Responsiveness": f"""
+            "Responsiveness": f"""
                 - Has viewport meta tag: {metadata.get('viewport') is not None}
                 - Responsive design indicators needed
                 - Touch-friendly button count: {content_analysis.get('button_count')}
@@ -364,7 +941,7 @@ Format your response as JSON:
                 - Image usage: {content_analysis.get('img_count')} images
             """,
             "Content Quality": f"""
-                - Title length: {metadata.get('title_length')} chars
+                - Title length: {content_analysis.get('title_length')} chars
                 - Meta description: {metadata.get('meta_description') is not None}
                 - Word count: {content_analysis.get('word_count')} words
                 - Heading structure: H1 count = {content_analysis.get('h1_count')}
@@ -375,8 +952,9 @@ Format your response as JSON:
                 - Form fields count: {content_analysis.get('form_count')}
                 - Charset defined: {metadata.get('charset')}
             """,
-            "SEO & Discoverability": f"""
+            "SEO & Discovery": f"""
                 - Sitemap.xml exists: {content_analysis.get('has_sitemap')}
+                - Sitemap URLs listed: {content_analysis.get('sitemap_url_count')}
                 - Robots.txt exists: {content_analysis.get('has_robots')}
                 - Meta description: {metadata.get('meta_description') is not None}
                 - Open Graph tags: {metadata.get('og_title') is not None}
@@ -386,7 +964,7 @@ Format your response as JSON:
                 - HTTP status: {metadata.get('status_code')}
                 - Charset defined: {metadata.get('charset')}
             """,
-            "Conversion/Goal Achievement": f"""
+            "Conversion Goals": f"""
                 - Has forms: {content_analysis.get('form_count')} forms
                 - CTA buttons: {content_analysis.get('button_count')} buttons
                 - Meta description clarity: {len(metadata.get('meta_description', ''))} chars
@@ -394,7 +972,8 @@ Format your response as JSON:
             "Technical Quality": f"""
                 - Valid HTML structure
                 - HTTP status: {metadata.get('status_code')}
-                - Link integrity: {content_analysis.get('broken_links')} broken (sample)
+                - Link integrity: {content_analysis.get('broken_links')} broken of {content_analysis.get('links_checked')} checked
+                - Links not verified in time: {(content_analysis.get('links_unverified') or 0) + (content_analysis.get('links_skipped') or 0)}
                 - Navigation structure: {content_analysis.get('has_nav')}
             """
         }
@@ -489,5 +1068,8 @@ Format your response as JSON:
             },
             "key_strengths": result.key_strengths,
             "critical_issues": result.critical_issues,
-            "priority_recommendations": result.priority_recommendations
+            "priority_recommendations": result.priority_recommendations,
+            "evaluation_stats": result.evaluation_stats,
+            "content_fingerprint": result.content_fingerprint,
+            "reused": result.reused
         }
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Audit job queue - Durable background execution of website audits.
+
+Submitting a job returns its id immediately; worker threads pick queued jobs
+from a local SQLite table, run them and record per-stage progress and the
+final result. Running jobs hold a lease that a heartbeat renews while the
+job runs, so jobs orphaned by a crashed or restarted worker are re-queued
+once their lease expires. Every claim gets a new lease token, and a worker
+only writes progress or the outcome while it still holds the job's token,
+so a worker that lost its lease cannot overwrite the job's state. The
+runner only computes the result; on_complete (e.g. saving it to history)
+runs once the worker has confirmed it still holds the lease.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+
+# Job statuses
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+class AuditJobQueue:
+    """SQLite-backed job queue with in-process worker threads."""
+
+    def __init__(
+        self,
+        runner: Callable[[str, Dict, Callable[[str, Dict], None]], Dict],
+        path: str = "audit_jobs.db",
+        workers: int = 2,
+        lease_seconds: int = 120,
+        max_attempts: int = 3,
+        on_complete: Optional[Callable[[str, str, Dict], Dict]] = None
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            runner: Callable(user_id, request, progress) that runs one job and
+                returns its JSON-serialisable result; progress(stage, data)
+                reports audit progress (see WebsiteAuditor.audit)
+            path: SQLite database file
+            workers: Number of worker threads started by start()
+            lease_seconds: Seconds without a heartbeat before a running job is
+                considered orphaned and re-queued (renewed every third of it)
+            max_attempts: Attempts before a repeatedly orphaned job is failed
+            on_complete: Optional callable(job_id, user_id, result) that
+                stores a finished job's result and returns what the job
+                records as its result; only called while this worker holds
+                the job's lease, so it runs once per completed job
+        """
+        self.runner = runner
+        self.path = path
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.on_complete = on_complete
+
+        self._local = threading.local()
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS audit_jobs (
+                id TEXT PRIMARY KEY,
+                user_id TEXT,
+                status TEXT NOT NULL,
+                request TEXT NOT NULL,
+                progress TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                lease_token TEXT
+            )
+        """)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(audit_jobs)")}
+        if 'lease_token' not in columns:
+            # Databases created before lease tokens
+            conn.execute("ALTER TABLE audit_jobs ADD COLUMN lease_token TEXT")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_audit_jobs_status_created ON audit_jobs (status, created_at)"
+        )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections are not thread-safe)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    # ==================== Public API ====================
+
+    def submit(self, user_id: str, request: Dict) -> str:
+        """Queue a job and return its id."""
+        job_id = str(uuid.uuid4())
+        progress = {'stage': QUEUED, 'criteria_scored': 0, 'criteria_total': None}
+        self._connection().execute(
+            "INSERT INTO audit_jobs (id, user_id, status, request, progress, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, user_id, QUEUED, json.dumps(request), json.dumps(progress),
+             datetime.utcnow().isoformat(), time.time())
+        )
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return a job's status, progress and result, or None if unknown."""
+        row = self._connection().execute(
+            "SELECT id, user_id, status, progress, result, error, created_at FROM audit_jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        job_id, user_id, status, progress, result, error, created_at = row
+        return {
+            'id': job_id,
+            'user_id': user_id,
+            'status': status,
+            'progress': json.loads(progress),
+            'result': json.loads(result) if result else None,
+            'error': error,
+            'created_at': created_at,
+        }
+
+    def stats(self) -> Dict:
+        """Number of jobs per status."""
+        rows = self._connection().execute(
+            "SELECT status, COUNT(*) FROM audit_jobs GROUP BY status"
+        ).fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, COMPLETED, FAILED)}
+        counts.update(dict(rows))
+        counts['workers'] = len(self._threads)
+        return counts
+
+    def start(self) -> None:
+        """Start worker threads."""
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'audit-job-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Signal workers to stop and wait briefly for them to exit."""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run_forever(self) -> None:
+        """Run workers in the foreground (separate worker process)."""
+        self.start()
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            self.stop()
+
+    # ==================== Workers ====================
+
+    def _work(self) -> None:
+        """Worker loop: claim and run queued jobs until stopped."""
+        while not self._stop.is_set():
+            job = self._claim()
+            if job is None:
+                self._wakeup.wait(1.0)
+                self._wakeup.clear()
+                continue
+            self._run(*job)
+
+    def _claim(self) -> Optional[tuple]:
+        """Atomically move the oldest queued job to running under a new lease token."""
+        conn = self._connection()
+        self._requeue_expired(conn)
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, user_id, request FROM audit_jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (QUEUED,)
+            ).fetchone()
+            lease_token = uuid.uuid4().hex
+            if row is not None:
+                conn.execute(
+                    "UPDATE audit_jobs SET status = ?, attempts = attempts + 1, updated_at = ?, lease_token = ? "
+                    "WHERE id = ?",
+                    (RUNNING, time.time(), lease_token, row[0])
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        if row is None:
+            return None
+        job_id, user_id, request = row
+        return job_id, user_id, json.loads(request), lease_token
+
+    def _requeue_expired(self, conn: sqlite3.Connection) -> None:
+        """Re-queue running jobs whose lease expired (their worker died)."""
+        expired_before = time.time() - self.lease_seconds
+        conn.execute(
+            "UPDATE audit_jobs SET status = ?, error = 'Worker stopped; too many attempts' "
+            "WHERE status = ? AND updated_at < ? AND attempts >= ?",
+            (FAILED, RUNNING, expired_before, self.max_attempts)
+        )
+        conn.execute(
+            "UPDATE audit_jobs SET status = ? WHERE status = ? AND updated_at < ?",
+            (QUEUED, RUNNING, expired_before)
+        )
+
+    def _update_leased(self, job_id: str, lease_token: str, assignments: str, values: tuple) -> bool:
+        """
+        Update a running job only while this worker still holds its lease.
+
+        Returns:
+            False if the lease was lost (job re-queued, reclaimed or failed)
+        """
+        return self._connection().execute(
+            f"UPDATE audit_jobs SET {assignments}, updated_at = ? "
+            "WHERE id = ? AND status = ? AND lease_token = ?",
+            (*values, time.time(), job_id, RUNNING, lease_token)
+        ).rowcount == 1
+
+    def _heartbeat(self, job_id: str, lease_token: str, done: threading.Event) -> None:
+        """Renew a running job's lease until done is set or the lease is lost."""
+        interval = max(1.0, self.lease_seconds / 3)
+        while not done.wait(interval):
+            if not self._update_leased(job_id, lease_token, "lease_token = lease_token", ()):
+                print(f"⚠️ Audit job {job_id} lost its lease")
+                return
+
+    def _run(self, job_id: str, user_id: str, request: Dict, lease_token: str) -> None:
+        """Run one job, recording progress and the outcome."""
+        progress = {'stage': RUNNING, 'criteria_scored': 0, 'criteria_total': None}
+        progress_lock = threading.Lock()
+
+        def report(stage: str, data: Dict) -> None:
+            # May be called from the audit's own threads
+            with progress_lock:
+                if stage == 'criterion':
+                    progress['stage'] = 'scoring'
+                    progress['criteria_scored'] = data.get('completed', 0)
+                    progress['criteria_total'] = data.get('total')
+                else:
+                    progress['stage'] = stage
+                self._update_leased(job_id, lease_token, "progress = ?", (json.dumps(progress),))
+
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(job_id, lease_token, done),
+            name=f'audit-job-heartbeat-{job_id[:8]}', daemon=True
+        )
+        heartbeat.start()
+        try:
+            result = self.runner(user_id, request, report)
+            progress['stage'] = COMPLETED
+            # Side effects only while this worker still owns the job
+            recorded = self._update_leased(job_id, lease_token, "lease_token = lease_token", ())
+            if recorded and self.on_complete is not None:
+                result = self.on_complete(job_id, user_id, result)
+            recorded = recorded and self._update_leased(
+                job_id, lease_token, "status = ?, progress = ?, result = ?",
+                (COMPLETED, json.dumps(progress), json.dumps(result))
+            )
+        except Exception as e:
+            print(f"❌ Audit job {job_id} failed: {str(e)}")
+            recorded = self._update_leased(job_id, lease_token, "status = ?, error = ?", (FAILED, str(e)))
+        finally:
+            done.set()
+            heartbeat.join()
+        if not recorded:
+            print(f"⚠️ Audit job {job_id} outcome discarded: lease lost to another attempt")
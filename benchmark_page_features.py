@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark page feature extraction.
+
+Compares the single-pass extractor used by page snapshots
+(page_snapshot.extract_features) against the previous audit code path,
+which parsed the HTML twice and walked the tree once per find()/find_all()
+call, always with the pure-Python 'html.parser' backend. The single-pass
+path uses the default backend from html_parser (lxml when installed; set
+HTML_PARSER_BACKEND to compare others). Both produce the auditor's metadata
+and content_analysis fields; the benchmark checks they agree before timing
+them.
+
+Usage:
+    python benchmark_page_features.py saved_pages/*.html
+    python benchmark_page_features.py --synthetic 5 --size-mb 2
+"""
+
+import argparse
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from bs4 import BeautifulSoup
+
+from html_parser import DEFAULT_BACKEND, parse_html
+from page_snapshot import extract_features
+
+
+def legacy_extract(content: bytes) -> Tuple[Dict, Dict]:
+    """Metadata and content analysis as computed before single-pass extraction."""
+    # WebsiteAuditor._fetch_website
+    soup = BeautifulSoup(content, 'html.parser')
+
+    def get_meta_content(name):
+        meta = soup.find('meta', {'name': name}) or soup.find('meta', {'property': name})
+        return meta.get('content', '') if meta else ''
+
+    metadata = {
+        'title': soup.find('title').text if soup.find('title') else '',
+        'meta_description': get_meta_content('description'),
+        'og_title': get_meta_content('og:title'),
+        'og_description': get_meta_content('og:description'),
+        'viewport': get_meta_content('viewport'),
+        'charset': soup.find('meta', {'charset': True}) is not None,
+    }
+
+    # WebsiteAuditor._analyze_content (re-parses the same HTML)
+    soup = BeautifulSoup(content.decode('utf-8', errors='replace'), 'html.parser')
+    content_analysis = {
+        'has_h1': bool(soup.find('h1')),
+        'h1_count': len(soup.find_all('h1')),
+        'has_nav': bool(soup.find('nav')),
+        'has_footer': bool(soup.find('footer')),
+        'has_main': bool(soup.find('main')),
+        'img_count': len(soup.find_all('img')),
+        'img_with_alt': len([img for img in soup.find_all('img') if img.get('alt')]),
+        'form_count': len(soup.find_all('form')),
+        'button_count': len(soup.find_all('button')),
+        'link_count': len(soup.find_all('a')),
+        'word_count': len(soup.get_text().split()),
+        'title_length': len(soup.find('title').text) if soup.find('title') else 0,
+    }
+    content_analysis['link_sample'] = [a.get('href') for a in soup.find_all('a', href=True)[:10]]
+    return metadata, content_analysis
+
+
+def single_pass_extract(content: bytes) -> Tuple[Dict, Dict]:
+    """Metadata and content analysis from one parse and one traversal."""
+    features = extract_features(parse_html(content))
+    content_analysis = dict(features['structure'])
+    content_analysis['link_sample'] = features['links'][:10]
+    return features['metadata'], content_analysis
+
+
+def synthetic_page(size_mb: float, seed: int) -> bytes:
+    """Generate a large marketing-style page of roughly size_mb megabytes."""
+    rng = random.Random(seed)
+    words = ('growth platform secure fast team pricing customers trusted analytics '
+             'enterprise launch simple modern cloud support demo free trial').split()
+
+    def sentence(n):
+        return ' '.join(rng.choice(words) for _ in range(n))
+
+    head = (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        f'<title>{sentence(6)} | Example</title>'
+        f'<meta name="description" content="{sentence(20)}">'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        f'<meta property="og:title" content="{sentence(5)}">'
+        '<style>' + '.c{color:red}' * 200 + '</style>'
+        '<script>' + 'var x=1;' * 500 + '</script></head><body>'
+        '<nav>' + ''.join(f'<a href="/p{i}">{sentence(2)}</a>' for i in range(30)) + '</nav><main>'
+    )
+    sections = []
+    target = int(size_mb * 1024 * 1024)
+    length = len(head)
+    i = 0
+    while length < target:
+        section = (
+            f'<section id="s{i}"><h2>{sentence(5)}</h2>'
+            f'<div class="row"><div class="col"><p>{sentence(60)}</p>'
+            f'<img src="/img/{i}.png"{" alt=" + repr(sentence(3)) if i % 3 else ""}>'
+            f'<a href="https://example.com/{i}">{sentence(3)}</a>'
+            f'<!-- {sentence(4)} --><button>{sentence(2)}</button></div></div>'
+            + (f'<form><input name="q{i}"><button>Go</button></form>' if i % 20 == 0 else '')
+            + '</section>'
+        )
+        sections.append(section)
+        length += len(section)
+        i += 1
+    tail = '<h1>Welcome</h1></main><footer>' + sentence(30) + '</footer></body></html>'
+    return (head + ''.join(sections) + tail).encode('utf-8')
+
+
+def time_it(func, content: bytes, repeat: int) -> float:
+    """Median wall-clock seconds of func(content) over repeat runs."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(content)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    """Run the benchmark over saved pages or synthetic ones."""
+    parser = argparse.ArgumentParser(description='Benchmark single-pass page feature extraction')
+    parser.add_argument('pages', nargs='*', help='Saved HTML pages to benchmark')
+    parser.add_argument('--synthetic', type=int, default=3, help='Synthetic pages to generate when no pages are given')
+    parser.add_argument('--size-mb', type=float, default=2.0, help='Size of each synthetic page (MB)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per page (median is reported)')
+    args = parser.parse_args()
+
+    corpus: List[Tuple[str, bytes]] = [(path, Path(path).read_bytes()) for path in args.pages]
+    if not corpus:
+        corpus = [
+            (f'synthetic-{i}', synthetic_page(args.size_mb, seed=i))
+            for i in range(args.synthetic)
+        ]
+
+    print(f"Single-pass parser backend: {DEFAULT_BACKEND}")
+    print(f"{'page':<40} {'size':>8} {'legacy':>9} {'single':>9} {'speedup':>8}")
+    total_legacy = total_single = 0.0
+    for name, content in corpus:
+        if legacy_extract(content) != single_pass_extract(content):
+            print(f"⚠️ {name}: single-pass results differ from the legacy extraction")
+
+        legacy = time_it(legacy_extract, content, args.repeat)
+        single = time_it(single_pass_extract, content, args.repeat)
+        total_legacy += legacy
+        total_single += single
+        print(f"{name[-40:]:<40} {len(content) / 1048576:>6.2f}MB {legacy:>8.3f}s {single:>8.3f}s {legacy / single:>7.2f}x")
+
+    print(f"{'total':<40} {'':>8} {total_legacy:>8.3f}s {total_single:>8.3f}s {total_legacy / total_single:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
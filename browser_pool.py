@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Browser pool - Long-lived headless Chromium instances for HTML/CSS PDF rendering.
+
+Launching Chromium costs 1-2 s per PDF, so the pool keeps N browsers warm and
+renders into a fresh (cheap) browser context per PDF. Playwright's sync API is
+bound to the thread that started it, so each browser is owned by its own
+worker thread; renders are handed to the workers through a bounded queue,
+which gives callers backpressure instead of an unbounded pile-up of Chromium
+pages. Browsers are health-checked before every render and recycled after a
+fixed number of renders to keep memory in check.
+
+A worker whose Playwright driver fails (or that hits any unexpected error)
+fails the render in hand and restarts itself after a short backoff. After
+repeated consecutive crashes it gives up; when no worker is left, queued
+renders are failed and new ones are rejected for a cooldown period before
+the pool tries to start again.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, Optional
+
+try:
+    from playwright.sync_api import sync_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+
+
+# Chromium flags added when the sandbox is disabled (PDF_BROWSER_NO_SANDBOX), for
+# containers that cannot provide it; pooled browsers keep the sandbox by default
+NO_SANDBOX_ARGS = ['--no-sandbox', '--disable-setuid-sandbox']
+
+DEFAULT_PDF_OPTIONS = {'format': 'A4', 'print_background': True}
+
+
+class BrowserPoolBusy(Exception):
+    """Raised when the render queue is full."""
+
+
+class BrowserPoolUnavailable(BrowserPoolBusy):
+    """Raised while no browser worker can run (Playwright keeps failing)."""
+
+
+class BrowserPool:
+    """Pool of warm Chromium browsers, each driven by its own worker thread."""
+
+    # Consecutive worker crashes before a worker gives up
+    MAX_WORKER_CRASHES = 3
+    # Seconds new renders are rejected after every worker gave up
+    UNAVAILABLE_COOLDOWN = 30.0
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_renders: int = 100,
+        queue_size: int = 16,
+        render_timeout: float = 60.0,
+        no_sandbox: bool = False
+    ):
+        """
+        Initialize the pool. Browsers are launched by start().
+
+        Args:
+            size: Number of browsers (and worker threads)
+            max_renders: Renders per browser before it is closed and relaunched
+            queue_size: Maximum renders waiting for a free browser
+            render_timeout: Seconds a caller waits for a queued render
+            no_sandbox: Launch Chromium without its sandbox (only for
+                containers where the sandbox cannot run)
+        """
+        self.size = max(1, size)
+        self.max_renders = max(1, max_renders)
+        self.render_timeout = render_timeout
+        self.launch_args = list(NO_SANDBOX_ARGS) if no_sandbox else []
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._threads = []
+        self._lock = threading.Lock()
+        self._closing = threading.Event()
+        self._unavailable_until = 0.0
+        self._unavailable_error: Optional[str] = None
+        self._counters = {
+            'renders': 0, 'failures': 0, 'launches': 0, 'recycles': 0, 'rejected': 0, 'worker_crashes': 0
+        }
+
+    # ==================== Public API ====================
+
+    def start(self) -> None:
+        """Start the worker threads; each launches its browser immediately."""
+        if not PLAYWRIGHT_AVAILABLE:
+            raise Exception("Playwright not installed. Install with: pip install playwright")
+
+        with self._lock:
+            if self._threads:
+                return
+            if time.monotonic() < self._unavailable_until:
+                self._counters['rejected'] += 1
+                raise BrowserPoolUnavailable(f"PDF rendering unavailable: {self._unavailable_error}")
+            self._closing.clear()
+            for i in range(self.size):
+                thread = threading.Thread(target=self._work, name=f'browser-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(
+        self,
+        html: str,
+        pdf_options: Optional[Dict] = None,
+        viewport: Optional[Dict] = None,
+        wait_until: str = 'networkidle',
+        block: bool = False
+    ) -> Future:
+        """
+        Queue an HTML document for rendering.
+
+        Args:
+            html: Complete HTML document
+            pdf_options: Options for page.pdf() (defaults to A4 with backgrounds)
+            viewport: Optional viewport, e.g. {'width': 1024, 'height': 1280}
+            wait_until: Load state to wait for after setting the content
+            block: Wait up to render_timeout for queue space instead of
+                failing immediately when the queue is full
+
+        Returns:
+            Future resolving to the PDF bytes
+
+        Raises:
+            BrowserPoolBusy: If the render queue is full
+            BrowserPoolUnavailable: If no browser worker can currently run
+        """
+        self.start()
+
+        future: Future = Future()
+        job = (html, pdf_options or DEFAULT_PDF_OPTIONS, viewport, wait_until, future)
+        try:
+            self._queue.put(job, block=block, timeout=self.render_timeout if block else None)
+        except queue.Full:
+            self._count('rejected')
+            raise BrowserPoolBusy("PDF render queue is full, try again shortly")
+        return future
+
+    def render_pdf(
+        self,
+        html: str,
+        pdf_options: Optional[Dict] = None,
+        viewport: Optional[Dict] = None,
+        wait_until: str = 'networkidle'
+    ) -> bytes:
+        """Render an HTML document to PDF bytes, waiting for a free browser."""
+        future = self.submit(html, pdf_options, viewport, wait_until, block=True)
+        try:
+            return future.result(timeout=self.render_timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"PDF rendering timed out after {self.render_timeout:g} seconds")
+
+    def stats(self) -> Dict:
+        """Render counters plus current queue depth."""
+        with self._lock:
+            stats = dict(self._counters)
+        stats.update({
+            'browsers': len(self._threads),
+            'unavailable': time.monotonic() < self._unavailable_until,
+            'queued': self._queue.qsize(),
+            'max_renders': self.max_renders,
+        })
+        return stats
+
+    def close(self) -> None:
+        """Stop the workers and close their browsers; queued renders are failed."""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        self._closing.set()
+        for _ in threads:
+            try:
+                # Wake an idle worker; with a full queue the workers see
+                # the closing flag after their current render instead
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        for thread in threads:
+            thread.join(10)
+        self._fail_queued("PDF browser pool closed")
+
+    # ==================== Workers ====================
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _launch(self, playwright):
+        """Launch a browser, returning None if Chromium fails to start."""
+        self._count('launches')
+        try:
+            return playwright.chromium.launch(headless=True, args=self.launch_args)
+        except Exception as e:
+            print(f"❌ Failed to launch Chromium: {str(e)}")
+            return None
+
+    def _fail_queued(self, error: str) -> None:
+        """Fail every render still waiting in the queue."""
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if job is not None and job[-1].set_running_or_notify_cancel():
+                job[-1].set_exception(BrowserPoolUnavailable(error))
+
+    def _work(self) -> None:
+        """Worker thread: run the render loop, restarting it after crashes."""
+        crashes = 0
+        last_error = "worker stopped"
+        while not self._closing.is_set():
+            current: Dict = {}
+            try:
+                self._serve(current)
+                return  # Stopped by close()
+            except Exception as e:
+                crashes = 0 if current.get('rendered') else crashes
+                crashes += 1
+                last_error = str(e) or type(e).__name__
+                self._count('worker_crashes')
+                print(f"❌ PDF browser worker crashed ({crashes}/{self.MAX_WORKER_CRASHES}): {str(e)}")
+                future = current.get('future')
+                if future is not None and not future.done():
+                    future.set_exception(e)
+                if crashes >= self.MAX_WORKER_CRASHES:
+                    break
+                self._closing.wait(min(10.0, 2 ** (crashes - 1)))
+
+        # Giving up: when no worker is left, stop accepting renders for a while
+        with self._lock:
+            if threading.current_thread() in self._threads:
+                self._threads.remove(threading.current_thread())
+            last = not self._threads
+            if last and not self._closing.is_set():
+                self._unavailable_until = time.monotonic() + self.UNAVAILABLE_COOLDOWN
+                self._unavailable_error = f"browser workers keep crashing ({last_error})"
+        if last:
+            self._fail_queued(f"PDF rendering unavailable: browser workers keep crashing ({last_error})")
+
+    def _serve(self, current: Dict) -> None:
+        """Render loop: own one browser and render queued documents with it."""
+        with sync_playwright() as playwright:
+            browser = self._launch(playwright)
+            renders = 0
+
+            while not self._closing.is_set():
+                try:
+                    job = self._queue.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+                if job is None:
+                    break
+
+                html, pdf_options, viewport, wait_until, future = job
+                if not future.set_running_or_notify_cancel():
+                    continue
+                current['future'] = future
+
+                # Health check: relaunch a crashed, failed or recycled browser
+                if browser is None or renders >= self.max_renders or not browser.is_connected():
+                    if browser is not None:
+                        if renders >= self.max_renders:
+                            self._count('recycles')
+                        _close_quietly(browser)
+                    browser = self._launch(playwright)
+                    renders = 0
+                    if browser is None:
+                        self._count('failures')
+                        future.set_exception(Exception("Chromium could not be launched"))
+                        continue
+
+                try:
+                    context = browser.new_context(viewport=viewport) if viewport else browser.new_context()
+                    try:
+                        page = context.new_page()
+                        page.set_content(html, wait_until=wait_until)
+                        pdf_bytes = page.pdf(**pdf_options)
+                    finally:
+                        context.close()
+                    renders += 1
+                    self._count('renders')
+                    current['rendered'] = True
+                    future.set_result(pdf_bytes)
+                except Exception as e:
+                    self._count('failures')
+                    print(f"❌ PDF render failed: {str(e)}")
+                    future.set_exception(e)
+
+            if browser is not None:
+                _close_quietly(browser)
+
+
+def _close_quietly(browser) -> None:
+    """Close a browser, ignoring errors from one that already died."""
+    try:
+        browser.close()
+    except Exception:
+        pass
+
+
+_default_pool: Optional[BrowserPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool() -> BrowserPool:
+    """
+    Process-wide browser pool configured from the environment.
+
+    PDF_BROWSER_POOL_SIZE (default 2), PDF_BROWSER_MAX_RENDERS (default 100),
+    PDF_RENDER_QUEUE_SIZE (default 16), PDF_RENDER_TIMEOUT_SECONDS (default 60),
+    PDF_BROWSER_NO_SANDBOX (default false; set to true only in containers that
+    cannot run the Chromium sandbox).
+    """
+    global _default_pool
+
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = BrowserPool(
+                size=int(os.getenv('PDF_BROWSER_POOL_SIZE', 2)),
+                max_renders=int(os.getenv('PDF_BROWSER_MAX_RENDERS', 100)),
+                queue_size=int(os.getenv('PDF_RENDER_QUEUE_SIZE', 16)),
+                render_timeout=float(os.getenv('PDF_RENDER_TIMEOUT_SECONDS', 60)),
+                no_sandbox=os.getenv('PDF_BROWSER_NO_SANDBOX', 'false').lower() in ('1', 'true', 'yes')
+            )
+            atexit.register(_default_pool.close)
+        return _default_pool
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Charset handling - Decode page bodies once, cheaply, while they stream in.
+
+requests' response.text runs charset_normalizer over the whole body when the
+server omits a charset, which takes hundreds of milliseconds on large pages.
+BodyDecoder picks the encoding with a fast path instead:
+
+1. charset from the Content-Type header
+2. byte order mark
+3. <meta charset> / http-equiv declaration in the first few KB
+4. UTF-8, decoded strictly
+5. only if UTF-8 fails: a detector run over a bounded sample
+
+The body is decoded once, incrementally, and the text is handed to every
+parser consumer.
+"""
+
+import codecs
+import re
+from typing import List, Optional
+
+try:
+    from charset_normalizer import from_bytes as detect_charset
+except ImportError:
+    detect_charset = None
+
+
+# Bytes searched for a <meta charset> declaration
+META_SNIFF_BYTES = 4096
+
+# Bytes handed to the detector when nothing else identifies the encoding
+DETECT_SAMPLE_BYTES = 64 * 1024
+
+# Encoding used when the detector is unavailable or undecided
+FALLBACK_ENCODING = 'cp1252'
+
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-z0-9_:.-]+)', re.IGNORECASE)
+_HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?\s*([a-z0-9_:.-]+)', re.IGNORECASE)
+
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def normalize_encoding(name: Optional[str]) -> Optional[str]:
+    """
+    Python codec name for a declared charset, or None if it is unknown.
+
+    Latin-1 and ASCII labels are read as windows-1252, as browsers do.
+    """
+    if not name:
+        return None
+    try:
+        codec = codecs.lookup(name.strip()).name
+    except LookupError:
+        return None
+    if codec in ('latin-1', 'iso8859-1', 'ascii'):
+        return 'cp1252'
+    return codec
+
+
+def header_charset(content_type: Optional[str]) -> Optional[str]:
+    """charset parameter of a Content-Type header, if declared and known."""
+    match = _HEADER_CHARSET_RE.search(content_type or '')
+    return normalize_encoding(match.group(1)) if match else None
+
+
+def sniff_charset(prefix: bytes) -> Optional[str]:
+    """Encoding from a byte order mark or <meta> declaration in prefix."""
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+
+    match = _META_CHARSET_RE.search(prefix[:META_SNIFF_BYTES])
+    if match:
+        return normalize_encoding(match.group(1).decode('ascii', 'ignore'))
+    return None
+
+
+def detect_encoding(sample: bytes) -> str:
+    """Best-guess encoding of a bounded sample of the body."""
+    if detect_charset is not None:
+        best = detect_charset(sample[:DETECT_SAMPLE_BYTES]).best()
+        if best is not None:
+            return normalize_encoding(best.encoding) or FALLBACK_ENCODING
+    return FALLBACK_ENCODING
+
+
+class BodyDecoder:
+    """Incremental decoder for a streamed page body."""
+
+    def __init__(self, declared_encoding: Optional[str] = None):
+        """
+        Initialize the decoder.
+
+        Args:
+            declared_encoding: charset from the Content-Type header, if any
+        """
+        self.encoding = normalize_encoding(declared_encoding)
+        self.source = 'header' if self.encoding else None
+
+        self._raw = bytearray()
+        self._parts: List[str] = []
+        self._decoded = 0
+        self._decoder = None
+        self._strict = False
+
+    @property
+    def content(self) -> bytes:
+        """Raw body bytes received so far."""
+        return bytes(self._raw)
+
+    def feed(self, chunk: bytes) -> None:
+        """Add a chunk of the body and decode what can be decoded."""
+        self._raw += chunk
+        if self._decoder is None and len(self._raw) < META_SNIFF_BYTES:
+            # Wait for enough bytes to sniff a <meta charset> declaration
+            return
+        self._decode(final=False)
+
+    def finish(self, complete: bool = True) -> str:
+        """
+        Decode the remaining bytes and return the full text.
+
+        Args:
+            complete: False when the body was cut off; an incomplete
+                multi-byte character at the end is then dropped
+        """
+        self._decode(final=complete)
+        return ''.join(self._parts)
+
+    def _start(self) -> None:
+        """Choose the encoding once the first bytes have arrived."""
+        if self.encoding is None:
+            self.encoding = sniff_charset(bytes(self._raw[:META_SNIFF_BYTES]))
+            self.source = 'meta' if self.encoding else None
+
+        if self.encoding is None:
+            # Tentative UTF-8: strict, so a wrong guess is noticed
+            self.encoding = 'utf-8'
+            self.source = 'utf-8'
+            self._strict = True
+
+        self._decoder = codecs.getincrementaldecoder(self.encoding)(
+            errors='strict' if self._strict else 'replace'
+        )
+
+    def _decode(self, final: bool) -> None:
+        if self._decoder is None:
+            self._start()
+
+        pending = bytes(self._raw[self._decoded:])
+        try:
+            self._parts.append(self._decoder.decode(pending, final))
+        except UnicodeDecodeError:
+            # Not UTF-8 after all: detect on a bounded sample and re-decode
+            self.encoding = detect_encoding(bytes(self._raw[:DETECT_SAMPLE_BYTES]))
+            self.source = 'detected'
+            self._strict = False
+            self._decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+            self._parts = [self._decoder.decode(bytes(self._raw), final)]
+        self._decoded = len(self._raw)
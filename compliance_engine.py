@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Compliance engine - Multi-jurisdiction legal compliance assessment.
+
+Each jurisdiction is assessed by its own Claude call, and the calls run
+concurrently, so latency no longer grows with the number of jurisdictions
+and one bad reply cannot corrupt the others. All calls share the same
+tools and system prefix (instructions plus the site content), which is
+marked for Anthropic prompt caching. Only the short jurisdiction section in
+the user turn differs. A jurisdiction whose call fails with a retryable
+error is retried on its own, and one that still fails is reported as failed
+without discarding the others.
+
+When deterministic pre-checks are supplied (see compliance_signals), the
+site block carries their evidence table and only a short excerpt of the page
+text, since most checklist items are already decided by the table.
+
+The cross-jurisdiction summary (overall score, highest risk level, critical
+issues, remediation roadmap) is computed deterministically from the
+per-jurisdiction assessments rather than asked of the model.
+"""
+
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from llm_cache import LLMResponseCache
+from llm_gateway import INTERACTIVE, LLMGateway, get_llm_gateway, is_retryable, usage_to_dict
+from structured_output import complete_structured
+
+
+RiskLevel = Literal['Critical', 'High', 'Medium', 'Low']
+
+# Most severe first
+RISK_LEVELS = ('Critical', 'High', 'Medium', 'Low')
+
+# Category priority -> remediation roadmap bucket
+ROADMAP_BUCKETS = {
+    'Immediate': 'immediate',
+    'Short-term': 'short_term',
+    'Long-term': 'long_term',
+}
+
+
+class CategoryAssessment(BaseModel):
+    """Claude's assessment of one compliance category."""
+    status: Literal['Compliant', 'Partially Compliant', 'Non-Compliant']
+    risk_level: RiskLevel
+    findings: List[str] = Field(description="Specific findings with evidence from the website (max 200 chars each)")
+    recommendations: List[str] = Field(description="Actionable remediation steps (max 200 chars each)")
+    priority: Literal['Immediate', 'Short-term', 'Long-term']
+
+
+class JurisdictionAssessment(BaseModel):
+    """Claude's assessment of one jurisdiction."""
+    score: int = Field(ge=0, le=100, description="Compliance score from 0 to 100")
+    categories: Dict[str, CategoryAssessment] = Field(
+        description="Assessment per category, keyed by category id (see instructions)"
+    )
+    critical_issues: List[str] = Field(description="The most serious compliance issues found")
+
+
+class ComplianceAssessmentError(Exception):
+    """Raised when a jurisdiction still cannot be assessed after its retries."""
+
+
+class ComplianceEngine:
+    """Assesses a website's compliance with one concurrent Claude call per jurisdiction."""
+
+    MODEL = "claude-sonnet-4-5"
+    MAX_TOKENS = 4096  # Per jurisdiction
+
+    # Characters of page text included in the prompt
+    MAX_CONTENT_CHARS = 5000
+    # ... when an evidence table of deterministic pre-checks is included
+    EVIDENCE_CONTENT_CHARS = 1500
+
+    JURISDICTION_SECTIONS = {
+        'AU': """
+AUSTRALIA COMPLIANCE EVALUATION
+================================
+Evaluate against:
+- Competition and Consumer Act 2010 (Australian Consumer Law / ACL)
+- Privacy Act 1988 (Australian Privacy Principles - APPs)
+- Spam Act 2003
+- Do Not Call Register Act 2006
+- AANA Code of Ethics & Advertising Standards
+- Fair Trading Act
+- Website Accessibility (WCAG 2.1 Level AA)
+
+Check for:
+- ACL Compliance (s18: misleading/deceptive conduct, pricing clarity, claims substantiation)
+- Privacy Policy (clear, accessible, APP1-13 compliance)
+- Cookie consent and tracking disclosures
+- Unsubscribe links and marketing opt-out mechanisms
+- Business registration info (ABN/ACN)
+- Contact information and support mechanisms
+- Terms of Service fairness and enforceability
+- Refund/return policy compliance
+- HTTPS/SSL certificate presence
+- Security headers implementation
+- Accessibility compliance (alt text, captions, keyboard navigation)
+""",
+        'NZ': """
+NEW ZEALAND COMPLIANCE EVALUATION
+==================================
+Evaluate against:
+- Consumer Guarantees Act 1993
+- Privacy Act 2020
+- Spam Act 2003
+- Fair Trading Act 1986
+- Disable Discrimination Act 1993
+- Health and Safety at Work Act 2015 (if applicable)
+
+Check for:
+- Privacy Policy (NZ Privacy Act compliant)
+- Clear terms and conditions
+- Consumer guarantee disclosures
+- Fair pricing and no misleading claims
+- Contact information and dispute resolution
+- Data security measures
+- Accessibility compliance
+- Marketing consent mechanisms
+""",
+        'GDPR': """
+GDPR COMPLIANCE EVALUATION (European Union)
+============================================
+Evaluate against:
+- General Data Protection Regulation (GDPR) Articles 5-49
+- ePrivacy Directive and EDPB Guidelines
+- GDPR Recitals and guidance
+
+Check for:
+- Valid lawful basis for processing (consent, contract, legitimate interest)
+- GDPR-compliant privacy notice (transparent, concise, easily accessible)
+- Data controller information clearly identified
+- Data Processing Agreement if using processors
+- Cookie consent mechanism (EDPB: explicit opt-in before non-essential cookies)
+- Cookie categories: essential, analytics, marketing, functional
+- Cookie policy explaining all cookies and their purposes
+- User rights implementation: access, rectification, erasure, portability, objection
+- Cross-border transfer mechanisms (SCCs, adequacy decisions, BCRs)
+- Data retention and deletion policies
+- Breach notification process and GDPR compliance
+- Data Protection Impact Assessment (DPIA) documentation
+- Right to lodge complaints with DPA
+- Sub-processor transparency
+- Appropriate security measures (encryption, access controls)
+""",
+        'CCPA': """
+CCPA/CPRA COMPLIANCE EVALUATION (California)
+=============================================
+Evaluate against:
+- California Consumer Privacy Act (CCPA)
+- California Privacy Rights Act (CPRA) amendments
+- California's Consumer Legal Remedies Act
+
+Check for:
+- Lawful basis for data collection and sale
+- Consumer disclosures: what data is collected, purposes, retention
+- "Do Not Sell My Personal Information" link (clear, conspicuous)
+- "Limit the Use and Disclosure of My Sensitive Personal Information" option
+- Consumer rights implementation: access, deletion, opt-out of sale
+- Opt-in requirement before selling personal information
+- Privacy policy addressing all required disclosures
+- Service provider contracts for data processors
+- No discrimination for exercising CCPA rights
+- Reasonable security practices
+- Age-appropriate privacy practices
+- Sale of data to third parties disclosure
+- Business operations disclosure
+- Contact information for privacy inquiries
+""",
+    }
+
+    INSTRUCTIONS = """You are an expert legal compliance analyst specializing in international privacy law, consumer protection regulations, and digital compliance standards.
+
+You analyze website content and metadata for legal and regulatory compliance. Each request names one jurisdiction and the laws and checks that apply to it.
+
+When an AUTOMATED CHECKS table is provided, its results were detected mechanically from the page's HTML and response headers and are reliable: base findings about policy links, consent mechanisms, business identifiers, unsubscribe options, HTTPS and security headers on it and do not contradict it. Use the page excerpt for everything else (claims, pricing, wording).
+
+AUDIT OUTPUT:
+Record the audit with the record_jurisdiction_assessment tool. Assess these categories, keyed by these ids:
+- acl_compliance (consumer law: misleading claims, pricing, guarantees)
+- privacy_data_protection
+- advertising_marketing
+- security_trust
+- accessibility
+- ecommerce_terms
+
+For the requested jurisdiction:
+1. Assess compliance status
+2. Identify critical, high, medium, and low risk issues
+3. Provide specific findings with evidence from the website (keep findings concise, max 200 chars)
+4. Give actionable recommendations for remediation (keep recommendations concise, max 200 chars)
+5. Prioritize actions (Immediate = within 0-30 days, Short-term = 1-3 months, Long-term = 3-6 months)
+
+Be thorough, specific, and provide practical guidance for business owners to achieve compliance."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[LLMResponseCache] = None,
+        max_concurrency: int = 4,
+        retries: int = 1,
+        gateway: Optional[LLMGateway] = None,
+        priority: int = INTERACTIVE
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            api_key: Anthropic API key
+            cache: Optional response cache for Claude replies
+            max_concurrency: Jurisdictions assessed in parallel
+            retries: Extra attempts for a jurisdiction whose call fails
+            gateway: LLM gateway Claude calls are scheduled on (defaults to the shared one)
+            priority: Gateway priority class (INTERACTIVE or BATCH)
+        """
+        self.api_key = api_key
+        self.gateway = gateway or get_llm_gateway()
+        self.priority = priority
+        self.cache = cache
+        self.max_concurrency = max(1, max_concurrency)
+        self.retries = max(0, retries)
+        self._stats_lock = threading.Lock()
+
+    def assess(
+        self,
+        site_content: str,
+        site_metadata: Dict,
+        jurisdictions: List[str],
+        evidence: Optional[str] = None
+    ) -> Dict:
+        """
+        Assess a website against each requested jurisdiction.
+
+        Args:
+            site_content: Readable page text
+            site_metadata: url, title and meta_description of the page
+            jurisdictions: Jurisdiction codes (keys of JURISDICTION_SECTIONS)
+            evidence: Optional evidence table of deterministic pre-checks
+                (compliance_signals.evidence_table); the page text is then
+                cut to EVIDENCE_CONTENT_CHARS
+
+        Returns:
+            Dictionary with jurisdictions (per-jurisdiction assessments; a
+            jurisdiction that could not be assessed maps to {"error": ...}),
+            failed_jurisdictions, overall_score, highest_risk_level,
+            critical_issues, remediation_roadmap and evaluation_stats
+
+        Raises:
+            ValueError: If a jurisdiction is not supported
+            ComplianceAssessmentError: If no jurisdiction could be assessed
+        """
+        unsupported = [code for code in jurisdictions if code not in self.JURISDICTION_SECTIONS]
+        if unsupported:
+            raise ValueError(
+                f"Unsupported jurisdictions: {', '.join(unsupported)}. "
+                f"Supported: {', '.join(self.JURISDICTION_SECTIONS)}"
+            )
+        jurisdictions = list(dict.fromkeys(jurisdictions))
+
+        stats = {
+            "llm_calls": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "llm_cache_hits": 0,
+            "retried_jurisdictions": [],
+        }
+        system = self._build_site_prompt(site_content, site_metadata, evidence)
+
+        workers = min(self.max_concurrency, len(jurisdictions)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                code: executor.submit(self._assess_jurisdiction, code, system, stats)
+                for code in jurisdictions
+            }
+            assessments = {}
+            failures = {}
+            for code, future in futures.items():
+                try:
+                    assessments[code] = future.result()
+                except ComplianceAssessmentError as e:
+                    failures[code] = str(e)
+
+        if not assessments:
+            raise ComplianceAssessmentError("; ".join(failures.values()))
+
+        return {
+            **self.merge(assessments, failures),
+            "evaluation_stats": stats,
+        }
+
+    def _build_site_prompt(
+        self,
+        site_content: str,
+        site_metadata: Dict,
+        evidence: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Build the cacheable system prefix shared by every jurisdiction call.
+
+        It holds the analyst instructions and the site block, so it is
+        byte-identical across the jurisdiction calls of an assessment and
+        can be served from Anthropic's prompt cache.
+        """
+        if evidence:
+            site_block = f"""AUTOMATED CHECKS:
+{evidence}
+
+WEBSITE CONTENT (excerpt):
+{site_content[:self.EVIDENCE_CONTENT_CHARS]}
+"""
+        else:
+            site_block = f"""WEBSITE CONTENT:
+{site_content[:self.MAX_CONTENT_CHARS]}
+"""
+        site_block += f"""
+WEBSITE METADATA:
+- Title: {site_metadata.get('title', 'N/A')}
+- Meta Description: {site_metadata.get('meta_description', 'N/A')}
+- URL: {site_metadata.get('url', 'N/A')}
+"""
+        return [
+            {"type": "text", "text": self.INSTRUCTIONS},
+            {"type": "text", "text": site_block, "cache_control": {"type": "ephemeral"}},
+        ]
+
+    def _assess_jurisdiction(self, code: str, system: List[Dict], stats: Dict) -> JurisdictionAssessment:
+        """Assess one jurisdiction, retrying the call on failure."""
+        prompt = f"""Analyze the website above for compliance in this jurisdiction: {code}.
+{self.JURISDICTION_SECTIONS[code]}
+Record the assessment with the record_jurisdiction_assessment tool."""
+
+        request = {
+            "model": self.MODEL,
+            "max_tokens": self.MAX_TOKENS,
+            "system": system,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+
+        def on_cache_hit() -> None:
+            with self._stats_lock:
+                stats["llm_cache_hits"] += 1
+
+        for attempt in range(self.retries + 1):
+            try:
+                return complete_structured(
+                    functools.partial(self.gateway.create, priority=self.priority, api_key=self.api_key),
+                    request,
+                    JurisdictionAssessment,
+                    "record_jurisdiction_assessment",
+                    "Record the compliance assessment for one jurisdiction.",
+                    cache=self.cache,
+                    on_message=lambda message: self._record_usage(stats, message),
+                    on_cache_hit=on_cache_hit
+                )
+            except Exception as e:
+                print(f"❌ Compliance assessment for {code} failed (attempt {attempt + 1}): {str(e)[:200]}")
+                # Bad requests and replies that failed validation after their
+                # repair turn would fail the same way again
+                if attempt == self.retries or not is_retryable(e):
+                    raise ComplianceAssessmentError(f"Could not assess {code}: {str(e)}") from e
+                with self._stats_lock:
+                    stats["retried_jurisdictions"].append(code)
+
+    def _record_usage(self, stats: Dict, message) -> None:
+        """Accumulate call count and token usage from a Claude response."""
+        usage = usage_to_dict(getattr(message, "usage", None))
+        with self._stats_lock:
+            stats["llm_calls"] += 1
+            for key, value in usage.items():
+                stats[key] += value
+
+    @staticmethod
+    def merge(assessments: Dict[str, JurisdictionAssessment], failures: Optional[Dict[str, str]] = None) -> Dict:
+        """
+        Combine per-jurisdiction assessments into the overall result.
+
+        Jurisdictions in failures (code -> error) are listed with their error
+        and left out of the summary fields.
+
+        - overall_score: mean jurisdiction score, rounded
+        - highest_risk_level: most severe category risk level (Low if none)
+        - critical_issues: every jurisdiction's critical issues, de-duplicated
+        - remediation_roadmap: recommendations of non-compliant categories,
+          bucketed by their priority, most severe risk first, de-duplicated
+        """
+        failures = failures or {}
+        jurisdictions = {code: assessment.model_dump() for code, assessment in assessments.items()}
+        jurisdictions.update({code: {"error": error} for code, error in failures.items()})
+
+        scores = [assessment.score for assessment in assessments.values()]
+        overall_score = round(sum(scores) / len(scores)) if scores else 0
+
+        categories = [
+            category
+            for assessment in assessments.values()
+            for category in assessment.categories.values()
+        ]
+        risk_levels = {category.risk_level for category in categories}
+        highest_risk_level = next((level for level in RISK_LEVELS if level in risk_levels), 'Low')
+
+        critical_issues = list(dict.fromkeys(
+            issue
+            for assessment in assessments.values()
+            for issue in assessment.critical_issues
+        ))
+
+        roadmap = {bucket: [] for bucket in ROADMAP_BUCKETS.values()}
+        actionable = [category for category in categories if category.status != 'Compliant']
+        actionable.sort(key=lambda category: RISK_LEVELS.index(category.risk_level))
+        for category in actionable:
+            bucket = roadmap[ROADMAP_BUCKETS[category.priority]]
+            for recommendation in category.recommendations:
+                if recommendation not in bucket:
+                    bucket.append(recommendation)
+
+        return {
+            "jurisdictions": jurisdictions,
+            "failed_jurisdictions": list(failures),
+            "overall_score": overall_score,
+            "highest_risk_level": highest_risk_level,
+            "critical_issues": critical_issues,
+            "remediation_roadmap": roadmap,
+        }
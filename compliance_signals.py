@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Compliance signals - Deterministic pre-checks for the compliance audit.
+
+Many checklist items do not need a language model: whether the page links
+to a privacy policy or terms, loads a cookie-consent platform, shows an ABN,
+offers a "Do Not Sell" link, is served over HTTPS with security headers, and
+so on. These are detected here with rules over the page's DOM and response
+headers, and summarized as a compact evidence table that goes into the
+compliance prompt in place of most of the raw page text.
+
+The checks read the markup features collected when the page was parsed
+(PageSnapshot.markup), so the page is not parsed a second time. Results
+depend only on the page body and headers, so they are cached by a hash of
+both.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+from page_snapshot import PageSnapshot
+
+
+@dataclass
+class Signal:
+    """One deterministic check and its evidence."""
+    key: str
+    label: str
+    found: bool
+    evidence: str = ''  # Short supporting detail (link, header value, match)
+
+
+# Links recognised by their text or URL, as (key, label, pattern). Patterns
+# name the policy itself, so "Return to top" is not a returns policy and a
+# "Do Not Sell" opt-out is not an unsubscribe link
+_LINK_RULES = (
+    ('privacy_policy_link', 'Privacy policy link', re.compile(r'privacy', re.I)),
+    ('terms_link', 'Terms / conditions link', re.compile(r'\bterms\b|conditions|terms-of|/tos\b', re.I)),
+    ('cookie_policy_link', 'Cookie policy link', re.compile(r'cookie', re.I)),
+    ('refund_policy_link', 'Refund / returns policy link', re.compile(
+        r'refund|returns?[\s_-]*(policy|&|and|exchanges?)|^returns?$|/returns?(/|\.html?)?$', re.I)),
+    ('contact_link', 'Contact page link', re.compile(r'contact', re.I)),
+    ('accessibility_statement_link', 'Accessibility statement link', re.compile(r'accessibility', re.I)),
+    ('do_not_sell_link', '"Do Not Sell or Share" link',
+     re.compile(r'do[\s_-]*not[\s_-]*sell|your[\s_-]*privacy[\s_-]*choices|opt[\s_-]*out[\s_-]*of[\s_-]*(the[\s_-]*)?sale', re.I)),
+    ('limit_sensitive_info_link', '"Limit use of sensitive info" link', re.compile(r'limit[\s_-]*the[\s_-]*use', re.I)),
+    ('unsubscribe_link', 'Unsubscribe / opt-out link',
+     re.compile(r'unsubscribe|opt[\s_-]*out[\s_-]*of[\s_-]*(marketing|e-?mails?|newsletters?|communications)|email[\s_-]*preferences', re.I)),
+)
+
+# Cookie-consent platforms, recognised in script URLs or inline scripts
+_CONSENT_PLATFORMS = {
+    'cookiebot': 'Cookiebot',
+    'onetrust': 'OneTrust',
+    'cookielaw.org': 'OneTrust',
+    'cookieyes': 'CookieYes',
+    'termly': 'Termly',
+    'iubenda': 'iubenda',
+    'usercentrics': 'Usercentrics',
+    'quantcast': 'Quantcast Choice',
+    'osano': 'Osano',
+    'complianz': 'Complianz',
+    'cookie-script': 'Cookie-Script',
+    'trustarc': 'TrustArc',
+    'didomi': 'Didomi',
+    'klaro': 'Klaro',
+    'consentmanager': 'consentmanager',
+    'cookiefirst': 'CookieFirst',
+}
+
+# Tracking and advertising scripts
+_TRACKERS = {
+    'googletagmanager.com': 'Google Tag Manager',
+    'google-analytics.com': 'Google Analytics',
+    'gtag(': 'Google Analytics',
+    'connect.facebook.net': 'Meta Pixel',
+    'fbq(': 'Meta Pixel',
+    'hotjar': 'Hotjar',
+    'snap.licdn.com': 'LinkedIn Insight',
+    'analytics.tiktok.com': 'TikTok Pixel',
+    'doubleclick.net': 'Google Ads',
+    'clarity.ms': 'Microsoft Clarity',
+    'hs-scripts.com': 'HubSpot',
+}
+
+# Elements that look like a home-grown cookie banner
+_BANNER_RE = re.compile(r'cookie[\s_-]*(banner|consent|notice|bar|popup)|gdpr[\s_-]*(banner|consent)', re.I)
+
+# Security response headers, as (lower-cased name, label)
+_SECURITY_HEADERS = (
+    ('strict-transport-security', 'HSTS'),
+    ('content-security-policy', 'CSP'),
+    ('x-frame-options', 'X-Frame-Options'),
+    ('x-content-type-options', 'X-Content-Type-Options'),
+    ('referrer-policy', 'Referrer-Policy'),
+    ('permissions-policy', 'Permissions-Policy'),
+)
+
+_ABN_RE = re.compile(r'\bABN\b[\s:.#-]*((?:\d\s?){10}\d)', re.I)
+_ACN_RE = re.compile(r'\bACN\b[\s:.#-]*((?:\d\s?){8}\d)', re.I)
+_NZBN_RE = re.compile(r'\bNZBN\b[\s:.#-]*((?:\d\s?){12}\d)', re.I)
+_EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+')
+# International (+61 ...) or trunk-prefixed (02 ..., (02) ..., 1300 ...) numbers, so
+# business identifiers such as ABNs are not mistaken for phone numbers
+_PHONE_RE = re.compile(r'(?:\+\d{1,3}[\s-]?(?:\d{1,4}[\s-]?)?|\(0\d{1,3}\)\s?|\b(?:0|1[38]00)\d{0,3}[\s-]?)\d{3,4}[\s-]?\d{3,4}\b')
+
+_ABN_WEIGHTS = (10, 1, 3, 5, 7, 9, 11, 13, 15, 17, 19)
+
+
+def abn_is_valid(abn: str) -> bool:
+    """Check an Australian Business Number against its checksum."""
+    digits = [int(char) for char in abn if char.isdigit()]
+    if len(digits) != 11:
+        return False
+    digits[0] -= 1
+    return sum(digit * weight for digit, weight in zip(digits, _ABN_WEIGHTS)) % 89 == 0
+
+
+def detect_signals(snapshot: PageSnapshot) -> List[Signal]:
+    """
+    Run every deterministic compliance check over a page.
+
+    Args:
+        snapshot: Parsed page (markup features and response headers)
+
+    Returns:
+        Signals in a fixed order
+    """
+    markup = snapshot.markup
+    headers = _lower_headers(snapshot)
+    signals: List[Signal] = []
+
+    # Links, matched on their visible text or target
+    anchors = markup['anchors']
+
+    for key, label, pattern in _LINK_RULES:
+        match = next(((text, href) for text, href in anchors if pattern.search(text) or pattern.search(href)), None)
+        evidence = f"{match[0][:40] or 'link'} -> {urljoin(snapshot.final_url, match[1])[:80]}" if match else ''
+        signals.append(Signal(key, label, match is not None, evidence))
+
+    mailto = next((href for _, href in anchors if href.lower().startswith('mailto:')), None)
+    tel = next((href for _, href in anchors if href.lower().startswith('tel:')), None)
+    text = markup['text']
+    email = mailto[7:] if mailto else (_EMAIL_RE.search(text).group(0) if _EMAIL_RE.search(text) else None)
+    phone = tel[4:] if tel else (_PHONE_RE.search(text).group(0) if _PHONE_RE.search(text) else None)
+    signals.append(Signal('contact_email', 'Contact email', email is not None, (email or '')[:60]))
+    signals.append(Signal('contact_phone', 'Contact phone', phone is not None, (phone or '')[:30]))
+
+    # Business identifiers
+    abn = _ABN_RE.search(text)
+    if abn:
+        number = re.sub(r'\D', '', abn.group(1))
+        validity = 'checksum valid' if abn_is_valid(number) else 'checksum INVALID'
+        signals.append(Signal('abn', 'ABN displayed', True, f"{number} ({validity})"))
+    else:
+        signals.append(Signal('abn', 'ABN displayed', False))
+    acn = _ACN_RE.search(text)
+    signals.append(Signal('acn', 'ACN displayed', acn is not None, re.sub(r'\D', '', acn.group(1)) if acn else ''))
+    nzbn = _NZBN_RE.search(text)
+    signals.append(Signal('nzbn', 'NZBN displayed', nzbn is not None, re.sub(r'\D', '', nzbn.group(1)) if nzbn else ''))
+
+    # Scripts: consent platforms and trackers
+    haystack = (' '.join(markup['script_sources']) + ' ' + ' '.join(markup['inline_scripts'])).lower()
+
+    platforms = list(dict.fromkeys(name for marker, name in _CONSENT_PLATFORMS.items() if marker in haystack))
+    banner = next((name for name, marker in markup['consent_elements'] if _BANNER_RE.search(marker)), None)
+    if platforms:
+        consent_evidence = ', '.join(platforms)
+    elif banner is not None:
+        consent_evidence = f"banner element <{banner}>"
+    else:
+        consent_evidence = ''
+    signals.append(Signal('cookie_consent', 'Cookie consent mechanism', bool(consent_evidence), consent_evidence))
+
+    trackers = list(dict.fromkeys(name for marker, name in _TRACKERS.items() if marker in haystack))
+    signals.append(Signal('tracking_scripts', 'Tracking / ad scripts', bool(trackers), ', '.join(trackers)))
+
+    # Forms collecting email addresses (marketing consent)
+    email_forms = markup['email_forms']
+    signals.append(Signal(
+        'email_signup_form', 'Email signup form', bool(email_forms),
+        f"{email_forms} form(s), {markup['email_forms_with_checkbox']} with a consent checkbox" if email_forms else ''
+    ))
+
+    # Transport and headers
+    https = snapshot.final_url.startswith('https://')
+    signals.append(Signal('https', 'Served over HTTPS', https, snapshot.final_url[:80]))
+    for header, label in _SECURITY_HEADERS:
+        value = headers.get(header)
+        signals.append(Signal(f"header_{label.lower().replace('-', '_')}", f"{label} header", value is not None, (value or '')[:60]))
+
+    # Accessibility basics
+    lang = markup['lang']
+    signals.append(Signal('html_lang', 'Page language declared', bool(lang), lang or ''))
+    img_count = snapshot.structure.get('img_count', 0)
+    img_with_alt = snapshot.structure.get('img_with_alt', 0)
+    signals.append(Signal(
+        'image_alt_text', 'All images have alt text', img_with_alt == img_count,
+        f"{img_with_alt}/{img_count} images"
+    ))
+
+    return signals
+
+
+def evidence_table(signals: List[Signal]) -> str:
+    """Compact Markdown table of signals for the prompt."""
+    lines = ["| Check | Result | Evidence |", "|---|---|---|"]
+    for signal in signals:
+        evidence = signal.evidence.replace('|', '/') or '-'
+        lines.append(f"| {signal.label} | {'yes' if signal.found else 'no'} | {evidence} |")
+    return '\n'.join(lines)
+
+
+def _lower_headers(snapshot: PageSnapshot) -> Dict[str, str]:
+    """Response headers of a snapshot keyed by lower-cased name."""
+    return {name.lower(): value for name, value in snapshot.headers.items()}
+
+
+def content_hash(snapshot: PageSnapshot) -> str:
+    """Hash of everything the detectors look at: final URL, headers and body."""
+    headers = _lower_headers(snapshot)
+    digest = hashlib.sha256()
+    digest.update(snapshot.final_url.encode('utf-8'))
+    for header, _ in _SECURITY_HEADERS:
+        digest.update(f"\n{header}:{headers.get(header, '')}".encode('utf-8'))
+    digest.update(snapshot.content)
+    return digest.hexdigest()
+
+
+class SignalCache:
+    """In-memory LRU of detector results keyed by content hash."""
+
+    def __init__(self, max_entries: int = 512):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of pages kept
+        """
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, List[Signal]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[Signal]]:
+        """Return cached signals, or None."""
+        with self._lock:
+            signals = self._entries.get(key)
+            if signals is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return signals
+
+    def put(self, key: str, signals: List[Signal]) -> None:
+        """Store signals, evicting the least recently used over the limit."""
+        with self._lock:
+            self._entries[key] = signals
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+
+# Process-wide detector cache (COMPLIANCE_SIGNAL_CACHE_ENTRIES, default 512)
+signal_cache = SignalCache(max_entries=int(os.getenv('COMPLIANCE_SIGNAL_CACHE_ENTRIES', 512)))
+
+
+def get_signals(snapshot: PageSnapshot) -> List[Signal]:
+    """Detector results for a page, computed once per distinct content."""
+    key = content_hash(snapshot)
+    signals = signal_cache.get(key)
+    if signals is None:
+        signals = detect_signals(snapshot)
+        signal_cache.put(key, signals)
+    return signals
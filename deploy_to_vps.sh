@@ -23,6 +23,22 @@ cp ../fastapi_server.py .
 cp ../analyzer.py .
 cp ../audit_engine.py .
 cp ../report_generator.py .
+cp ../llm_cache.py .
+cp ../history_store.py .
+cp ../audit_jobs.py .
+cp ../browser_pool.py .
+cp ../page_snapshot.py .
+cp ../html_parser.py .
+cp ../charset.py .
+cp ../link_checker.py .
+cp ../origin_metadata.py .
+cp ../http_client.py .
+cp ../page_cache.py .
+cp ../structured_output.py .
+cp ../compliance_engine.py .
+cp ../compliance_signals.py .
+cp ../single_flight.py .
+cp ../llm_gateway.py .
 cp ../backend_requirements.txt requirements.txt
 
 # Create deployment script for VPS
@@ -9,11 +9,15 @@ Endpoints:
 - /api/compliance/* - Compliance audit (Australia, NZ, GDPR, CCPA)
 """
 
+import asyncio
+import functools
 import json
 import os
 import uuid
 import jwt
-from datetime import datetime
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, List, Dict
 from io import BytesIO
@@ -23,16 +27,26 @@ import sentry_sdk
 from sentry_sdk.integrations.fastapi import FastApiIntegration
 from sentry_sdk.integrations.httpx import HttpxIntegration
 from fastapi import FastAPI, HTTPException, Query, Header
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from supabase import create_client, Client
-from anthropic import Anthropic
 
-from analyzer import WebsiteAnalyzer
+from analyzer import SUMMARY_ERROR_PREFIX, WebsiteAnalyzer
 from audit_engine import WebsiteAuditor
 from report_generator import WebAuditReportGenerator
+from llm_cache import get_default_cache
+from page_cache import get_default_page_cache
+from history_store import HistoryStore, ANALYSES, AUDITS
+from audit_jobs import AuditJobQueue
+from browser_pool import get_default_pool, BrowserPoolBusy
+from page_snapshot import get_snapshot
+from http_client import get_http_client
+from compliance_engine import ComplianceEngine
+from compliance_signals import evidence_table, get_signals, signal_cache
+from single_flight import flight_key, get_single_flight
+from llm_gateway import BATCH, INTERACTIVE, get_llm_gateway
 
 
 # ==================== Models ====================
@@ -41,6 +55,8 @@ class AnalyzeRequest(BaseModel):
     """Request model for URL analysis."""
     url: str
     timeout: int = 10
+    use_cache: bool = True  # False bypasses the LLM response cache
+    force_refresh: bool = False  # True re-analyzes even if the page content is unchanged
 
 
 class AnalysisResult(BaseModel):
@@ -52,6 +68,10 @@ class AnalysisResult(BaseModel):
     summary: str
     success: bool
     created_at: str
+    truncated: bool = False  # Page exceeded the fetch size limit
+    page_cache_status: Optional[str] = None  # fetched, revalidated (304) or memory
+    content_fingerprint: Optional[str] = None  # Normalized page content hash
+    reused: bool = False  # Summary reused from an earlier analysis of unchanged content
 
 
 class PDFRequest(BaseModel):
@@ -77,6 +97,9 @@ class AuditRequest(BaseModel):
     url: str
     timeout: int = 10
     deep_scan: bool = True
+    scoring_mode: str = 'per_criterion'  # 'per_criterion' or 'batched'
+    use_cache: bool = True  # False bypasses the LLM response cache
+    force_refresh: bool = False  # True re-audits even if the page content is unchanged
 
 
 class AuditScoreResponse(BaseModel):
@@ -98,6 +121,18 @@ class AuditResponse(BaseModel):
     key_strengths: List[str]
     critical_issues: List[str]
     priority_recommendations: List[Dict]
+    evaluation_stats: Optional[Dict] = None
+    content_fingerprint: Optional[str] = None  # Normalized page content hash
+    reused: bool = False  # Scores reused from an earlier audit of unchanged content
+
+
+class AuditJobResponse(BaseModel):
+    """Response model for a background audit job."""
+    job_id: str
+    status: str  # queued, running, completed, failed
+    progress: Dict  # stage, criteria_scored, criteria_total
+    result: Optional[AuditResponse] = None
+    error: Optional[str] = None
 
 
 class AuditHistoryResponse(BaseModel):
@@ -114,6 +149,7 @@ class ComplianceRequest(BaseModel):
     jurisdictions: List[str] = ['AU', 'NZ']  # Default: Australia & New Zealand
     timeout: int = 10
     audit_id: Optional[str] = None  # Link to existing audit (optional)
+    use_cache: bool = True  # False bypasses the LLM response cache
 
 
 class ComplianceFinding(BaseModel):
@@ -132,6 +168,7 @@ class ComplianceJurisdictionScore(BaseModel):
     score: int
     findings: List[ComplianceFinding]
     critical_issues: List[str]
+    error: Optional[str] = None  # Set when this jurisdiction could not be assessed
 
 
 class ComplianceResponse(BaseModel):
@@ -145,6 +182,7 @@ class ComplianceResponse(BaseModel):
     critical_issues: List[str]
     remediation_roadmap: Dict[str, List[str]]
     created_at: str
+    failed_jurisdictions: List[str] = []  # Requested but not assessed (see jurisdiction_scores[...].error)
 
 
 # ==================== Sentry Setup ====================
@@ -225,49 +263,120 @@ def extract_user_id_from_jwt(authorization_header: Optional[str]) -> str:
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
 
 
+# ==================== Audit Settings ====================
+
+# Maximum number of audit criteria evaluated by Claude in parallel per audit
+AUDIT_MAX_CONCURRENCY = int(os.getenv('AUDIT_MAX_CONCURRENCY', 10))
+
+# Background audit jobs: durable queue file and in-process worker threads
+# (set AUDIT_JOB_WORKERS=0 and run "python fastapi_server.py worker" to
+# process jobs in a separate process instead)
+AUDIT_JOBS_DB_PATH = os.getenv('AUDIT_JOBS_DB_PATH', 'audit_jobs.db')
+AUDIT_JOB_WORKERS = int(os.getenv('AUDIT_JOB_WORKERS', 2))
+# Seconds without a heartbeat before a running job counts as orphaned
+AUDIT_JOB_LEASE_SECONDS = int(os.getenv('AUDIT_JOB_LEASE_SECONDS', 120))
+
+
+# ==================== Worker Pools ====================
+
+# Blocking work (page fetches, Claude calls, PDF rendering, Supabase and
+# SQLite history/job queries)
+# runs on dedicated thread pools so it never stalls the event loop. Each
+# workload class has its own pool so a burst of renders cannot starve audits.
+WORKER_POOLS = {
+    'fetch': ThreadPoolExecutor(
+        max_workers=int(os.getenv('FETCH_POOL_SIZE', 16)),
+        thread_name_prefix='fetch'
+    ),
+    'llm': ThreadPoolExecutor(
+        max_workers=int(os.getenv('LLM_POOL_SIZE', 8)),
+        thread_name_prefix='llm'
+    ),
+    'render': ThreadPoolExecutor(
+        max_workers=int(os.getenv('RENDER_POOL_SIZE', 2)),
+        thread_name_prefix='render'
+    ),
+}
+
+
+async def run_blocking(pool: str, func, *args, **kwargs):
+    """Run a blocking callable on the named worker pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        WORKER_POOLS[pool],
+        functools.partial(func, *args, **kwargs)
+    )
+
+
+# HTML/CSS PDFs are rendered on long-lived Chromium browsers
+# (PDF_BROWSER_POOL_SIZE, PDF_BROWSER_MAX_RENDERS, PDF_RENDER_QUEUE_SIZE)
+browser_pool = get_default_pool()
+
+
+@app.on_event("startup")
+def start_browser_pool():
+    """Launch the PDF browsers up front so the first render is warm."""
+    try:
+        browser_pool.start()
+    except Exception as e:
+        print(f"⚠️ PDF browser pool not started: {str(e)}")
+
+
+@app.on_event("shutdown")
+def shutdown_worker_pools():
+    """Stop accepting work on the worker pools when the server shuts down."""
+    for pool in WORKER_POOLS.values():
+        pool.shutdown(wait=False)
+    browser_pool.close()
+    get_http_client().close()
+
+
 # ==================== Storage ====================
 
-# Use simple JSON files for history (in production, use PostgreSQL)
+# History lives in an indexed SQLite store; the legacy JSON files are
+# migrated into it once on startup
+HISTORY_DB_PATH = os.getenv('HISTORY_DB_PATH', 'history.db')
 HISTORY_FILE = "analysis_history.json"
 AUDIT_HISTORY_FILE = "audit_history.json"
 
+history_store = HistoryStore(HISTORY_DB_PATH)
 
-def load_history() -> dict:
-    """Load analysis history from file."""
-    if Path(HISTORY_FILE).exists():
-        with open(HISTORY_FILE, 'r') as f:
-            return json.load(f)
-    return {}
 
+@app.on_event("startup")
+def migrate_legacy_history():
+    """Import the legacy JSON history files (once, even with several workers starting)."""
+    history_store.migrate_json(ANALYSES, HISTORY_FILE)
+    history_store.migrate_json(AUDITS, AUDIT_HISTORY_FILE)
 
-def save_history(history: dict) -> None:
-    """Save analysis history to file."""
-    with open(HISTORY_FILE, 'w') as f:
-        json.dump(history, f, indent=2)
+# Results for unchanged page content are reused for this long
+CONTENT_REUSE_MAX_AGE_SECONDS = int(os.getenv('CONTENT_REUSE_MAX_AGE_SECONDS', 7 * 86400))
 
 
-def get_history() -> dict:
-    """Thread-safe history getter."""
-    return load_history()
-
-
-def load_audit_history() -> dict:
-    """Load audit history from file."""
-    if Path(AUDIT_HISTORY_FILE).exists():
-        with open(AUDIT_HISTORY_FILE, 'r') as f:
-            return json.load(f)
-    return {}
+def find_reusable(kind: str, url: str, fingerprint: str, matches=None) -> Optional[Dict]:
+    """
+    Newest recent history record for url with the same content fingerprint.
 
+    Args:
+        kind: ANALYSES or AUDITS
+        url: Normalized page URL
+        fingerprint: content_fingerprint of the freshly fetched page
+        matches: Optional callable(record) -> bool for further conditions
 
-def save_audit_history(history: dict) -> None:
-    """Save audit history to file."""
-    with open(AUDIT_HISTORY_FILE, 'w') as f:
-        json.dump(history, f, indent=2)
+    Returns:
+        The record plus its "id", or None
+    """
+    since = (datetime.utcnow() - timedelta(seconds=CONTENT_REUSE_MAX_AGE_SECONDS)).isoformat()
+    for record_id, record in history_store.find_by_fingerprint(kind, fingerprint, since=since):
+        if record.get('url') == url and (matches is None or matches(record)):
+            return {**record, 'id': record_id}
+    return None
 
 
-def get_audit_history() -> dict:
-    """Thread-safe audit history getter."""
-    return load_audit_history()
+def analysis_reusable(record: Dict) -> bool:
+    """Whether a stored analysis holds a real summary (not a failed Claude call)."""
+    # Records stored before failed summaries were marked unsuccessful still
+    # carry success=True, so the error text is checked as well
+    return record.get('success', False) and not (record.get('summary') or '').startswith(SUMMARY_ERROR_PREFIX)
 
 
 # ==================== API Endpoints ====================
@@ -282,6 +391,27 @@ async def root():
     }
 
 
+@app.get("/api/metrics")
+async def metrics():
+    """
+    Runtime metrics for the backend caches and pools.
+
+    Returns:
+        Dictionary of metrics per component
+    """
+    llm_cache = get_default_cache()
+    page_cache = get_default_page_cache()
+    return {
+        "llm_cache": llm_cache.stats() if llm_cache else None,
+        "page_cache": page_cache.stats() if page_cache else None,
+        "compliance_signals": signal_cache.stats(),
+        "single_flight": get_single_flight().stats(),
+        "llm_gateway": get_llm_gateway().stats(),
+        "browser_pool": browser_pool.stats(),
+        "http_client": get_http_client().stats(),
+    }
+
+
 @app.get("/sentry-debug")
 async def sentry_debug():
     """
@@ -315,25 +445,41 @@ async def analyze_url(request: AnalyzeRequest, authorization: str = Header(None)
                 detail="ANTHROPIC_API_KEY environment variable not set"
             )
 
-        analyzer = WebsiteAnalyzer(timeout=request.timeout, api_key=api_key)
-        result = analyzer.analyze(request.url)
+        analyzer = WebsiteAnalyzer(
+            timeout=request.timeout,
+            api_key=api_key,
+            cache=get_default_cache() if request.use_cache else None
+        )
+        reuse = None
+        if not request.force_refresh:
+            reuse = functools.partial(find_reusable, ANALYSES, matches=analysis_reusable)
+        # Identical concurrent requests share one pipeline; each still gets its own record
+        key = flight_key(
+            ANALYSES, request.url,
+            timeout=request.timeout, use_cache=request.use_cache, force_refresh=request.force_refresh
+        )
+        result = await get_single_flight().run(
+            key, lambda: run_blocking('llm', analyzer.analyze, request.url, reuse=reuse)
+        )
 
         # Generate unique ID for this analysis
         analysis_id = str(uuid.uuid4())
         created_at = datetime.utcnow().isoformat()
 
         # Store in history with user_id
-        history = get_history()
-        history[analysis_id] = {
+        await run_blocking('fetch', history_store.put, ANALYSES, analysis_id, {
             "user_id": user_id,
             "url": result['url'],
             "title": result['title'],
             "meta_description": result['meta_description'],
             "summary": result['summary'],
             "success": result['success'],
-            "created_at": created_at
-        }
-        save_history(history)
+            "created_at": created_at,
+            "truncated": result.get('truncated', False),
+            "content_fingerprint": result.get('content_fingerprint'),
+            "reused": result.get('reused', False),
+            "reused_from": result.get('reused_from')
+        })
 
         return AnalysisResult(
             id=analysis_id,
@@ -342,7 +488,11 @@ async def analyze_url(request: AnalyzeRequest, authorization: str = Header(None)
             meta_description=result['meta_description'],
             summary=result['summary'],
             success=result['success'],
-            created_at=created_at
+            created_at=created_at,
+            truncated=result.get('truncated', False),
+            page_cache_status=result.get('page_cache_status'),
+            content_fingerprint=result.get('content_fingerprint'),
+            reused=result.get('reused', False)
         )
 
     except HTTPException:
@@ -365,11 +515,10 @@ async def get_analysis(analysis_id: str):
     Returns:
         AnalysisResult
     """
-    history = get_history()
-    if analysis_id not in history:
+    analysis = await run_blocking('fetch', history_store.get, ANALYSES, analysis_id)
+    if analysis is None:
         raise HTTPException(status_code=404, detail="Analysis not found")
 
-    analysis = history[analysis_id]
     return AnalysisResult(
         id=analysis_id,
         **analysis
@@ -392,28 +541,17 @@ async def get_history_list(authorization: str = Header(None), limit: int = Query
         # Extract user_id from JWT token
         user_id = extract_user_id_from_jwt(authorization)
 
-        history = get_history()
-
-        # Filter by user_id and sort by created_at (newest first)
-        user_analyses = [
-            (aid, data) for aid, data in history.items()
-            if data.get('user_id') == user_id
-        ]
-
-        sorted_analyses = sorted(
-            user_analyses,
-            key=lambda x: x[1]['created_at'],
-            reverse=True
-        )[:limit]
+        # User's analyses, newest first (served from the user/created_at index)
+        user_analyses, total = await run_blocking('fetch', history_store.list_for_user, ANALYSES, user_id, limit)
 
         analyses = [
             AnalysisResult(id=aid, **{k: v for k, v in data.items() if k != 'user_id'})
-            for aid, data in sorted_analyses
+            for aid, data in user_analyses
         ]
 
         return HistoryResponse(
             analyses=analyses,
-            total=len(user_analyses)
+            total=total
         )
     except HTTPException:
         raise
@@ -436,12 +574,10 @@ async def generate_pdf(request: PDFRequest):
         PDF file as attachment
     """
     try:
-        history = get_history()
-        if request.analysis_id not in history:
+        analysis = await run_blocking('fetch', history_store.get, ANALYSES, request.analysis_id)
+        if analysis is None:
             raise HTTPException(status_code=404, detail="Analysis not found")
 
-        analysis = history[request.analysis_id]
-
         # Prepare analysis result for PDF generation
         result = {
             'url': analysis['url'],
@@ -454,12 +590,11 @@ async def generate_pdf(request: PDFRequest):
         api_key = os.getenv('ANTHROPIC_API_KEY')
         analyzer = WebsiteAnalyzer(api_key=api_key)
 
-        # Generate PDF to BytesIO
-        pdf_path = f"/tmp/{request.analysis_id}.pdf"
-        analyzer.generate_pdf_playwright(
+        html_content = await run_blocking(
+            'render',
+            analyzer.render_report_html,
             result,
             is_audit=False,
-            output_path=pdf_path,
             logo_path=request.logo_url,
             company_name=request.company_name,
             company_details=request.company_details,
@@ -467,15 +602,35 @@ async def generate_pdf(request: PDFRequest):
             template=request.template
         )
 
+        # Render PDF in memory on a warm pooled browser; a full render
+        # queue is rejected with 503 instead of piling up requests
+        render = browser_pool.submit(
+            html_content,
+            pdf_options=WebsiteAnalyzer.PLAYWRIGHT_PDF_OPTIONS,
+            viewport=WebsiteAnalyzer.PLAYWRIGHT_VIEWPORT
+        )
+        try:
+            pdf_bytes = await asyncio.wait_for(
+                asyncio.wrap_future(render),
+                timeout=browser_pool.render_timeout
+            )
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=504,
+                detail=f"PDF rendering timed out after {browser_pool.render_timeout:g} seconds"
+            )
+
         # Return PDF file
-        return FileResponse(
-            path=pdf_path,
+        return Response(
+            content=pdf_bytes,
             media_type="application/pdf",
-            filename=f"{request.analysis_id}.pdf"
+            headers={"Content-Disposition": f'attachment; filename="{request.analysis_id}.pdf"'}
         )
 
     except HTTPException:
         raise
+    except BrowserPoolBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -494,13 +649,9 @@ async def delete_analysis(analysis_id: str):
     Returns:
         Confirmation message
     """
-    history = get_history()
-    if analysis_id not in history:
+    if not await run_blocking('fetch', history_store.delete, ANALYSES, analysis_id):
         raise HTTPException(status_code=404, detail="Analysis not found")
 
-    del history[analysis_id]
-    save_history(history)
-
     return {"status": "deleted", "id": analysis_id}
 
 
@@ -512,12 +663,131 @@ async def clear_history():
     Returns:
         Confirmation message
     """
-    save_history({})
+    await run_blocking('fetch', history_store.clear, ANALYSES)
     return {"status": "cleared", "message": "All history cleared"}
 
 
 # ==================== WebAudit Pro - Audit Endpoints ====================
 
+def create_auditor(request: AuditRequest, priority: int = INTERACTIVE) -> WebsiteAuditor:
+    """Validate an audit request and build its WebsiteAuditor (Claude calls at the given gateway priority)."""
+    api_key = os.getenv('ANTHROPIC_API_KEY')
+    if not api_key:
+        raise HTTPException(
+            status_code=500,
+            detail="ANTHROPIC_API_KEY environment variable not set"
+        )
+
+    if request.scoring_mode not in WebsiteAuditor.SCORING_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid scoring mode. Must be one of: {', '.join(WebsiteAuditor.SCORING_MODES)}"
+        )
+
+    return WebsiteAuditor(
+        timeout=request.timeout,
+        api_key=api_key,
+        max_concurrency=AUDIT_MAX_CONCURRENCY,
+        cache=get_default_cache() if request.use_cache else None,
+        priority=priority
+    )
+
+
+def audit_reuse(request: AuditRequest):
+    """
+    Lookup of an earlier audit to reuse for unchanged content, or None.
+
+    Only audits run with the same deep_scan and scoring_mode, and with no
+    criteria re-evaluated after a bad batched reply or given a default score,
+    are reused.
+    """
+    if request.force_refresh:
+        return None
+
+    def matches(record: Dict) -> bool:
+        stats = record.get('evaluation_stats') or {}
+        return (
+            stats.get('deep_scan') == request.deep_scan
+            and stats.get('scoring_mode') == request.scoring_mode
+            and not stats.get('fallback_criteria')
+            and not stats.get('failed_criteria')
+        )
+
+    return functools.partial(find_reusable, AUDITS, matches=matches)
+
+
+def save_audit(user_id: str, auditor: WebsiteAuditor, audit_result) -> AuditResponse:
+    """Store an audit result in the user's history and build its response."""
+    return store_audit(user_id, auditor.to_dict(audit_result))
+
+
+def store_audit(user_id: str, audit_dict: Dict, audit_id: Optional[str] = None) -> AuditResponse:
+    """
+    Store an audit (WebsiteAuditor.to_dict() form) in the user's history.
+
+    Args:
+        user_id: Owner of the audit
+        audit_dict: Audit result as returned by WebsiteAuditor.to_dict()
+        audit_id: Record id (a new one when None); storing again under the
+            same id replaces the record
+
+    Returns:
+        AuditResponse with the record id
+    """
+    audit_id = audit_id or str(uuid.uuid4())
+
+    # Store in history with user_id
+    history_store.put(AUDITS, audit_id, {**audit_dict, 'user_id': user_id})
+
+    return AuditResponse(id=audit_id, **audit_dict)
+
+
+def run_audit_job(user_id: str, request_data: Dict, progress) -> Dict:
+    """
+    Run a queued audit job (called on an audit job worker thread).
+
+    Returns the audit in to_dict() form; it is saved to history by
+    complete_audit_job once the worker has confirmed it still owns the job.
+    """
+    request = AuditRequest(**request_data)
+    # Background jobs yield the Claude budget to interactive requests
+    auditor = create_auditor(request, priority=BATCH)
+    audit_result = auditor.audit(
+        request.url,
+        deep_scan=request.deep_scan,
+        scoring_mode=request.scoring_mode,
+        progress_callback=progress,
+        reuse=audit_reuse(request)
+    )
+    return auditor.to_dict(audit_result)
+
+
+def complete_audit_job(job_id: str, user_id: str, audit_dict: Dict) -> Dict:
+    """Save a finished job's audit to history, keyed by the job id."""
+    return store_audit(user_id, audit_dict, audit_id=job_id).model_dump()
+
+
+audit_jobs = AuditJobQueue(
+    run_audit_job,
+    on_complete=complete_audit_job,
+    path=AUDIT_JOBS_DB_PATH,
+    workers=AUDIT_JOB_WORKERS,
+    lease_seconds=AUDIT_JOB_LEASE_SECONDS
+)
+
+
+@app.on_event("startup")
+def start_audit_job_workers():
+    """Start in-process audit job workers (AUDIT_JOB_WORKERS=0 disables them)."""
+    audit_jobs.start()
+
+
+@app.on_event("shutdown")
+def stop_audit_job_workers():
+    """Stop in-process audit job workers."""
+    audit_jobs.stop()
+
+
 @app.post("/api/audit/analyze", response_model=AuditResponse)
 async def audit_website(request: AuditRequest, authorization: str = Header(None)):
     """
@@ -534,40 +804,26 @@ async def audit_website(request: AuditRequest, authorization: str = Header(None)
         # Extract user_id from JWT token
         user_id = extract_user_id_from_jwt(authorization)
 
-        api_key = os.getenv('ANTHROPIC_API_KEY')
-        if not api_key:
-            raise HTTPException(
-                status_code=500,
-                detail="ANTHROPIC_API_KEY environment variable not set"
-            )
-
-        auditor = WebsiteAuditor(timeout=request.timeout, api_key=api_key)
-        audit_result = auditor.audit(request.url, deep_scan=request.deep_scan)
-
-        # Generate unique ID for this audit
-        audit_id = str(uuid.uuid4())
+        auditor = create_auditor(request)
 
-        # Convert audit result to dictionary
-        audit_dict = auditor.to_dict(audit_result)
-        audit_dict['user_id'] = user_id
+        # Identical concurrent requests share one pipeline; each still gets its own record
+        key = flight_key(
+            AUDITS, request.url,
+            timeout=request.timeout, deep_scan=request.deep_scan, scoring_mode=request.scoring_mode,
+            use_cache=request.use_cache, force_refresh=request.force_refresh
+        )
+        def run_audit() -> Dict:
+            # to_dict() form, so a run can be shared with other worker processes
+            return auditor.to_dict(auditor.audit(
+                request.url,
+                deep_scan=request.deep_scan,
+                scoring_mode=request.scoring_mode,
+                reuse=audit_reuse(request)
+            ))
 
-        # Store in history with user_id
-        audit_history = get_audit_history()
-        audit_history[audit_id] = audit_dict
-        save_audit_history(audit_history)
+        audit_dict = await get_single_flight().run(key, lambda: run_blocking('llm', run_audit))
 
-        # Return with ID
-        return AuditResponse(
-            id=audit_id,
-            url=audit_result.url,
-            website_name=audit_result.website_name,
-            audit_timestamp=audit_result.audit_timestamp,
-            overall_score=audit_result.overall_score,
-            scores=audit_result.scores,
-            key_strengths=audit_result.key_strengths,
-            critical_issues=audit_result.critical_issues,
-            priority_recommendations=audit_result.priority_recommendations
-        )
+        return await run_blocking('fetch', store_audit, user_id, audit_dict)
 
     except HTTPException:
         raise
@@ -578,6 +834,134 @@ async def audit_website(request: AuditRequest, authorization: str = Header(None)
         )
 
 
+def format_sse(event: str, data: Dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/audit/analyze/stream")
+async def audit_website_stream(request: AuditRequest, authorization: str = Header(None)):
+    """
+    Perform a 10-point audit, streaming results as Server-Sent Events.
+
+    Events:
+        fetched, parsed - page stages completed
+        criterion - one CriterionScore (name, score, observations,
+            recommendations) plus completed/total counts, as soon as it is scored
+        complete - the full AuditResponse (overall_score, key_strengths,
+            critical_issues, priority_recommendations, ...)
+        error - {"detail": ...} if the audit failed
+
+    Args:
+        request: AuditRequest with URL and optional settings
+        authorization: JWT token from Authorization header
+
+    Returns:
+        text/event-stream response
+    """
+    user_id = extract_user_id_from_jwt(authorization)
+    auditor = create_auditor(request)
+
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def progress(stage: str, data: Dict) -> None:
+        # Called on the audit thread; hand the event over to the loop
+        loop.call_soon_threadsafe(events.put_nowait, (stage, data))
+
+    async def run_audit():
+        try:
+            audit_result = await run_blocking(
+                'llm',
+                auditor.audit,
+                request.url,
+                deep_scan=request.deep_scan,
+                scoring_mode=request.scoring_mode,
+                progress_callback=progress,
+                reuse=audit_reuse(request)
+            )
+            response = await run_blocking('fetch', save_audit, user_id, auditor, audit_result)
+            await events.put(('complete', response.model_dump()))
+        except Exception as e:
+            sentry_sdk.capture_exception(e)
+            await events.put(('error', {'detail': f"Audit failed: {str(e)}"}))
+
+    async def event_stream():
+        # The audit keeps running (and is saved to history) even if the
+        # client disconnects mid-stream
+        audit_task = asyncio.create_task(run_audit())
+        while True:
+            stage, data = await events.get()
+            yield format_sse(stage, data)
+            if stage in ('complete', 'error'):
+                break
+        await audit_task
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',  # Disable Nginx response buffering
+        }
+    )
+
+
+@app.post("/api/audit/jobs", response_model=AuditJobResponse, status_code=202)
+async def submit_audit_job(request: AuditRequest, authorization: str = Header(None)):
+    """
+    Queue a 10-point audit and return immediately with a job ID.
+
+    Args:
+        request: AuditRequest with URL and optional settings
+        authorization: JWT token from Authorization header
+
+    Returns:
+        AuditJobResponse with the job ID; poll GET /api/audit/jobs/{job_id}
+    """
+    user_id = extract_user_id_from_jwt(authorization)
+
+    # Validate settings up front so a bad request fails now, not in the worker
+    create_auditor(request)
+
+    job_id = await run_blocking('fetch', audit_jobs.submit, user_id, request.model_dump())
+    job = await run_blocking('fetch', audit_jobs.get, job_id)
+    return AuditJobResponse(
+        job_id=job_id,
+        status='queued',
+        progress=job['progress']
+    )
+
+
+@app.get("/api/audit/jobs/{job_id}", response_model=AuditJobResponse)
+async def get_audit_job(job_id: str, authorization: str = Header(None)):
+    """
+    Get the status and progress of a queued audit.
+
+    Args:
+        job_id: ID returned by POST /api/audit/jobs
+        authorization: JWT token from Authorization header
+
+    Returns:
+        AuditJobResponse with progress, and the AuditResponse once completed
+    """
+    user_id = extract_user_id_from_jwt(authorization)
+
+    job = await run_blocking('fetch', audit_jobs.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Audit job not found")
+    if job['user_id'] != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this audit job")
+
+    return AuditJobResponse(
+        job_id=job_id,
+        status=job['status'],
+        progress=job['progress'],
+        result=job['result'],
+        error=job['error']
+    )
+
+
 @app.get("/api/audit/{audit_id}", response_model=AuditResponse)
 async def get_audit(audit_id: str, authorization: str = Header(None)):
     """
@@ -594,12 +978,10 @@ async def get_audit(audit_id: str, authorization: str = Header(None)):
         # Extract user_id from JWT token
         user_id = extract_user_id_from_jwt(authorization)
 
-        audit_history = get_audit_history()
-        if audit_id not in audit_history:
+        audit_data = await run_blocking('fetch', history_store.get, AUDITS, audit_id)
+        if audit_data is None:
             raise HTTPException(status_code=404, detail="Audit not found")
 
-        audit_data = audit_history[audit_id]
-
         # Verify user_id matches
         if audit_data.get('user_id') != user_id:
             raise HTTPException(status_code=403, detail="Not authorized to access this audit")
@@ -636,28 +1018,17 @@ async def get_audit_history_list(authorization: str = Header(None), limit: int =
         # Extract user_id from JWT token
         user_id = extract_user_id_from_jwt(authorization)
 
-        audit_history = get_audit_history()
-
-        # Filter by user_id and sort by audit_timestamp (newest first)
-        user_audits = [
-            (aid, data) for aid, data in audit_history.items()
-            if data.get('user_id') == user_id
-        ]
-
-        sorted_audits = sorted(
-            user_audits,
-            key=lambda x: x[1]['audit_timestamp'],
-            reverse=True
-        )[:limit]
+        # User's audits, newest first (served from the user/audit_timestamp index)
+        user_audits, total = await run_blocking('fetch', history_store.list_for_user, AUDITS, user_id, limit)
 
         audits = [
             AuditResponse(id=aid, **{k: v for k, v in data.items() if k != 'user_id'})
-            for aid, data in sorted_audits
+            for aid, data in user_audits
         ]
 
         return AuditHistoryResponse(
             audits=audits,
-            total=len(user_audits)
+            total=total
         )
     except HTTPException:
         raise
@@ -679,13 +1050,9 @@ async def delete_audit(audit_id: str):
     Returns:
         Confirmation message
     """
-    audit_history = get_audit_history()
-    if audit_id not in audit_history:
+    if not await run_blocking('fetch', history_store.delete, AUDITS, audit_id):
         raise HTTPException(status_code=404, detail="Audit not found")
 
-    del audit_history[audit_id]
-    save_audit_history(audit_history)
-
     return {"status": "deleted", "id": audit_id}
 
 
@@ -697,7 +1064,7 @@ async def clear_audit_history():
     Returns:
         Confirmation message
     """
-    save_audit_history({})
+    await run_blocking('fetch', history_store.clear, AUDITS)
     return {"status": "cleared", "message": "All audit history cleared"}
 
 
@@ -735,12 +1102,10 @@ async def generate_audit_pdf(audit_id: str, document_type: str, request: Optiona
             )
 
         # Get audit data
-        audit_history = get_audit_history()
-        if audit_id not in audit_history:
+        audit_data = await run_blocking('fetch', history_store.get, AUDITS, audit_id)
+        if audit_data is None:
             raise HTTPException(status_code=404, detail="Audit not found")
 
-        audit_data = audit_history[audit_id]
-
         # Extract request parameters
         client_name = request.client_name if request else audit_data.get('website_name', 'Client')
         company_name = (request.company_name if request else "WebAudit Pro")
@@ -751,7 +1116,9 @@ async def generate_audit_pdf(audit_id: str, document_type: str, request: Optiona
         pdf_path = f"/tmp/{audit_id}_{document_type}.pdf"
 
         if document_type == "audit-report":
-            generator.generate_audit_report(
+            await run_blocking(
+                'render',
+                generator.generate_audit_report,
                 audit_data,
                 pdf_path,
                 company_name=company_name,
@@ -760,7 +1127,9 @@ async def generate_audit_pdf(audit_id: str, document_type: str, request: Optiona
             filename = f"audit-report_{audit_id[:8]}.pdf"
 
         elif document_type == "improvement-plan":
-            generator.generate_improvement_plan(
+            await run_blocking(
+                'render',
+                generator.generate_improvement_plan,
                 audit_data,
                 pdf_path,
                 client_name=client_name,
@@ -770,7 +1139,9 @@ async def generate_audit_pdf(audit_id: str, document_type: str, request: Optiona
             filename = f"improvement-plan_{audit_id[:8]}.pdf"
 
         elif document_type == "partnership-proposal":
-            generator.generate_partnership_proposal(
+            await run_blocking(
+                'render',
+                generator.generate_partnership_proposal,
                 audit_data,
                 pdf_path,
                 client_name=client_name,
@@ -797,173 +1168,6 @@ async def generate_audit_pdf(audit_id: str, document_type: str, request: Optiona
 
 # ==================== Compliance Audit Endpoints ====================
 
-def build_compliance_prompt(site_content: str, site_metadata: dict, jurisdictions: List[str]) -> str:
-    """Build comprehensive multi-jurisdiction compliance evaluation prompt."""
-
-    jurisdiction_sections = []
-
-    if 'AU' in jurisdictions:
-        jurisdiction_sections.append("""
-AUSTRALIA COMPLIANCE EVALUATION
-================================
-Evaluate against:
-- Competition and Consumer Act 2010 (Australian Consumer Law / ACL)
-- Privacy Act 1988 (Australian Privacy Principles - APPs)
-- Spam Act 2003
-- Do Not Call Register Act 2006
-- AANA Code of Ethics & Advertising Standards
-- Fair Trading Act
-- Website Accessibility (WCAG 2.1 Level AA)
-
-Check for:
-- ACL Compliance (s18: misleading/deceptive conduct, pricing clarity, claims substantiation)
-- Privacy Policy (clear, accessible, APP1-13 compliance)
-- Cookie consent and tracking disclosures
-- Unsubscribe links and marketing opt-out mechanisms
-- Business registration info (ABN/ACN)
-- Contact information and support mechanisms
-- Terms of Service fairness and enforceability
-- Refund/return policy compliance
-- HTTPS/SSL certificate presence
-- Security headers implementation
-- Accessibility compliance (alt text, captions, keyboard navigation)
-""")
-
-    if 'NZ' in jurisdictions:
-        jurisdiction_sections.append("""
-NEW ZEALAND COMPLIANCE EVALUATION
-==================================
-Evaluate against:
-- Consumer Guarantees Act 1993
-- Privacy Act 2020
-- Spam Act 2003
-- Fair Trading Act 1986
-- Disable Discrimination Act 1993
-- Health and Safety at Work Act 2015 (if applicable)
-
-Check for:
-- Privacy Policy (NZ Privacy Act compliant)
-- Clear terms and conditions
-- Consumer guarantee disclosures
-- Fair pricing and no misleading claims
-- Contact information and dispute resolution
-- Data security measures
-- Accessibility compliance
-- Marketing consent mechanisms
-""")
-
-    if 'GDPR' in jurisdictions:
-        jurisdiction_sections.append("""
-GDPR COMPLIANCE EVALUATION (European Union)
-============================================
-Evaluate against:
-- General Data Protection Regulation (GDPR) Articles 5-49
-- ePrivacy Directive and EDPB Guidelines
-- GDPR Recitals and guidance
-
-Check for:
-- Valid lawful basis for processing (consent, contract, legitimate interest)
-- GDPR-compliant privacy notice (transparent, concise, easily accessible)
-- Data controller information clearly identified
-- Data Processing Agreement if using processors
-- Cookie consent mechanism (EDPB: explicit opt-in before non-essential cookies)
-- Cookie categories: essential, analytics, marketing, functional
-- Cookie policy explaining all cookies and their purposes
-- User rights implementation: access, rectification, erasure, portability, objection
-- Cross-border transfer mechanisms (SCCs, adequacy decisions, BCRs)
-- Data retention and deletion policies
-- Breach notification process and GDPR compliance
-- Data Protection Impact Assessment (DPIA) documentation
-- Right to lodge complaints with DPA
-- Sub-processor transparency
-- Appropriate security measures (encryption, access controls)
-""")
-
-    if 'CCPA' in jurisdictions:
-        jurisdiction_sections.append("""
-CCPA/CPRA COMPLIANCE EVALUATION (California)
-=============================================
-Evaluate against:
-- California Consumer Privacy Act (CCPA)
-- California Privacy Rights Act (CPRA) amendments
-- California's Consumer Legal Remedies Act
-
-Check for:
-- Lawful basis for data collection and sale
-- Consumer disclosures: what data is collected, purposes, retention
-- "Do Not Sell My Personal Information" link (clear, conspicuous)
-- "Limit the Use and Disclosure of My Sensitive Personal Information" option
-- Consumer rights implementation: access, deletion, opt-out of sale
-- Opt-in requirement before selling personal information
-- Privacy policy addressing all required disclosures
-- Service provider contracts for data processors
-- No discrimination for exercising CCPA rights
-- Reasonable security practices
-- Age-appropriate privacy practices
-- Sale of data to third parties disclosure
-- Business operations disclosure
-- Contact information for privacy inquiries
-""")
-
-    full_prompt = f"""You are an expert legal compliance analyst specializing in international privacy law, consumer protection regulations, and digital compliance standards.
-
-Analyze the following website content and metadata for legal and regulatory compliance across the specified jurisdictions.
-
-WEBSITE CONTENT:
-{site_content[:5000]}  # Limit to prevent token explosion
-
-WEBSITE METADATA:
-- Title: {site_metadata.get('title', 'N/A')}
-- Meta Description: {site_metadata.get('meta_description', 'N/A')}
-- URL: {site_metadata.get('url', 'N/A')}
-
-{chr(10).join(jurisdiction_sections)}
-
-AUDIT OUTPUT FORMAT:
-Return ONLY a valid JSON object with this exact structure. Ensure all string values are properly JSON-escaped (replace double quotes with \", backslashes with \\, newlines with \\n):
-
-{{
-  "jurisdictions": {{
-    "AU": {{
-      "score": <0-100 integer>,
-      "categories": {{
-        "acl_compliance": {{"status": "Compliant|Partially Compliant|Non-Compliant", "risk_level": "Critical|High|Medium|Low", "findings": ["finding 1", "finding 2"], "recommendations": ["rec 1", "rec 2"], "priority": "Immediate|Short-term|Long-term"}},
-        "privacy_data_protection": {{"status": "...", "risk_level": "...", "findings": [...], "recommendations": [...], "priority": "..."}},
-        "advertising_marketing": {{"status": "...", "risk_level": "...", "findings": [...], "recommendations": [...], "priority": "..."}},
-        "security_trust": {{"status": "...", "risk_level": "...", "findings": [...], "recommendations": [...], "priority": "..."}},
-        "accessibility": {{"status": "...", "risk_level": "...", "findings": [...], "recommendations": [...], "priority": "..."}},
-        "ecommerce_terms": {{"status": "...", "risk_level": "...", "findings": [...], "recommendations": [...], "priority": "..."}}
-      }},
-      "critical_issues": ["issue 1", "issue 2"]
-    }},
-    "NZ": {{ ... (same structure as AU) ... }},
-    "GDPR": {{ ... (same structure as AU) ... }},
-    "CCPA": {{ ... (same structure as AU) ... }}
-  }},
-  "overall_score": <0-100 integer>,
-  "highest_risk_level": "Critical|High|Medium|Low",
-  "critical_issues": ["issue 1", "issue 2"],
-  "remediation_roadmap": {{
-    "immediate": ["action 1", "action 2"],
-    "short_term": ["action 1", "action 2"],
-    "long_term": ["action 1", "action 2"]
-  }}
-}}
-
-IMPORTANT: Return ONLY valid JSON with no additional text before or after. All string values must be properly escaped for JSON.
-
-For each jurisdiction requested:
-1. Assess compliance status
-2. Identify critical, high, medium, and low risk issues
-3. Provide specific findings with evidence from the website (keep findings concise, max 200 chars)
-4. Give actionable recommendations for remediation (keep recommendations concise, max 200 chars)
-5. Prioritize actions (Immediate = within 0-30 days, Short-term = 1-3 months, Long-term = 3-6 months)
-
-Be thorough, specific, and provide practical guidance for business owners to achieve compliance."""
-
-    return full_prompt
-
-
 @app.post("/api/compliance-audit", response_model=ComplianceResponse)
 async def compliance_audit(
     request: ComplianceRequest,
@@ -997,15 +1201,10 @@ async def compliance_audit(
                 detail="ANTHROPIC_API_KEY environment variable not set"
             )
 
-        # Analyze website content
-        analyzer = WebsiteAnalyzer(timeout=request.timeout, api_key=api_key)
-        analysis_result = analyzer.analyze(request.url)
-
-        if not analysis_result.get('success'):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Failed to fetch website: {analysis_result.get('summary', 'Unknown error')}"
-            )
+        # Fetch website content (fetch-only: no summary call to Claude)
+        url = request.url
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
 
         # Helper function to clean quoted strings from analyzer output
         def clean_value(value):
@@ -1019,148 +1218,59 @@ async def compliance_audit(
                     value = value[1:-1]
             return value
 
-        # Build compliance evaluation prompt with cleaned values
-        site_metadata = {
-            'url': clean_value(analysis_result.get('url', '')),
-            'title': clean_value(analysis_result.get('title', '')),
-            'meta_description': clean_value(analysis_result.get('meta_description', ''))
-        }
+        async def run_pipeline():
+            """Fetch, pre-check and assess the site (shared by coalesced requests)."""
+            try:
+                snapshot = await run_blocking('fetch', get_snapshot, url, timeout=request.timeout)
+            except requests.RequestException as e:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Failed to fetch website: {str(e)}"
+                )
+
+            # Build compliance evaluation prompt with cleaned values
+            site_metadata = {
+                'url': clean_value(snapshot.url),
+                'title': clean_value(snapshot.title or ''),
+                'meta_description': clean_value(snapshot.meta_description or '')
+            }
 
-        # Also clean extracted_content before using in prompt
-        extracted_content = clean_value(analysis_result.get('extracted_content', ''))
+            # Also clean extracted_content before using in prompt
+            extracted_content = clean_value(snapshot.text)
 
-        prompt = build_compliance_prompt(
-            extracted_content,
-            site_metadata,
-            request.jurisdictions
-        )
+            # Deterministic pre-checks (policy links, consent scripts, ABN, headers...)
+            # replace most of the page text in the prompt
+            signals = await run_blocking('fetch', get_signals, snapshot)
+            evidence = evidence_table(signals)
 
-        # Call Claude API for compliance analysis
-        client = Anthropic(api_key=api_key)
-        response = client.messages.create(
-            model="claude-sonnet-4-5",
-            max_tokens=8192,
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
+            # One concurrent, schema-constrained Claude call per jurisdiction over a
+            # shared cached site prefix; the summary fields are merged deterministically
+            engine = ComplianceEngine(
+                api_key=api_key,
+                cache=get_default_cache() if request.use_cache else None
+            )
+            try:
+                compliance_data = await run_blocking(
+                    'llm',
+                    engine.assess,
+                    extracted_content,
+                    site_metadata,
+                    request.jurisdictions,
+                    evidence
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            print(f"Compliance LLM usage: {compliance_data['evaluation_stats']}")
+            # Plain JSON, so a run can be shared with other worker processes
+            return {'site_title': snapshot.title, 'compliance': compliance_data}
+
+        # Identical concurrent requests share one pipeline; each still gets its own record
+        key = flight_key(
+            'compliance', url,
+            timeout=request.timeout, jurisdictions=request.jurisdictions, use_cache=request.use_cache
         )
-
-        # Extract and parse JSON response
-        response_text = response.content[0].text
-
-        # CRITICAL FIX: Strip markdown code fence markers if present (```json ... ```)
-        response_text = response_text.strip()
-        if response_text.startswith('```'):
-            # Remove opening code fence (with optional language specifier)
-            start_fence = response_text.find('\n')
-            if start_fence != -1:
-                response_text = response_text[start_fence + 1:]
-        if response_text.endswith('```'):
-            response_text = response_text[:-3].strip()
-
-        # Strip surrounding quotes (single or double) that wrap the JSON
-        response_text = response_text.strip()
-        # Keep stripping matching quotes from outside until we hit {
-        while response_text and response_text[0] in ("'", '"'):
-            quote_char = response_text[0]
-            # Check if the matching quote exists at the end
-            if response_text.endswith(quote_char) and len(response_text) > 1:
-                response_text = response_text[1:-1].strip()
-            else:
-                # Mismatched or single quote - just strip the leading one
-                response_text = response_text[1:].strip()
-                break
-
-        # Find JSON in response (Claude may include explanation text)
-        json_start = response_text.find('{')
-        if json_start == -1:
-            print(f"ERROR: No JSON found in Claude response. Response: {response_text[:500]}")
-            raise ValueError("No JSON found in Claude response")
-
-        # Count braces to find the matching closing brace
-        brace_count = 0
-        in_string = False
-        escape_next = False
-        json_end = -1
-
-        for i in range(json_start, len(response_text)):
-            char = response_text[i]
-
-            # Handle escape sequences in strings
-            if escape_next:
-                escape_next = False
-                continue
-
-            if char == '\\':
-                escape_next = True
-                continue
-
-            # Track if we're inside a string
-            if char == '"':
-                in_string = not in_string
-                continue
-
-            # Only count braces when not in a string
-            if not in_string:
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        json_end = i + 1
-                        break
-
-        # If brace counting failed, try to recover by closing open braces and strings
-        if json_end == -1:
-            print(f"WARNING: Unclosed braces/strings detected (final brace count: {brace_count}, in_string: {in_string}). Attempting recovery...")
-            # The JSON is incomplete - close any unterminated string first
-            if in_string:
-                response_text = response_text + '"'
-            # Then close remaining braces
-            if brace_count > 0:
-                response_text = response_text + ('}' * brace_count)
-            json_end = len(response_text)
-
-        json_str = response_text[json_start:json_end]
-
-        # Log the extracted JSON for debugging if there are issues
-        print(f"Extracted JSON length: {len(json_str)}")
-        print(f"JSON preview (first 500 chars): {json_str[:500]}")
-
-        try:
-            # Try to parse JSON
-            compliance_data = json.loads(json_str)
-        except json.JSONDecodeError as e:
-            # Log detailed error information
-            error_pos = e.pos if hasattr(e, 'pos') else 'unknown'
-            error_line = e.lineno if hasattr(e, 'lineno') else 'unknown'
-            error_col = e.colno if hasattr(e, 'colno') else 'unknown'
-
-            print(f"JSON Parsing Error at position {error_pos}, line {error_line}, col {error_col}")
-            print(f"Error message: {str(e)}")
-
-            # Show context around the error position
-            if error_pos != 'unknown' and isinstance(error_pos, int):
-                start = max(0, error_pos - 150)
-                end = min(len(json_str), error_pos + 150)
-                error_context = json_str[start:end]
-                print(f"Context around error (chars {start}-{end}):")
-                print(error_context)
-                print(f"Error position marker: {' ' * (error_pos - start)}^")
-
-            # Show character at error position
-            if error_pos != 'unknown' and isinstance(error_pos, int) and error_pos < len(json_str):
-                char_at_error = json_str[error_pos]
-                print(f"Character at error position: '{char_at_error}' (ord={ord(char_at_error)})")
-
-            print(f"\nFull JSON length: {len(json_str)} characters")
-            print(f"JSON start (first 300 chars):\n{json_str[:300]}")
-            print(f"\nJSON end (last 300 chars):\n{json_str[-300:]}")
-
-            raise ValueError(f"Failed to parse compliance response JSON at position {error_pos}: {str(e)}")
+        flight = await get_single_flight().run(key, run_pipeline)
+        site_title, compliance_data = flight['site_title'], flight['compliance']
 
         # Generate unique ID
         compliance_id = str(uuid.uuid4())
@@ -1172,7 +1282,7 @@ async def compliance_audit(
             'user_id': user_id,
             'audit_id': request.audit_id,
             'website_url': request.url,
-            'site_title': analysis_result.get('title'),
+            'site_title': site_title,
             'jurisdictions': request.jurisdictions,
             'au_score': compliance_data['jurisdictions'].get('AU', {}).get('score'),
             'nz_score': compliance_data['jurisdictions'].get('NZ', {}).get('score'),
@@ -1193,12 +1303,16 @@ async def compliance_audit(
         if not save_client:
             raise HTTPException(status_code=500, detail="Supabase not configured")
 
-        result = save_client.table('compliance_audits').insert(supabase_data).execute()
+        result = await run_blocking(
+            'fetch',
+            save_client.table('compliance_audits').insert(supabase_data).execute
+        )
 
-        # Also save normalized findings for easier querying
+        # Also save normalized findings for easier querying (one bulk insert)
+        finding_rows = []
         for jurisdiction, data in compliance_data['jurisdictions'].items():
             for category, findings in data.get('categories', {}).items():
-                save_client.table('compliance_findings').insert({
+                finding_rows.append({
                     'compliance_audit_id': compliance_id,
                     'jurisdiction': jurisdiction,
                     'category': category,
@@ -1207,7 +1321,12 @@ async def compliance_audit(
                     'findings': findings.get('findings', []),
                     'recommendations': findings.get('recommendations', []),
                     'priority': findings.get('priority')
-                }).execute()
+                })
+        if finding_rows:
+            await run_blocking(
+                'fetch',
+                save_client.table('compliance_findings').insert(finding_rows).execute
+            )
 
         # Build response
         jurisdiction_scores = {}
@@ -1217,19 +1336,21 @@ async def compliance_audit(
                 'jurisdiction': jurisdiction,
                 'score': j_data.get('score', 0),
                 'findings': [],  # Simplified for response
-                'critical_issues': j_data.get('critical_issues', [])
+                'critical_issues': j_data.get('critical_issues', []),
+                'error': j_data.get('error')
             }
 
         return ComplianceResponse(
             id=compliance_id,
             url=request.url,
-            site_title=analysis_result.get('title'),
+            site_title=site_title,
             jurisdictions=request.jurisdictions,
             overall_score=compliance_data['overall_score'],
             jurisdiction_scores=jurisdiction_scores,
             critical_issues=compliance_data['critical_issues'],
             remediation_roadmap=compliance_data['remediation_roadmap'],
-            created_at=created_at
+            created_at=created_at,
+            failed_jurisdictions=compliance_data['failed_jurisdictions']
         )
 
     except HTTPException:
@@ -1281,9 +1402,10 @@ def build_jurisdiction_scores(audit: dict) -> dict:
 
         jurisdiction_scores[jurisdiction] = {
             'jurisdiction': jurisdiction,
-            'score': audit.get(f'{jurisdiction.lower()}_score', 0),
+            'score': audit.get(f'{jurisdiction.lower()}_score') or 0,  # None if it was not assessed
             'findings': findings,
-            'critical_issues': list(set(critical_issues))  # Remove duplicates
+            'critical_issues': list(set(critical_issues)),  # Remove duplicates
+            'error': jurisdiction_data.get('error') if jurisdiction_data else None
         }
 
     return jurisdiction_scores
@@ -1313,13 +1435,13 @@ async def get_compliance_audit_history(
             raise HTTPException(status_code=500, detail="Supabase not configured")
 
         # Get compliance audits from Supabase, sorted by newest first (using service role to bypass RLS)
-        result = (query_client
+        query = (query_client
                  .table('compliance_audits')
                  .select('*')
                  .eq('user_id', user_id)
                  .order('created_at', desc=True)
-                 .limit(limit)
-                 .execute())
+                 .limit(limit))
+        result = await run_blocking('fetch', query.execute)
 
         audits = []
         for audit in result.data:
@@ -1332,7 +1454,11 @@ async def get_compliance_audit_history(
                 jurisdiction_scores=build_jurisdiction_scores(audit),
                 critical_issues=audit['critical_issues'],
                 remediation_roadmap=audit['remediation_roadmap'],
-                created_at=audit['created_at']
+                created_at=audit['created_at'],
+                failed_jurisdictions=[
+                    code for code in audit.get('jurisdictions', [])
+                    if (audit.get('findings') or {}).get(code, {}).get('error')
+                ]
             ))
 
         return audits
@@ -1367,7 +1493,10 @@ async def get_compliance_audit(
             raise HTTPException(status_code=500, detail="Supabase not configured")
 
         # Get audit from Supabase using service role to bypass RLS
-        result = query_client.table('compliance_audits').select('*').eq('id', compliance_id).eq('user_id', user_id).execute()
+        result = await run_blocking(
+            'fetch',
+            query_client.table('compliance_audits').select('*').eq('id', compliance_id).eq('user_id', user_id).execute
+        )
 
         if not result.data:
             raise HTTPException(status_code=404, detail="Compliance audit not found")
@@ -1383,7 +1512,11 @@ async def get_compliance_audit(
             jurisdiction_scores=build_jurisdiction_scores(audit),
             critical_issues=audit['critical_issues'],
             remediation_roadmap=audit['remediation_roadmap'],
-            created_at=audit['created_at']
+            created_at=audit['created_at'],
+            failed_jurisdictions=[
+                code for code in audit.get('jurisdictions', [])
+                if (audit.get('findings') or {}).get(code, {}).get('error')
+            ]
         )
 
     except HTTPException:
@@ -1422,180 +1555,188 @@ async def generate_compliance_pdf(
             raise HTTPException(status_code=500, detail="Supabase not configured")
 
         # Get compliance audit from Supabase using service role to bypass RLS
-        result = query_client.table('compliance_audits').select('*').eq('id', compliance_id).eq('user_id', user_id).execute()
+        result = await run_blocking(
+            'fetch',
+            query_client.table('compliance_audits').select('*').eq('id', compliance_id).eq('user_id', user_id).execute
+        )
 
         if not result.data:
             raise HTTPException(status_code=404, detail="Compliance audit not found")
 
         audit_data = result.data[0]
 
-        # Import ReportLab for PDF generation
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-        from reportlab.lib import colors
-        from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-
-        # Create PDF
         pdf_path = f"/tmp/compliance_{compliance_id[:8]}.pdf"
-        doc = SimpleDocTemplate(
-            pdf_path,
-            pagesize=letter,
-            rightMargin=0.75*inch,
-            leftMargin=0.75*inch,
-            topMargin=0.5*inch,
-            bottomMargin=0.5*inch,
-        )
 
-        elements = []
-        styles = getSampleStyleSheet()
-
-        # Create custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1F2937'),
-            spaceAfter=12,
-            alignment=TA_CENTER,
-            fontName='Helvetica-Bold',
-        )
+        def render_pdf():
+            """Build the ReportLab document (blocking, runs on the render pool)."""
+            # Import ReportLab for PDF generation
+            from reportlab.lib.pagesizes import letter, A4
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+            from reportlab.lib.units import inch
+            from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+            from reportlab.lib import colors
+            from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+
+            # Create PDF
+            doc = SimpleDocTemplate(
+                pdf_path,
+                pagesize=letter,
+                rightMargin=0.75*inch,
+                leftMargin=0.75*inch,
+                topMargin=0.5*inch,
+                bottomMargin=0.5*inch,
+            )
 
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#2E68DA'),
-            spaceAfter=12,
-            spaceBefore=12,
-            fontName='Helvetica-Bold',
-        )
+            elements = []
+            styles = getSampleStyleSheet()
 
-        # Header with company branding
-        if company_name:
-            elements.append(Paragraph(company_name, heading_style))
-            elements.append(Spacer(1, 0.2*inch))
+            # Create custom styles
+            title_style = ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=24,
+                textColor=colors.HexColor('#1F2937'),
+                spaceAfter=12,
+                alignment=TA_CENTER,
+                fontName='Helvetica-Bold',
+            )
 
-        elements.append(Paragraph('COMPLIANCE AUDIT REPORT', title_style))
-        elements.append(Spacer(1, 0.3*inch))
+            heading_style = ParagraphStyle(
+                'CustomHeading',
+                parent=styles['Heading2'],
+                fontSize=14,
+                textColor=colors.HexColor('#2E68DA'),
+                spaceAfter=12,
+                spaceBefore=12,
+                fontName='Helvetica-Bold',
+            )
 
-        # Website info
-        website_info_data = [
-            ['Website URL:', audit_data['website_url']],
-            ['Site Title:', audit_data['site_title'] or 'N/A'],
-            ['Audit Date:', audit_data['created_at'][:10]],
-            ['Jurisdictions:', ', '.join(audit_data['jurisdictions'])],
-        ]
+            # Header with company branding
+            if company_name:
+                elements.append(Paragraph(company_name, heading_style))
+                elements.append(Spacer(1, 0.2*inch))
 
-        if client_name:
-            website_info_data.insert(0, ['Client Name:', client_name])
-
-        info_table = Table(website_info_data, colWidths=[1.5*inch, 4*inch])
-        info_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E5E7EB')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ]))
-
-        elements.append(info_table)
-        elements.append(Spacer(1, 0.3*inch))
-
-        # Overall score section
-        elements.append(Paragraph('Overall Compliance Score', heading_style))
-
-        score = audit_data['overall_score']
-        score_color = '#10B981' if score >= 80 else '#F59E0B' if score >= 60 else '#EA580C' if score >= 40 else '#DC2626'
-
-        score_data = [
-            ['Score', 'Risk Level', 'Status'],
-            [f"{score}/100", audit_data['highest_risk_level'],
-             '✓ Compliant' if score >= 80 else '⚠ Review Required' if score >= 60 else '✗ Action Needed'],
-        ]
+            elements.append(Paragraph('COMPLIANCE AUDIT REPORT', title_style))
+            elements.append(Spacer(1, 0.3*inch))
+
+            # Website info
+            website_info_data = [
+                ['Website URL:', audit_data['website_url']],
+                ['Site Title:', audit_data['site_title'] or 'N/A'],
+                ['Audit Date:', audit_data['created_at'][:10]],
+                ['Jurisdictions:', ', '.join(audit_data['jurisdictions'])],
+            ]
 
-        score_table = Table(score_data, colWidths=[2*inch, 2*inch, 2*inch])
-        score_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E68DA')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('TEXTCOLOR', (0, 1), (-1, 1), colors.HexColor('#1F2937')),  # Dark gray text for data row
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-            ('BACKGROUND', (0, 1), (-1, 1), colors.HexColor(f'{score_color}20')),
-        ]))
-
-        elements.append(score_table)
-        elements.append(Spacer(1, 0.2*inch))
-
-        # Jurisdiction scores
-        elements.append(Paragraph('Compliance by Jurisdiction', heading_style))
-
-        juris_data = [['Jurisdiction', 'Score', 'Status']]
-        for jurisdiction in audit_data['jurisdictions']:
-            score_key = f"{jurisdiction.lower()}_score"
-            j_score = audit_data.get(score_key)
-            if j_score is not None:
-                status = '✓ Compliant' if j_score >= 80 else '⚠ Partial' if j_score >= 60 else '✗ Non-Compliant'
-                juris_data.append([jurisdiction, f"{j_score}/100", status])
-
-        juris_table = Table(juris_data, colWidths=[1.5*inch, 1.5*inch, 2.5*inch])
-        juris_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E68DA')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ]))
-
-        elements.append(juris_table)
-        elements.append(Spacer(1, 0.2*inch))
-
-        # Critical Issues
-        if audit_data.get('critical_issues'):
-            elements.append(Paragraph('Critical Issues', heading_style))
-            for issue in audit_data['critical_issues']:
-                elements.append(Paragraph(f"• {issue}", styles['Normal']))
+            if client_name:
+                website_info_data.insert(0, ['Client Name:', client_name])
+
+            info_table = Table(website_info_data, colWidths=[1.5*inch, 4*inch])
+            info_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#E5E7EB')),
+                ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+                ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+            ]))
+
+            elements.append(info_table)
+            elements.append(Spacer(1, 0.3*inch))
+
+            # Overall score section
+            elements.append(Paragraph('Overall Compliance Score', heading_style))
+
+            score = audit_data['overall_score']
+            score_color = '#10B981' if score >= 80 else '#F59E0B' if score >= 60 else '#EA580C' if score >= 40 else '#DC2626'
+
+            score_data = [
+                ['Score', 'Risk Level', 'Status'],
+                [f"{score}/100", audit_data['highest_risk_level'],
+                 '✓ Compliant' if score >= 80 else '⚠ Review Required' if score >= 60 else '✗ Action Needed'],
+            ]
+
+            score_table = Table(score_data, colWidths=[2*inch, 2*inch, 2*inch])
+            score_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E68DA')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('TEXTCOLOR', (0, 1), (-1, 1), colors.HexColor('#1F2937')),  # Dark gray text for data row
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 11),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+                ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+                ('BACKGROUND', (0, 1), (-1, 1), colors.HexColor(f'{score_color}20')),
+            ]))
+
+            elements.append(score_table)
             elements.append(Spacer(1, 0.2*inch))
 
-        # Remediation Roadmap
-        if audit_data.get('remediation_roadmap'):
-            elements.append(PageBreak())
-            elements.append(Paragraph('Remediation Roadmap', heading_style))
-
-            roadmap = audit_data['remediation_roadmap']
-
-            for period, label in [('immediate', 'Immediate (0-30 days)'),
-                                 ('short_term', 'Short-term (1-3 months)'),
-                                 ('long_term', 'Long-term (3-6 months)')]:
-                if period in roadmap and roadmap[period]:
-                    elements.append(Paragraph(f"<b>{label}</b>", styles['Heading3']))
-                    for action in roadmap[period]:
-                        elements.append(Paragraph(f"• {action}", styles['Normal']))
-                    elements.append(Spacer(1, 0.1*inch))
-
-        elements.append(Spacer(1, 0.3*inch))
-
-        # Footer
-        if company_details:
-            footer_style = ParagraphStyle(
-                'Footer',
-                parent=styles['Normal'],
-                fontSize=8,
-                textColor=colors.HexColor('#6B7280'),
-                alignment=TA_CENTER,
-            )
-            elements.append(Paragraph(f"<i>{company_details}</i>", footer_style))
+            # Jurisdiction scores
+            elements.append(Paragraph('Compliance by Jurisdiction', heading_style))
+
+            juris_data = [['Jurisdiction', 'Score', 'Status']]
+            for jurisdiction in audit_data['jurisdictions']:
+                score_key = f"{jurisdiction.lower()}_score"
+                j_score = audit_data.get(score_key)
+                if j_score is not None:
+                    status = '✓ Compliant' if j_score >= 80 else '⚠ Partial' if j_score >= 60 else '✗ Non-Compliant'
+                    juris_data.append([jurisdiction, f"{j_score}/100", status])
+
+            juris_table = Table(juris_data, colWidths=[1.5*inch, 1.5*inch, 2.5*inch])
+            juris_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E68DA')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+                ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+            ]))
+
+            elements.append(juris_table)
+            elements.append(Spacer(1, 0.2*inch))
 
-        # Build PDF
-        doc.build(elements)
+            # Critical Issues
+            if audit_data.get('critical_issues'):
+                elements.append(Paragraph('Critical Issues', heading_style))
+                for issue in audit_data['critical_issues']:
+                    elements.append(Paragraph(f"• {issue}", styles['Normal']))
+                elements.append(Spacer(1, 0.2*inch))
+
+            # Remediation Roadmap
+            if audit_data.get('remediation_roadmap'):
+                elements.append(PageBreak())
+                elements.append(Paragraph('Remediation Roadmap', heading_style))
+
+                roadmap = audit_data['remediation_roadmap']
+
+                for period, label in [('immediate', 'Immediate (0-30 days)'),
+                                     ('short_term', 'Short-term (1-3 months)'),
+                                     ('long_term', 'Long-term (3-6 months)')]:
+                    if period in roadmap and roadmap[period]:
+                        elements.append(Paragraph(f"<b>{label}</b>", styles['Heading3']))
+                        for action in roadmap[period]:
+                            elements.append(Paragraph(f"• {action}", styles['Normal']))
+                        elements.append(Spacer(1, 0.1*inch))
+
+            elements.append(Spacer(1, 0.3*inch))
+
+            # Footer
+            if company_details:
+                footer_style = ParagraphStyle(
+                    'Footer',
+                    parent=styles['Normal'],
+                    fontSize=8,
+                    textColor=colors.HexColor('#6B7280'),
+                    alignment=TA_CENTER,
+                )
+                elements.append(Paragraph(f"<i>{company_details}</i>", footer_style))
+
+            # Build PDF
+            doc.build(elements)
+
+        await run_blocking('render', render_pdf)
 
         # Read PDF file
         with open(pdf_path, 'rb') as f:
@@ -1629,8 +1770,15 @@ async def generate_compliance_pdf(
 # ==================== Main ====================
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
 
+    # "python fastapi_server.py worker" runs audit job workers only
+    if len(sys.argv) > 1 and sys.argv[1] == 'worker':
+        audit_jobs.workers = max(1, AUDIT_JOB_WORKERS)
+        audit_jobs.run_forever()
+        sys.exit(0)
+
     # Get port from environment or use default
     port = int(os.getenv('PORT', 8000))
 
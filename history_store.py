@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+History store - Indexed SQLite storage for analysis and audit history.
+
+Replaces the whole-file analysis_history.json / audit_history.json storage.
+Each record is one row, so lookups by id, inserts and deletes touch a single
+row, and per-user history pages are served from a (user_id, timestamp) index.
+Records carrying a content_fingerprint are also indexed by it, so earlier
+results for unchanged page content can be found and reused.
+The database runs in WAL mode so readers never block the writer.
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# History kinds and the timestamp column each is ordered by
+ANALYSES = 'analyses'
+AUDITS = 'audits'
+
+_TIMESTAMP_COLUMNS = {
+    ANALYSES: 'created_at',
+    AUDITS: 'audit_timestamp',
+}
+
+
+class HistoryStore:
+    """SQLite-backed history of analyses and audits, one row per record."""
+
+    def __init__(self, path: str = "history.db"):
+        """
+        Initialize the store, creating tables and indexes if needed.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        for kind, timestamp_column in _TIMESTAMP_COLUMNS.items():
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {kind} (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT,
+                    {timestamp_column} TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    fingerprint TEXT
+                )
+            """)
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({kind})")}
+            if 'fingerprint' not in columns:
+                # Databases created before content fingerprints
+                conn.execute(f"ALTER TABLE {kind} ADD COLUMN fingerprint TEXT")
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{kind}_user_{timestamp_column} "
+                f"ON {kind} (user_id, {timestamp_column})"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{kind}_fingerprint_{timestamp_column} "
+                f"ON {kind} (fingerprint, {timestamp_column})"
+            )
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections are not thread-safe)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, kind: str, record_id: str, record: Dict) -> None:
+        """Insert or replace a single record."""
+        timestamp_column = _TIMESTAMP_COLUMNS[kind]
+        conn = self._connection()
+        conn.execute(
+            f"INSERT OR REPLACE INTO {kind} (id, user_id, {timestamp_column}, data, fingerprint) "
+            f"VALUES (?, ?, ?, ?, ?)",
+            (record_id, record.get('user_id'), record[timestamp_column], json.dumps(record),
+             record.get('content_fingerprint'))
+        )
+        conn.commit()
+
+    def get(self, kind: str, record_id: str) -> Optional[Dict]:
+        """Return a record by id, or None if it does not exist."""
+        row = self._connection().execute(
+            f"SELECT data FROM {kind} WHERE id = ?", (record_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, kind: str, record_id: str) -> bool:
+        """Delete a record by id. Returns False if it did not exist."""
+        conn = self._connection()
+        cursor = conn.execute(f"DELETE FROM {kind} WHERE id = ?", (record_id,))
+        conn.commit()
+        return cursor.rowcount > 0
+
+    def clear(self, kind: str) -> None:
+        """Delete all records of a kind."""
+        conn = self._connection()
+        conn.execute(f"DELETE FROM {kind}")
+        conn.commit()
+
+    def list_for_user(self, kind: str, user_id: str, limit: int = 100) -> Tuple[List[Tuple[str, Dict]], int]:
+        """
+        Return a user's newest records and their total count.
+
+        Returns:
+            ([(record_id, record), ...] newest first, total records for the user)
+        """
+        timestamp_column = _TIMESTAMP_COLUMNS[kind]
+        conn = self._connection()
+        rows = conn.execute(
+            f"SELECT id, data FROM {kind} WHERE user_id = ? ORDER BY {timestamp_column} DESC LIMIT ?",
+            (user_id, limit)
+        ).fetchall()
+        total = conn.execute(
+            f"SELECT COUNT(*) FROM {kind} WHERE user_id = ?", (user_id,)
+        ).fetchone()[0]
+        return [(record_id, json.loads(data)) for record_id, data in rows], total
+
+    def find_by_fingerprint(
+        self,
+        kind: str,
+        fingerprint: str,
+        since: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Tuple[str, Dict]]:
+        """
+        Return the newest records with a given content fingerprint.
+
+        Args:
+            kind: ANALYSES or AUDITS
+            fingerprint: content_fingerprint of the page
+            since: Only records with a timestamp at or after this ISO timestamp
+            limit: Maximum number of records returned
+
+        Returns:
+            [(record_id, record), ...] newest first
+        """
+        timestamp_column = _TIMESTAMP_COLUMNS[kind]
+        rows = self._connection().execute(
+            f"SELECT id, data FROM {kind} WHERE fingerprint = ? AND {timestamp_column} >= ? "
+            f"ORDER BY {timestamp_column} DESC LIMIT ?",
+            (fingerprint, since or '', limit)
+        ).fetchall()
+        return [(record_id, json.loads(data)) for record_id, data in rows]
+
+    def migrate_json(self, kind: str, json_path: str) -> int:
+        """
+        One-shot import of a legacy JSON history file.
+
+        Existing rows are kept (INSERT OR IGNORE), and the file is renamed to
+        <name>.migrated afterwards so the import never runs twice. The import
+        runs under the database's write lock, so processes starting at the
+        same time migrate the file once; a file that is missing or was
+        already renamed by another process counts as migrated.
+
+        Returns:
+            Number of records imported
+        """
+        path = Path(json_path)
+        if not path.exists():
+            return 0
+
+        timestamp_column = _TIMESTAMP_COLUMNS[kind]
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            try:
+                with open(path, 'r') as f:
+                    history = json.load(f)
+            except FileNotFoundError:
+                # Another process migrated it while this one waited for the lock
+                conn.rollback()
+                return 0
+
+            cursor = conn.executemany(
+                f"INSERT OR IGNORE INTO {kind} (id, user_id, {timestamp_column}, data) VALUES (?, ?, ?, ?)",
+                [
+                    (record_id, record.get('user_id'), record.get(timestamp_column, ''), json.dumps(record))
+                    for record_id, record in history.items()
+                ]
+            )
+            imported = cursor.rowcount
+            try:
+                path.rename(path.with_name(path.name + '.migrated'))
+            except FileNotFoundError:
+                pass
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        print(f"Migrated {imported} {kind} records from {json_path}")
+        return imported
+
+
+def main():
+    """Migrate legacy JSON history files into the SQLite store."""
+    parser = argparse.ArgumentParser(
+        description='Migrate analysis_history.json and audit_history.json into the SQLite history store'
+    )
+    parser.add_argument('--db', default='history.db', help='SQLite database file (default: history.db)')
+    parser.add_argument('--analyses', default='analysis_history.json', help='Analysis history JSON file')
+    parser.add_argument('--audits', default='audit_history.json', help='Audit history JSON file')
+    args = parser.parse_args()
+
+    store = HistoryStore(args.db)
+    store.migrate_json(ANALYSES, args.analyses)
+    store.migrate_json(AUDITS, args.audits)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+HTML parser backend - Picks the fastest BeautifulSoup tree builder available.
+
+Parsing is the main CPU cost of analyzing a page. BeautifulSoup's built-in
+'html.parser' is pure Python; the C-accelerated 'lxml' builder produces the
+same tree API several times faster. parse_html() uses lxml when it is
+installed and falls back to html.parser otherwise. HTML_PARSER_BACKEND
+forces a specific backend.
+
+Run this module against saved pages to check that every installed backend
+extracts identical fields (tests/test_html_parser.py runs the same check
+over the bundled templates):
+
+    python html_parser.py saved_pages/*.html
+"""
+
+import argparse
+import os
+import sys
+from typing import List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+
+# Supported tree builders, fastest first
+PARSER_BACKENDS = ('lxml', 'html.parser')
+
+
+def available_backends() -> List[str]:
+    """Installed backends, fastest first."""
+    backends = []
+    for backend in PARSER_BACKENDS:
+        try:
+            BeautifulSoup('', backend)
+        except FeatureNotFound:
+            continue
+        backends.append(backend)
+    return backends
+
+
+def _select_backend() -> str:
+    """Backend from HTML_PARSER_BACKEND, else the fastest installed one."""
+    requested = os.getenv('HTML_PARSER_BACKEND')
+    installed = available_backends()
+    if requested:
+        if requested not in installed:
+            raise ValueError(
+                f"HTML parser backend {requested!r} is not available. "
+                f"Installed: {', '.join(installed)}"
+            )
+        return requested
+    return installed[0]
+
+
+# Backend used by parse_html() unless one is passed explicitly
+DEFAULT_BACKEND = _select_backend()
+
+
+def parse_html(markup: Union[str, bytes], backend: Optional[str] = None) -> BeautifulSoup:
+    """
+    Parse an HTML document.
+
+    Args:
+        markup: Document as bytes (encoding is detected) or text
+        backend: Tree builder to use (defaults to DEFAULT_BACKEND)
+
+    Returns:
+        Parsed BeautifulSoup tree
+    """
+    return BeautifulSoup(markup, backend or DEFAULT_BACKEND)
+
+
+def compare_backends(content: Union[str, bytes], backends: Optional[List[str]] = None) -> List[Tuple]:
+    """
+    Extract a page's fields with every backend and compare them.
+
+    Args:
+        content: Page as bytes or text
+        backends: Backends to compare (defaults to all installed ones); the
+            last one is the reference
+
+    Returns:
+        Mismatches as (field, backend, reference backend, value, reference value)
+    """
+    from page_snapshot import extract_features, extract_full_content
+
+    backends = backends or available_backends()
+    results = {}
+    for backend in backends:
+        soup = parse_html(content, backend)
+        fields = extract_features(soup)
+        fields['text'] = extract_full_content(soup)
+        results[backend] = fields
+
+    reference_backend = backends[-1]
+    reference = results[reference_backend]
+    return [
+        (key, backend, reference_backend, fields[key], reference[key])
+        for backend, fields in results.items()
+        for key in reference
+        if fields[key] != reference[key]
+    ]
+
+
+def main():
+    """Check that all installed backends extract identical page fields."""
+    parser = argparse.ArgumentParser(
+        description='Check that every installed HTML parser backend extracts identical page fields'
+    )
+    parser.add_argument('pages', nargs='+', help='Saved HTML pages to check')
+    args = parser.parse_args()
+
+    backends = available_backends()
+    print(f"Backends: {', '.join(backends)} (default: {DEFAULT_BACKEND})")
+
+    mismatches = 0
+    for path in args.pages:
+        with open(path, 'rb') as f:
+            content = f.read()
+
+        for key, backend, reference_backend, value, reference_value in compare_backends(content, backends):
+            mismatches += 1
+            print(f"❌ {path}: {key} differs ({backend} vs {reference_backend})")
+            print(f"   {backend}: {value!r:.200}")
+            print(f"   {reference_backend}: {reference_value!r:.200}")
+
+    if mismatches:
+        print(f"{mismatches} mismatched fields")
+        sys.exit(1)
+    print(f"✅ {len(args.pages)} pages extract identically on all backends")
+
+if __name__ == '__main__':
+    main()
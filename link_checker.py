@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Link checker - Concurrent broken-link detection for audits.
+
+Links are checked in parallel over the shared keep-alive connection pool, with a cap
+on concurrent requests per host so a page full of same-site links does not
+hammer one server. Links wait in a per-host queue rather than in a worker
+thread, so a host at its cap never holds workers that other hosts' links
+could use. HEAD is tried first and GET is used for servers that
+reject it. Results are cached process-wide by URL, so re-auditing a site (or
+auditing pages that share a footer) does not re-check the same links, and a
+whole page's links are checked within a fixed total time budget.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlparse
+
+import requests
+
+from http_client import HTTPClient, get_http_client
+
+
+# Link states
+OK = 'ok'
+BROKEN = 'broken'
+TIMEOUT = 'timeout'  # No answer in time: neither ok nor broken
+ERROR = 'error'  # Could not be checked (e.g. malformed URL): neither ok nor broken
+
+# Statuses meaning "HEAD not supported here", retried with GET
+_HEAD_REJECTED = (403, 405, 501)
+
+
+class LinkChecker:
+    """Checks links concurrently with per-host limits and a shared result cache."""
+
+    def __init__(
+        self,
+        max_workers: int = 16,
+        per_host_limit: int = 4,
+        timeout: float = 2.0,
+        cache_ttl_seconds: float = 3600,
+        max_cache_entries: int = 10000,
+        client: Optional[HTTPClient] = None
+    ):
+        """
+        Initialize the checker.
+
+        Args:
+            max_workers: Links checked in parallel overall
+            per_host_limit: Links checked in parallel per host
+            timeout: Per-request timeout in seconds
+            cache_ttl_seconds: Seconds a link's result is reused
+            max_cache_entries: Maximum number of cached results
+            client: HTTP client (defaults to the shared process-wide client)
+        """
+        self.per_host_limit = max(1, per_host_limit)
+        self.timeout = timeout
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.max_cache_entries = max(1, max_cache_entries)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='link-check')
+        self._client = client or get_http_client()
+
+        self._lock = threading.Lock()
+        self._host_running: Dict[str, int] = {}
+        self._host_queues: Dict[str, 'deque[Tuple[str, Future]]'] = {}
+        self._cache: 'OrderedDict[str, Tuple[str, float]]' = OrderedDict()
+
+    def check(self, hrefs: Iterable[str], base_url: str, budget_seconds: float = 5.0, max_links: int = 300) -> Dict:
+        """
+        Check a page's links within a total time budget.
+
+        Args:
+            hrefs: Link targets as found on the page (relative links allowed)
+            base_url: URL of the page, used to resolve relative links
+            budget_seconds: Total time allowed for the whole check
+            max_links: Maximum number of distinct links checked
+
+        Returns:
+            Dictionary with checked, broken and unverified (timed out or
+            uncheckable) counts, the broken URLs, and links skipped because
+            the budget ran out
+        """
+        urls = _http_links(hrefs, base_url)[:max_links]
+
+        results: Dict[str, str] = {}
+        pending = {}
+        for url in urls:
+            cached = self._cached(url)
+            if cached is not None:
+                results[url] = cached
+            else:
+                pending[self._schedule(url)] = url
+
+        done, not_done = wait(pending, timeout=budget_seconds)
+        for future in done:
+            results[pending[future]] = future.result()
+        for future in not_done:
+            # Out of budget; links already being checked still finish in the
+            # background and land in the cache for the next audit
+            future.cancel()
+
+        broken = [url for url in urls if results.get(url) == BROKEN]
+        return {
+            'checked': sum(1 for state in results.values() if state not in (TIMEOUT, ERROR)),
+            'broken': len(broken),
+            'unverified': sum(1 for state in results.values() if state in (TIMEOUT, ERROR)),
+            'skipped': len(not_done),
+            'broken_urls': broken,
+        }
+
+    def _schedule(self, url: str) -> Future:
+        """
+        Queue a link check behind its host's limit.
+
+        Returns:
+            Future resolving to the link's state; cancelling it before the
+            check starts drops the check
+        """
+        future: Future = Future()
+        try:
+            host = urlparse(url).netloc
+        except ValueError:
+            future.set_result(ERROR)
+            return future
+        with self._lock:
+            if self._host_running.get(host, 0) < self.per_host_limit:
+                self._host_running[host] = self._host_running.get(host, 0) + 1
+                self._executor.submit(self._check_host, host, url, future)
+            else:
+                self._host_queues.setdefault(host, deque()).append((url, future))
+        return future
+
+    def _check_host(self, host: str, url: str, future: Future) -> None:
+        """Check links of one host in this worker until its queue is empty."""
+        while True:
+            if future.set_running_or_notify_cancel():
+                try:
+                    state = self._request(url)
+                    if state not in (TIMEOUT, ERROR):
+                        self._store(url, state)
+                except Exception as e:
+                    # One bad link must not fail the whole page's check
+                    print(f"⚠️ Link check failed for {url[:100]}: {str(e)}")
+                    state = ERROR
+                future.set_result(state)
+
+            with self._lock:
+                queue = self._host_queues.get(host)
+                if not queue:
+                    self._host_queues.pop(host, None)
+                    self._host_running[host] -= 1
+                    if not self._host_running[host]:
+                        del self._host_running[host]
+                    return
+                url, future = queue.popleft()
+
+    def _request(self, url: str) -> str:
+        try:
+            response = self._client.head(url, timeout=self.timeout, allow_redirects=True)
+            if response.status_code in _HEAD_REJECTED:
+                # Some servers refuse HEAD; fetch headers only via a streamed GET
+                with self._client.get(url, timeout=self.timeout, allow_redirects=True, stream=True) as response:
+                    pass
+            return BROKEN if response.status_code >= 400 else OK
+        except requests.Timeout:
+            return TIMEOUT
+        except requests.RequestException:
+            # DNS failure, refused connection, TLS error, too many redirects
+            return BROKEN
+        except Exception:
+            # Malformed href: bad IDNA host (UnicodeError), unparsable
+            # location (LocationParseError), invalid URL (ValueError)
+            return ERROR
+
+    def _cached(self, url: str) -> Optional[str]:
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is None:
+                return None
+            state, checked_at = entry
+            if time.time() - checked_at > self.cache_ttl_seconds:
+                del self._cache[url]
+                return None
+            self._cache.move_to_end(url)
+            return state
+
+    def _store(self, url: str, state: str) -> None:
+        with self._lock:
+            self._cache[url] = (state, time.time())
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.max_cache_entries:
+                self._cache.popitem(last=False)
+
+
+def _http_links(hrefs: Iterable[str], base_url: str) -> List[str]:
+    """Absolute http(s) link targets, without fragments or duplicates."""
+    urls = []
+    seen = set()
+    for href in hrefs:
+        href = (href or '').strip()
+        if not href or href.startswith('#'):
+            continue
+        try:
+            url = urldefrag(urljoin(base_url, href))[0]
+        except ValueError:
+            # Malformed (e.g. "http://[::1"); kept so it is reported as unverified
+            url = href
+        if url.startswith(('http://', 'https://')) and url not in seen:
+            seen.add(url)
+            urls.append(url)
+    return urls
+
+
+_default_checker: Optional[LinkChecker] = None
+_default_checker_lock = threading.Lock()
+
+
+def get_default_link_checker() -> LinkChecker:
+    """
+    Process-wide link checker configured from the environment.
+
+    LINK_CHECK_WORKERS (default 16), LINK_CHECK_PER_HOST (default 4),
+    LINK_CHECK_TIMEOUT_SECONDS (default 2), LINK_CHECK_CACHE_TTL_SECONDS
+    (default 3600).
+    """
+    global _default_checker
+
+    with _default_checker_lock:
+        if _default_checker is None:
+            _default_checker = LinkChecker(
+                max_workers=int(os.getenv('LINK_CHECK_WORKERS', 16)),
+                per_host_limit=int(os.getenv('LINK_CHECK_PER_HOST', 4)),
+                timeout=float(os.getenv('LINK_CHECK_TIMEOUT_SECONDS', 2)),
+                cache_ttl_seconds=float(os.getenv('LINK_CHECK_CACHE_TTL_SECONDS', 3600))
+            )
+        return _default_checker
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+LLM response cache - Persistent on-disk cache for Claude replies.
+
+Identical prompts (re-auditing an unchanged page, double-tapping "analyze")
+are answered from a local SQLite file instead of calling Claude again.
+Entries are keyed by model + normalized prompt hash, expire after a TTL and
+are evicted least-recently-used once the cache exceeds its entry limit.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class LLMResponseCache:
+    """SQLite-backed cache of Claude response text with TTL and LRU eviction."""
+
+    def __init__(
+        self,
+        path: str = "llm_cache.db",
+        ttl_seconds: int = 86400,
+        max_entries: int = 5000
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file
+            ttl_seconds: Seconds before an entry expires
+            max_entries: Maximum number of entries kept (least recently used are evicted)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_cache_last_accessed ON llm_cache (last_accessed)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(request: Dict) -> str:
+        """
+        Build the cache key for a messages.create() request.
+
+        Only fields that affect the reply are hashed (model, max_tokens, system,
+        messages, tools, tool_choice). Whitespace in prompt text is collapsed and cache_control
+        markers are dropped, so cosmetic prompt changes still hit.
+        """
+        payload = {
+            field: _normalize(request.get(field))
+            for field in ("model", "max_tokens", "system", "messages", "tools", "tool_choice")
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response text, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_cache SET last_accessed = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return response
+
+    def set(self, key: str, model: str, response: str) -> None:
+        """Store a response and evict least recently used entries over the limit."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now)
+            )
+
+            count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY last_accessed ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for this process plus current cache size."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+def _normalize(value):
+    """Collapse whitespace in prompt text and drop cache_control markers."""
+    if isinstance(value, str):
+        return ' '.join(value.split())
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if k != 'cache_control'}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    return value
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[LLMResponseCache]:
+    """
+    Process-wide cache configured from the environment.
+
+    LLM_CACHE_ENABLED (default "1"), LLM_CACHE_PATH (default "llm_cache.db"),
+    LLM_CACHE_TTL_SECONDS (default 86400), LLM_CACHE_MAX_ENTRIES (default 5000).
+    Returns None when caching is disabled.
+    """
+    global _default_cache
+
+    if os.getenv('LLM_CACHE_ENABLED', '1') in ('0', 'false', 'False'):
+        return None
+
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache(
+                path=os.getenv('LLM_CACHE_PATH', 'llm_cache.db'),
+                ttl_seconds=int(os.getenv('LLM_CACHE_TTL_SECONDS', 86400)),
+                max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', 5000))
+            )
+        return _default_cache
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+LLM gateway - One rate-limit-aware scheduler for every Claude call.
+
+Analyses, audits and compliance assessments used to create their own
+Anthropic clients and fire requests without coordination. Under load they
+hit 429s, which either turned into fallback scores or failed the request.
+All calls now go through this gateway, which:
+
+- keeps requests, input tokens and output tokens per minute within budget
+  with token buckets (estimated before the call, reconciled with the
+  reported usage afterwards),
+- caps the number of calls in flight,
+- serves queued calls by priority class, so interactive requests are sent
+  before background (batch) jobs, first come first served within a class,
+- retries rate-limit, overload, server and connection errors with
+  exponential backoff and full jitter, honouring retry-after, and pauses
+  every queued call while the API is rate limiting,
+- bounds a call by an optional deadline covering queueing, attempts and
+  backoff (quick scans pass their latency budget), and does not retry once
+  it would be exceeded,
+- reports queue depth, wait times and retry counts for /api/metrics.
+
+Callers run on worker threads, so waiting blocks the calling thread.
+"""
+
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+import anthropic
+
+
+# Priority classes (lower is served first)
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BATCH: 'batch'}
+
+# HTTP statuses worth retrying: rate limited, overloaded, transient server errors
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """Raised when a call's deadline passes before it could be sent."""
+
+
+class TokenBucket:
+    """Continuously refilling budget of units per minute."""
+
+    def __init__(self, per_minute: float):
+        """
+        Initialize the bucket (full).
+
+        Args:
+            per_minute: Units added per minute; also the bucket capacity
+        """
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken (0 if available now)."""
+        self._refill(now)
+        # A single call larger than the bucket waits for a full bucket
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def take(self, amount: float, now: float) -> None:
+        """Take amount from the bucket (may go negative when reconciling)."""
+        self._refill(now)
+        self.tokens -= amount
+
+
+def usage_to_dict(usage) -> Dict[str, int]:
+    """Token usage of a Claude response, including prompt-cache writes and reads."""
+    return {
+        "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+    }
+
+
+def estimate_input_tokens(request: Dict) -> int:
+    """Rough input token count of a messages.create() request (~4 characters per token)."""
+    payload = json.dumps(
+        [request.get("system"), request.get("messages"), request.get("tools")],
+        default=str
+    )
+    return len(payload) // 4 + 1
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by the API's retry-after headers, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value:
+            try:
+                return max(0.0, float(value) * scale)
+            except ValueError:
+                continue
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a failed Claude call may succeed when repeated."""
+    if isinstance(error, (anthropic.APIConnectionError, anthropic.APITimeoutError)):
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        return error.status_code in RETRYABLE_STATUSES
+    return False
+
+
+class LLMGateway:
+    """Shared, rate-limited, prioritized entry point for messages.create()."""
+
+    def __init__(
+        self,
+        requests_per_minute: int = 1000,
+        input_tokens_per_minute: int = 400000,
+        output_tokens_per_minute: int = 80000,
+        max_concurrency: int = 16,
+        max_retries: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0
+    ):
+        """
+        Initialize the gateway.
+
+        Args:
+            requests_per_minute: Request budget (RPM)
+            input_tokens_per_minute: Input token budget (ITPM); prompt-cache
+                reads are not counted, as the API does not count them
+            output_tokens_per_minute: Output token budget (OTPM); max_tokens is
+                reserved before the call and the unused part returned after it
+            max_concurrency: Calls in flight at once
+            max_retries: Retries of a call after a retryable error
+            base_delay: First backoff delay in seconds (doubled per retry)
+            max_delay: Longest backoff delay in seconds
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._requests = TokenBucket(requests_per_minute)
+        self._input_tokens = TokenBucket(input_tokens_per_minute)
+        self._output_tokens = TokenBucket(output_tokens_per_minute)
+
+        self._cond = threading.Condition()
+        self._queue = []  # Heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._active = 0
+        self._paused_until = 0.0  # Set from retry-after while rate limited
+        self._clients: Dict[Optional[str], anthropic.Anthropic] = {}
+
+        self._calls = 0
+        self._retries = 0
+        self._rate_limited = 0
+        self._errors = 0
+        self._deadline_exceeded = 0
+        self._retry_reasons: Dict[str, int] = {}
+        self._peak_queue_depth = 0
+        self._waits = {name: deque(maxlen=1000) for name in PRIORITY_NAMES.values()}
+
+    def client(self, api_key: Optional[str] = None) -> anthropic.Anthropic:
+        """Anthropic client for api_key (None: ANTHROPIC_API_KEY); retries are left to the gateway."""
+        with self._cond:
+            if api_key not in self._clients:
+                self._clients[api_key] = anthropic.Anthropic(api_key=api_key, max_retries=0)
+            return self._clients[api_key]
+
+    def create(
+        self,
+        priority: int = INTERACTIVE,
+        api_key: Optional[str] = None,
+        deadline: Optional[float] = None,
+        **request
+    ):
+        """
+        Send a messages.create() request once the budget allows it.
+
+        Args:
+            priority: INTERACTIVE or BATCH
+            api_key: Anthropic API key (None: ANTHROPIC_API_KEY)
+            deadline: Optional seconds the whole call may take, including
+                queueing, attempts and backoff; each attempt's timeout is
+                capped to what is left, and a timed-out attempt is not retried
+            **request: messages.create() arguments
+
+        Returns:
+            The Claude message
+
+        Raises:
+            anthropic.APIError: If the call fails with a non-retryable error,
+                or still fails after max_retries retries or at its deadline
+            LLMDeadlineExceeded: If the deadline passes while queued
+        """
+        client = self.client(api_key)
+        input_estimate = estimate_input_tokens(request)
+        output_reserved = request.get("max_tokens", 1024)
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+
+        for attempt in range(self.max_retries + 1):
+            self._acquire(priority, input_estimate, output_reserved, deadline_at)
+            if deadline_at is not None:
+                remaining = max(0.1, deadline_at - time.monotonic())
+                request["timeout"] = min(request.get("timeout") or remaining, remaining)
+            try:
+                message = client.messages.create(**request)
+            except Exception as e:
+                self._release()
+                retry_after = retry_after_seconds(e)
+                backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                delay = retry_after + random.uniform(0, self.base_delay) if retry_after is not None else backoff
+
+                # No retry if the deadline is spent (a timed-out attempt used it up)
+                out_of_time = deadline_at is not None and (
+                    isinstance(e, anthropic.APITimeoutError) or time.monotonic() + delay >= deadline_at
+                )
+                with self._cond:
+                    if not is_retryable(e) or attempt == self.max_retries or out_of_time:
+                        self._errors += 1
+                        raise
+                    self._retries += 1
+                    reason = str(getattr(e, "status_code", None) or type(e).__name__)
+                    self._retry_reasons[reason] = self._retry_reasons.get(reason, 0) + 1
+                    if getattr(e, "status_code", None) == 429:
+                        # Hold back every queued call, not just this one
+                        self._rate_limited += 1
+                        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                        self._cond.notify_all()
+                time.sleep(delay)
+                continue
+
+            usage = usage_to_dict(getattr(message, "usage", None))
+            self._release(
+                input_correction=usage["input_tokens"] + usage["cache_creation_input_tokens"] - input_estimate,
+                output_correction=usage["output_tokens"] - output_reserved
+            )
+            return message
+
+    def _acquire(
+        self,
+        priority: int,
+        input_tokens: int,
+        output_tokens: int,
+        deadline_at: Optional[float] = None
+    ) -> None:
+        """Wait for this call's turn, a free slot and enough budget, then take them."""
+        entry = (priority, next(self._sequence))
+        enqueued = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+            self._peak_queue_depth = max(self._peak_queue_depth, len(self._queue))
+            while True:
+                now = time.monotonic()
+                remaining = deadline_at - now if deadline_at is not None else None
+                if remaining is not None and remaining <= 0:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                    self._deadline_exceeded += 1
+                    self._cond.notify_all()
+                    raise LLMDeadlineExceeded(f"Claude call not sent within its {now - enqueued:.1f}s deadline")
+                if self._queue[0] == entry and self._active < self.max_concurrency:
+                    wait = max(
+                        self._paused_until - now,
+                        self._requests.time_until(1, now),
+                        self._input_tokens.time_until(input_tokens, now),
+                        self._output_tokens.time_until(output_tokens, now),
+                    )
+                    if wait <= 0:
+                        break
+                    self._cond.wait(timeout=wait if remaining is None else min(wait, remaining))
+                else:
+                    # Woken when the head of the queue or a slot changes
+                    self._cond.wait(timeout=remaining)
+
+            heapq.heappop(self._queue)
+            self._requests.take(1, now)
+            self._input_tokens.take(input_tokens, now)
+            self._output_tokens.take(output_tokens, now)
+            self._active += 1
+            self._calls += 1
+            self._waits[PRIORITY_NAMES.get(priority, 'batch')].append(now - enqueued)
+            self._cond.notify_all()
+
+    def _release(self, input_correction: int = 0, output_correction: int = 0) -> None:
+        """Free a slot and settle the token estimates against the reported usage."""
+        with self._cond:
+            now = time.monotonic()
+            self._input_tokens.take(input_correction, now)
+            self._output_tokens.take(output_correction, now)
+            self._active -= 1
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        """Queue depth, wait times, budget and retry counters."""
+        with self._cond:
+            now = time.monotonic()
+            waits = {}
+            for name, samples in self._waits.items():
+                ordered = sorted(samples)
+                waits[name] = {
+                    "samples": len(ordered),
+                    "avg_seconds": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+                    "p95_seconds": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3) if ordered else 0.0,
+                    "max_seconds": round(ordered[-1], 3) if ordered else 0.0,
+                }
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _ in self._queue:
+                queued[PRIORITY_NAMES.get(priority, 'batch')] += 1
+            for bucket in (self._requests, self._input_tokens, self._output_tokens):
+                bucket._refill(now)
+            return {
+                "queue_depth": len(self._queue),
+                "queued": queued,
+                "peak_queue_depth": self._peak_queue_depth,
+                "in_flight": self._active,
+                "max_concurrency": self.max_concurrency,
+                "calls": self._calls,
+                "retries": self._retries,
+                "rate_limited": self._rate_limited,
+                "retry_reasons": dict(self._retry_reasons),
+                "errors": self._errors,
+                "deadline_exceeded": self._deadline_exceeded,
+                "paused_seconds": round(max(0.0, self._paused_until - now), 3),
+                "wait_time": waits,
+                "budget_remaining": {
+                    "requests": int(self._requests.tokens),
+                    "input_tokens": int(self._input_tokens.tokens),
+                    "output_tokens": int(self._output_tokens.tokens),
+                },
+            }
+
+
+_default_gateway: Optional[LLMGateway] = None
+_default_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """
+    Process-wide LLM gateway configured from the environment.
+
+    LLM_RPM (default 1000), LLM_INPUT_TPM (default 400000), LLM_OUTPUT_TPM
+    (default 80000), LLM_MAX_CONCURRENCY (default 16), LLM_MAX_RETRIES
+    (default 4). Set the budgets to the organization's Anthropic rate limits.
+    """
+    global _default_gateway
+
+    with _default_gateway_lock:
+        if _default_gateway is None:
+            _default_gateway = LLMGateway(
+                requests_per_minute=int(os.getenv('LLM_RPM', 1000)),
+                input_tokens_per_minute=int(os.getenv('LLM_INPUT_TPM', 400000)),
+                output_tokens_per_minute=int(os.getenv('LLM_OUTPUT_TPM', 80000)),
+                max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', 16)),
+                max_retries=int(os.getenv('LLM_MAX_RETRIES', 4))
+            )
+        return _default_gateway
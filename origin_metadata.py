@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Origin metadata - Cached robots.txt and sitemap.xml probes per site origin.
+
+Every deep-scan audit needs to know whether the site has a robots.txt and a
+sitemap. Those answers belong to the origin (scheme + host), not the page,
+and rarely change, so they are fetched once per origin and cached with a
+TTL, including negative results ("no sitemap"). Probes are started in the
+background when an audit begins, so they overlap the main page fetch
+instead of adding to it, and repeat audits of a domain skip them entirely.
+Each origin's probes share a total time budget and try a bounded number of
+sitemap candidates, and callers wait for them only up to a timeout.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from http_client import get_http_client
+
+
+# Bytes read from robots.txt and sitemap files
+MAX_ROBOTS_BYTES = 512 * 1024
+MAX_SITEMAP_BYTES = 10 * 1024 * 1024
+
+# Sitemap URLs tried per origin (robots.txt directives, then /sitemap.xml)
+MAX_SITEMAP_CANDIDATES = 3
+
+_SITEMAP_DIRECTIVE_RE = re.compile(r'^\s*sitemap\s*:\s*(\S+)', re.IGNORECASE | re.MULTILINE)
+_LOC_RE = re.compile(rb'<loc>', re.IGNORECASE)
+_SITEMAP_INDEX_RE = re.compile(rb'<sitemapindex', re.IGNORECASE)
+
+
+@dataclass
+class OriginMetadata:
+    """robots.txt and sitemap facts for one origin."""
+    origin: str
+    has_robots: bool = False
+    robots_txt: Optional[str] = None
+    has_sitemap: bool = False
+    sitemap_url: Optional[str] = None
+    sitemap_url_count: Optional[int] = None  # <loc> entries in the sitemap
+    sitemap_is_index: bool = False  # Sitemap lists other sitemaps
+    complete: bool = True  # False if a probe failed (cached for a shorter time)
+    fetched_at: float = field(default_factory=time.time)
+
+
+class OriginMetadataCache:
+    """Per-origin robots.txt/sitemap cache with background, de-duplicated probes."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = 6 * 3600,
+        negative_ttl_seconds: float = 3600,
+        timeout: float = 3.0,
+        fetch_budget_seconds: float = 10.0,
+        wait_timeout: float = 10.0,
+        max_entries: int = 10000,
+        max_workers: int = 8
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: Seconds a complete result is reused
+            negative_ttl_seconds: Seconds a result with a missing robots.txt
+                or sitemap, or a failed probe, is reused
+            timeout: Per-request timeout in seconds
+            fetch_budget_seconds: Total time for all of an origin's probes
+            wait_timeout: Seconds get() waits for an in-flight probe
+            max_entries: Maximum number of cached origins (least recently
+                used are evicted)
+            max_workers: Origins probed in parallel
+        """
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.timeout = timeout
+        self.fetch_budget_seconds = fetch_budget_seconds
+        self.wait_timeout = wait_timeout
+        self.max_entries = max(1, max_entries)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='origin-meta')
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, OriginMetadata]' = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+
+    def prefetch(self, url: str) -> Future:
+        """
+        Start probing url's origin in the background unless already cached.
+
+        Returns:
+            Future resolving to the OriginMetadata
+        """
+        origin = origin_of(url)
+        with self._lock:
+            cached = self._fresh(origin)
+            if cached is not None:
+                future: Future = Future()
+                future.set_result(cached)
+                return future
+
+            future = self._in_flight.get(origin)
+            if future is None:
+                future = self._executor.submit(self._probe, origin)
+                self._in_flight[origin] = future
+            return future
+
+    def get(self, url: str) -> Optional[OriginMetadata]:
+        """
+        Metadata for url's origin, waiting for an in-flight probe if any.
+
+        Returns:
+            OriginMetadata, or None if the probe did not finish within
+            wait_timeout (it keeps running and is cached for the next audit)
+        """
+        try:
+            return self.prefetch(url).result(timeout=self.wait_timeout)
+        except FutureTimeoutError:
+            print(f"⚠️ robots.txt/sitemap probe for {origin_of(url)} still running after {self.wait_timeout}s")
+            return None
+
+    def _fresh(self, origin: str) -> Optional[OriginMetadata]:
+        entry = self._entries.get(origin)
+        if entry is None:
+            return None
+        positive = entry.complete and entry.has_robots and entry.has_sitemap
+        ttl = self.ttl_seconds if positive else self.negative_ttl_seconds
+        if time.time() - entry.fetched_at > ttl:
+            del self._entries[origin]
+            return None
+        self._entries.move_to_end(origin)
+        return entry
+
+    def _probe(self, origin: str) -> OriginMetadata:
+        """Fetch robots.txt and the sitemap for an origin and cache the result."""
+        try:
+            metadata = self._fetch(origin)
+        except Exception:
+            with self._lock:
+                self._in_flight.pop(origin, None)
+            raise
+        with self._lock:
+            self._entries[origin] = metadata
+            self._entries.move_to_end(origin)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._in_flight.pop(origin, None)
+        return metadata
+
+    def _fetch(self, origin: str) -> OriginMetadata:
+        metadata = OriginMetadata(origin=origin)
+        deadline = time.monotonic() + self.fetch_budget_seconds
+
+        robots_url = f"{origin}/robots.txt"
+        status, body = self._get(robots_url, MAX_ROBOTS_BYTES, deadline)
+        if status is None:
+            metadata.complete = False
+        elif status == 200:
+            metadata.has_robots = True
+            metadata.robots_txt = body.decode('utf-8', errors='replace')
+
+        # Sitemaps declared in robots.txt first, then the conventional location
+        conventional = f"{origin}/sitemap.xml"
+        declared = [
+            sitemap_url for sitemap_url in dict.fromkeys(
+                urljoin(robots_url, directive)
+                for directive in _SITEMAP_DIRECTIVE_RE.findall(metadata.robots_txt or '')
+            )
+            if sitemap_url != conventional
+        ]
+        candidates = declared[:MAX_SITEMAP_CANDIDATES - 1] + [conventional]
+
+        for sitemap_url in candidates:
+            if time.monotonic() >= deadline:
+                metadata.complete = False
+                break
+            status, body = self._get(sitemap_url, MAX_SITEMAP_BYTES, deadline)
+            if status is None:
+                metadata.complete = False
+            elif status == 200:
+                metadata.has_sitemap = True
+                metadata.sitemap_url = sitemap_url
+                metadata.sitemap_url_count = len(_LOC_RE.findall(body))
+                metadata.sitemap_is_index = bool(_SITEMAP_INDEX_RE.search(body[:4096]))
+                break
+
+        return metadata
+
+    def _get(self, url: str, max_bytes: int, deadline: float) -> Tuple[Optional[int], bytes]:
+        """
+        GET up to max_bytes of url before the deadline (a time.monotonic() value).
+
+        Returns:
+            (status, body); status None on failure or if the deadline passed
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None, b''
+        try:
+            with get_http_client().get(url, timeout=min(self.timeout, remaining), stream=True) as response:
+                if response.status_code != 200:
+                    return response.status_code, b''
+                chunks: List[bytes] = []
+                received = 0
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    chunks.append(chunk)
+                    received += len(chunk)
+                    if received >= max_bytes:
+                        break
+                    if time.monotonic() >= deadline:
+                        return None, b''
+                return response.status_code, b''.join(chunks)[:max_bytes]
+        except requests.RequestException:
+            return None, b''
+
+
+def origin_of(url: str) -> str:
+    """scheme://host[:port] of a URL."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+_default_cache: Optional[OriginMetadataCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_origin_cache() -> OriginMetadataCache:
+    """
+    Process-wide origin metadata cache configured from the environment.
+
+    ORIGIN_METADATA_TTL_SECONDS (default 21600), ORIGIN_METADATA_NEGATIVE_TTL_SECONDS
+    (default 3600), ORIGIN_METADATA_FETCH_BUDGET_SECONDS (default 10),
+    ORIGIN_METADATA_WAIT_SECONDS (default 10).
+    """
+    global _default_cache
+
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = OriginMetadataCache(
+                ttl_seconds=float(os.getenv('ORIGIN_METADATA_TTL_SECONDS', 6 * 3600)),
+                negative_ttl_seconds=float(os.getenv('ORIGIN_METADATA_NEGATIVE_TTL_SECONDS', 3600)),
+                fetch_budget_seconds=float(os.getenv('ORIGIN_METADATA_FETCH_BUDGET_SECONDS', 10)),
+                wait_timeout=float(os.getenv('ORIGIN_METADATA_WAIT_SECONDS', 10))
+            )
+        return _default_cache
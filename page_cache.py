@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Page cache - Persistent on-disk HTTP cache for fetched pages.
+
+Agencies re-run analyses and audits of the same site many times a day, and
+most of those pages have not changed in between. Page bodies are stored in a
+local SQLite file together with their validators (ETag / Last-Modified).
+The next fetch of the same URL sends If-None-Match / If-Modified-Since, and
+on a 304 Not Modified the stored body is used instead of downloading it
+again. Only complete 200 responses that carry a validator and allow storing
+are cached. Entries expire after a TTL and are evicted least-recently-used
+over the entry limit.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class CachedPage:
+    """A stored page body with the validators needed to revalidate it."""
+    url: str  # URL as requested (cache key)
+    final_url: str  # URL after redirects
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    encoding: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Request headers asking the server to answer 304 if unchanged."""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """SQLite-backed store of page bodies and validators with TTL and LRU eviction."""
+
+    def __init__(
+        self,
+        path: str = "page_cache.db",
+        ttl_seconds: int = 7 * 86400,
+        max_entries: int = 1000
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file
+            ttl_seconds: Seconds before an entry expires
+            max_entries: Maximum number of pages kept (least recently used are evicted)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+
+        self.revalidated = 0
+        self.changed = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS page_cache (
+                url TEXT PRIMARY KEY,
+                final_url TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                content BLOB NOT NULL,
+                encoding TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_page_cache_last_accessed ON page_cache (last_accessed)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def is_storable(status_code: int, headers: Dict[str, str], truncated: bool) -> bool:
+        """Whether a response can be stored and revalidated later."""
+        if status_code != 200 or truncated:
+            return False
+        headers = _lower_keys(headers)
+        if 'no-store' in headers.get('cache-control', '').lower():
+            return False
+        return bool(headers.get('etag') or headers.get('last-modified'))
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Return the stored page for url, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT final_url, status_code, headers, content, encoding, etag, last_modified, stored_at "
+                "FROM page_cache WHERE url = ?", (url,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            final_url, status_code, headers, content, encoding, etag, last_modified, stored_at = row
+            if now - stored_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM page_cache WHERE url = ?", (url,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+
+            return CachedPage(
+                url=url,
+                final_url=final_url,
+                status_code=status_code,
+                headers=json.loads(headers),
+                content=content,
+                encoding=encoding,
+                etag=etag,
+                last_modified=last_modified,
+                stored_at=stored_at
+            )
+
+    def mark_revalidated(self, url: str) -> None:
+        """Record a 304 for url: the stored body is current again."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE page_cache SET stored_at = ?, last_accessed = ? WHERE url = ?", (now, now, url)
+            )
+            self._conn.commit()
+            self.revalidated += 1
+
+    def set(
+        self,
+        url: str,
+        final_url: str,
+        status_code: int,
+        headers: Dict[str, str],
+        content: bytes,
+        encoding: str
+    ) -> None:
+        """Store a page body and evict least recently used entries over the limit."""
+        validators = _lower_keys(headers)
+        now = time.time()
+        with self._lock:
+            replaced = self._conn.execute(
+                "SELECT 1 FROM page_cache WHERE url = ?", (url,)
+            ).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO page_cache "
+                "(url, final_url, status_code, headers, content, encoding, etag, last_modified, stored_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, final_url, status_code, json.dumps(headers), content, encoding,
+                 validators.get('etag'), validators.get('last-modified'), now, now)
+            )
+            if replaced:
+                # Stored copy existed but the server sent a new body
+                self.changed += 1
+
+            count = self._conn.execute("SELECT COUNT(*) FROM page_cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM page_cache WHERE url IN "
+                    "(SELECT url FROM page_cache ORDER BY last_accessed ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def delete(self, url: str) -> None:
+        """Drop the stored page for url (e.g. when it is no longer storable)."""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM page_cache WHERE url = ?", (url,)).rowcount
+            self._conn.commit()
+            self.changed += deleted
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM page_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Revalidation counters for this process plus current cache size."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM page_cache").fetchone()[0]
+        lookups = self.revalidated + self.changed + self.misses
+        return {
+            "revalidated": self.revalidated,
+            "changed": self.changed,
+            "misses": self.misses,
+            "revalidation_rate": round(self.revalidated / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+def _lower_keys(headers: Dict[str, str]) -> Dict[str, str]:
+    """Header dict with lower-cased names, for case-insensitive lookups."""
+    return {name.lower(): value for name, value in headers.items()}
+
+
+_default_cache: Optional[PageCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_page_cache() -> Optional[PageCache]:
+    """
+    Process-wide page cache configured from the environment.
+
+    PAGE_CACHE_ENABLED (default "1"), PAGE_CACHE_PATH (default "page_cache.db"),
+    PAGE_CACHE_TTL_SECONDS (default 604800), PAGE_CACHE_MAX_ENTRIES (default 1000).
+    Returns None when caching is disabled.
+    """
+    global _default_cache
+
+    if os.getenv('PAGE_CACHE_ENABLED', '1') in ('0', 'false', 'False'):
+        return None
+
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PageCache(
+                path=os.getenv('PAGE_CACHE_PATH', 'page_cache.db'),
+                ttl_seconds=int(os.getenv('PAGE_CACHE_TTL_SECONDS', 7 * 86400)),
+                max_entries=int(os.getenv('PAGE_CACHE_MAX_ENTRIES', 1000))
+            )
+        return _default_cache
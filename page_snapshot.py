@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Page snapshot - Fetch-once view of a web page shared by all pipelines.
+
+The analyzer, the auditor and the compliance check all need the same page.
+A PageSnapshot holds the response (bytes, headers, final URL) together with
+the metadata, structural features and readable text parsed from it, so a
+page is downloaded and parsed once and then reused. Metadata and features
+are collected in a single walk over the parsed tree (see extract_features).
+Snapshots are kept in a small in-memory cache for a short TTL, which covers
+an audit and a compliance run of the same URL fired back to back.
+
+Pages are streamed rather than buffered whole: non-HTML responses are
+rejected up front and reading stops at PAGE_MAX_BYTES, with the snapshot
+flagged as truncated. The body is decoded once while it streams (see
+charset.BodyDecoder) and every parser works on that text.
+
+Complete pages are also stored on disk with their ETag/Last-Modified
+validators (see page_cache). Later fetches revalidate the stored copy and
+skip the download on 304 Not Modified; snapshot.cache_status tells callers
+whether the content was downloaded, revalidated or reused from memory.
+
+Each snapshot carries a content fingerprint (see content_fingerprint): a
+hash of the readable text and key metadata with volatile tokens such as
+times and nonces masked, so callers can tell when a re-downloaded page has
+not meaningfully changed.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
+
+import requests
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+from charset import BodyDecoder, header_charset
+from html_parser import parse_html
+from http_client import get_http_client
+from page_cache import get_default_page_cache
+
+
+# Bytes of a page body read before the rest is skipped (PAGE_MAX_BYTES)
+MAX_PAGE_BYTES = int(os.getenv('PAGE_MAX_BYTES', 5 * 1024 * 1024))
+
+# Content types accepted as pages (a missing Content-Type is sniffed instead)
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+
+CHUNK_SIZE = 64 * 1024
+
+# Tokens that change between loads without the content changing: clock
+# times, ISO timestamps and long hex/digit runs (nonces, cache busters)
+_VOLATILE_RE = re.compile(
+    r'\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?'
+    r'|\b\d{1,2}:\d{2}(?::\d{2})?(?:\s*[ap]m)?\b'
+    r'|\b(?=[0-9a-f]*\d)[0-9a-f]{12,}\b',
+    re.IGNORECASE
+)
+
+# Where a snapshot's content came from (PageSnapshot.cache_status)
+FETCHED = 'fetched'  # Downloaded in full
+REVALIDATED = 'revalidated'  # Server answered 304; stored copy reused
+MEMORY = 'memory'  # Reused from the in-memory snapshot cache
+
+
+class UnsupportedContentError(requests.RequestException):
+    """Raised when a URL does not serve an HTML page."""
+
+
+@dataclass
+class PageSnapshot:
+    """A fetched page and everything parsed from it."""
+    url: str  # URL as requested
+    final_url: str  # URL after redirects
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    html: str  # Body decoded once (see charset.BodyDecoder)
+    encoding: str
+    title: Optional[str]  # Display title: <title>, og:title or first <h1>
+    meta_description: Optional[str]  # meta description or og:description
+    metadata: Dict  # Raw head metadata used by the auditor
+    structure: Dict  # Page structure counts used by the auditor
+    links: List[str]  # href of every link on the page, in document order
+    text: str  # Readable page text (scripts, styles and navigation removed)
+    markup: Dict = field(default_factory=dict)  # Raw markup used by compliance checks (see extract_features)
+    truncated: bool = False  # Body exceeded MAX_PAGE_BYTES and was cut off
+    cache_status: str = FETCHED  # FETCHED, REVALIDATED or MEMORY
+    fingerprint: str = ''  # Normalized content hash (see content_fingerprint)
+    fetched_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def parse(
+        cls,
+        url: str,
+        final_url: str,
+        status_code: int,
+        headers: Dict[str, str],
+        content: bytes,
+        html: str,
+        encoding: str,
+        truncated: bool = False,
+        cache_status: str = FETCHED
+    ) -> 'PageSnapshot':
+        """Parse a fetched, already decoded page body into a snapshot."""
+        # The parser works on the decoded text, so it does no charset detection
+        soup = parse_html(html)
+        features = extract_features(soup)
+
+        metadata = features['metadata']
+        metadata.update({
+            'https': final_url.startswith('https'),
+            'status_code': status_code,
+            'truncated': truncated
+        })
+
+        # Text extraction strips elements from the tree, so it runs last
+        text = extract_full_content(soup)
+        fingerprint = content_fingerprint(features['metadata'], features['structure'], text, features['links'])
+
+        return cls(
+            url=url,
+            final_url=final_url,
+            status_code=status_code,
+            headers=headers,
+            content=content,
+            html=html,
+            encoding=encoding,
+            title=features['title'],
+            meta_description=features['meta_description'],
+            metadata=metadata,
+            structure=features['structure'],
+            links=features['links'],
+            text=text,
+            markup=features['markup'],
+            truncated=truncated,
+            cache_status=cache_status,
+            fingerprint=fingerprint
+        )
+
+
+# Tags counted by extract_features, keyed by tag name
+_COUNTED_TAGS = ('h1', 'nav', 'footer', 'main', 'img', 'form', 'button', 'a')
+
+# Meta tags (by name or property) reported in the metadata
+_META_KEYS = ('description', 'og:title', 'og:description', 'viewport')
+
+def extract_features(soup: BeautifulSoup) -> Dict:
+    """
+    Collect head metadata and structural features in one pass over the tree.
+
+    Replaces a dozen find()/find_all() calls and a get_text() walk, each of
+    which traversed the whole document, with a single traversal.
+
+    Returns:
+        Dictionary with:
+            title: display title (<title>, og:title or first <h1>)
+            meta_description: meta description or og:description
+            metadata: title, meta_description, og_title, og_description,
+                viewport and charset as reported to the auditor
+            structure: tag counts, word count and title length
+            links: href of every <a href> in document order
+            markup: what the compliance checks look at (see
+                compliance_signals): anchors as (text, href), script
+                sources and inline scripts, email-collecting forms, the
+                html lang, elements with cookie/GDPR ids or classes and
+                the full page text including navigation and footer
+    """
+    counts = dict.fromkeys(_COUNTED_TAGS, 0)
+    img_with_alt = 0
+    links = []
+    anchors = []
+    script_sources = []
+    inline_scripts = []
+    email_forms = 0
+    email_forms_with_checkbox = 0
+    consent_elements = []
+    lang = ''
+    title_tag = None
+    first_h1 = None
+    meta_by_name = {}
+    meta_by_property = {}
+    has_charset = False
+    strings = []
+    string_types = soup.interesting_string_types
+
+    for node in soup.descendants:
+        if not isinstance(node, Tag):
+            # Same strings get_text() would return (no comments, scripts or styles)
+            if type(node) in string_types:
+                strings.append(node)
+            continue
+
+        name = node.name
+        if name in counts:
+            counts[name] += 1
+
+        marker = ' '.join(filter(None, (node.get('id'), ' '.join(node.get('class') or ()))))
+        if marker and ('cookie' in marker.lower() or 'gdpr' in marker.lower()):
+            consent_elements.append((name, marker))
+
+        if name == 'a':
+            if 'href' in node.attrs:
+                links.append(node['href'])
+                anchors.append((' '.join(node.get_text(' ', strip=True).split()), node['href'].strip()))
+        elif name == 'script':
+            if node.get('src'):
+                script_sources.append(node['src'])
+            else:
+                inline_scripts.append(node.get_text())
+        elif name == 'form':
+            if node.find('input', attrs={'type': 'email'}):
+                email_forms += 1
+                if node.find('input', attrs={'type': 'checkbox'}):
+                    email_forms_with_checkbox += 1
+        elif name == 'html':
+            lang = lang or node.get('lang') or ''
+        elif name == 'img':
+            if node.get('alt'):
+                img_with_alt += 1
+        elif name == 'meta':
+            meta_name = node.get('name')
+            if meta_name in _META_KEYS:
+                meta_by_name.setdefault(meta_name, node)
+            meta_property = node.get('property')
+            if meta_property in _META_KEYS:
+                meta_by_property.setdefault(meta_property, node)
+            if node.get('charset') is not None:
+                has_charset = True
+        elif name == 'title':
+            if title_tag is None:
+                title_tag = node
+        elif name == 'h1':
+            if first_h1 is None:
+                first_h1 = node
+
+    def meta_content(key: str) -> str:
+        meta = meta_by_name.get(key) or meta_by_property.get(key)
+        return meta.get('content', '') if meta else ''
+
+    raw_title = title_tag.get_text() if title_tag else ''
+
+    # Display title: <title>, then og:title, then the first H1
+    title = None
+    og_title = meta_by_property.get('og:title')
+    if title_tag and title_tag.string:
+        title = title_tag.string.strip()
+    elif og_title and og_title.get('content'):
+        title = og_title.get('content').strip()
+    elif first_h1 and first_h1.get_text():
+        title = first_h1.get_text().strip()
+
+    # Display description: meta description, then og:description
+    meta_description = None
+    for meta in (meta_by_name.get('description'), meta_by_property.get('og:description')):
+        if meta and meta.get('content'):
+            meta_description = meta.get('content').strip()
+            break
+
+    return {
+        'title': title,
+        'meta_description': meta_description,
+        'metadata': {
+            'title': raw_title,
+            'meta_description': meta_content('description'),
+            'og_title': meta_content('og:title'),
+            'og_description': meta_content('og:description'),
+            'viewport': meta_content('viewport'),
+            'charset': has_charset,
+        },
+        'structure': {
+            'has_h1': counts['h1'] > 0,
+            'h1_count': counts['h1'],
+            'has_nav': counts['nav'] > 0,
+            'has_footer': counts['footer'] > 0,
+            'has_main': counts['main'] > 0,
+            'img_count': counts['img'],
+            'img_with_alt': img_with_alt,
+            'form_count': counts['form'],
+            'button_count': counts['button'],
+            'link_count': counts['a'],
+            'word_count': len(''.join(strings).split()),
+            'title_length': len(raw_title),
+        },
+        'links': links,
+        'markup': {
+            'anchors': anchors,
+            'script_sources': script_sources,
+            'inline_scripts': inline_scripts,
+            'email_forms': email_forms,
+            'email_forms_with_checkbox': email_forms_with_checkbox,
+            'consent_elements': consent_elements,
+            'lang': lang,
+            'text': ' '.join(stripped for stripped in (string.strip() for string in strings) if stripped),
+        },
+    }
+
+
+def extract_full_content(soup: BeautifulSoup) -> str:
+    """
+    Extract meaningful content from the page.
+    Removes scripts, styles, and navigation elements (modifies soup).
+    """
+    # Remove script and style elements
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+    # Remove common non-content elements
+    for nav in soup(["nav", "footer", "aside"]):
+        nav.decompose()
+
+    # Get text from main content areas
+    main_content = soup.find('main') or soup.find('article') or soup.find('div', class_=['content', 'main', 'body'])
+
+    if main_content:
+        text = main_content.get_text(separator=' ', strip=True)
+    else:
+        text = soup.get_text(separator=' ', strip=True)
+
+    # Clean up whitespace
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    text = ' '.join(chunk for chunk in chunks if chunk)
+
+    return text[:5000]  # Limit to 5000 chars for API
+
+
+def content_fingerprint(metadata: Dict, structure: Dict, text: str, links: List[str] = ()) -> str:
+    """
+    Hash of a page's meaningful content.
+
+    Covers the readable text, head metadata, structure counts and the set of
+    link targets (what the summary and audit scores are based on; the
+    broken-link and sitemap checks of a deep scan follow the links), with
+    whitespace collapsed and volatile tokens masked, so a page that differs
+    only in nonces, rendered times or markup formatting keeps the same
+    fingerprint.
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    normalized = _VOLATILE_RE.sub('#', ' '.join(text.split()))
+    payload = {
+        'text': normalized,
+        'metadata': {key: value for key, value in metadata.items() if key not in ('status_code', 'truncated')},
+        'structure': structure,
+        'links': sorted({link.strip() for link in links}),
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class SnapshotCache:
+    """Small in-memory LRU of recent snapshots with a short TTL."""
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 128):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: Seconds a snapshot is reused; 0 disables caching
+            max_entries: Maximum number of snapshots kept
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._entries: 'OrderedDict[str, PageSnapshot]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[PageSnapshot]:
+        """Return a fresh snapshot for url, or None."""
+        with self._lock:
+            snapshot = self._entries.get(url)
+            if snapshot is None:
+                return None
+            if time.time() - snapshot.fetched_at > self.ttl_seconds:
+                del self._entries[url]
+                return None
+            self._entries.move_to_end(url)
+            return snapshot
+
+    def put(self, snapshot: PageSnapshot) -> None:
+        """Store a snapshot, evicting the least recently used over the limit."""
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[snapshot.url] = snapshot
+            self._entries.move_to_end(snapshot.url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Process-wide snapshot cache (PAGE_SNAPSHOT_TTL_SECONDS, default 60)
+snapshot_cache = SnapshotCache(
+    ttl_seconds=float(os.getenv('PAGE_SNAPSHOT_TTL_SECONDS', 60)),
+    max_entries=int(os.getenv('PAGE_SNAPSHOT_MAX_ENTRIES', 128))
+)
+
+
+def get_snapshot(
+    url: str,
+    timeout: int = 10,
+    headers: Optional[Dict[str, str]] = None,
+    use_cache: bool = True
+) -> PageSnapshot:
+    """
+    Fetch and parse a page, reusing a recent snapshot of the same URL.
+
+    A page stored in the disk cache is revalidated with a conditional
+    request and not downloaded again if the server answers 304.
+
+    Args:
+        url: Page URL (including scheme)
+        timeout: Request timeout in seconds
+        headers: Extra request headers (merged over DEFAULT_HEADERS)
+        use_cache: False skips the in-memory snapshot cache (the disk cache
+            is still revalidated, so the content is always current)
+
+    Returns:
+        PageSnapshot of the page
+
+    Raises:
+        requests.RequestException: If the page cannot be fetched
+        UnsupportedContentError: If the URL does not serve HTML
+    """
+    if use_cache:
+        snapshot = snapshot_cache.get(url)
+        if snapshot is not None:
+            return replace(snapshot, cache_status=MEMORY)
+
+    page_cache = get_default_page_cache()
+    cached = page_cache.get(url) if page_cache else None
+    request_headers = dict(headers or {})
+    if cached is not None:
+        request_headers.update(cached.conditional_headers())
+
+    with get_http_client().get(url, headers=request_headers, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        not_modified = cached is not None and response.status_code == 304
+        if not not_modified:
+            content, html, encoding, truncated = read_page_body(response)
+            final_url, status_code, response_headers = response.url, response.status_code, dict(response.headers)
+
+    if not_modified:
+        page_cache.mark_revalidated(url)
+        snapshot = PageSnapshot.parse(
+            url, cached.final_url, cached.status_code, cached.headers, cached.content,
+            cached.content.decode(cached.encoding, errors='replace'), cached.encoding,
+            cache_status=REVALIDATED
+        )
+    else:
+        snapshot = PageSnapshot.parse(
+            url, final_url, status_code, response_headers, content, html, encoding, truncated
+        )
+        if page_cache is not None:
+            if page_cache.is_storable(status_code, response_headers, truncated):
+                page_cache.set(url, final_url, status_code, response_headers, content, encoding)
+            elif cached is not None:
+                page_cache.delete(url)
+
+    snapshot_cache.put(snapshot)
+    return snapshot
+
+
+def read_page_body(response: requests.Response, max_bytes: int = MAX_PAGE_BYTES):
+    """
+    Stream a response body, decoding as it arrives and stopping at max_bytes.
+
+    Args:
+        response: Response opened with stream=True
+        max_bytes: Maximum number of body bytes read
+
+    Returns:
+        (body bytes, decoded text, encoding, truncated flag)
+
+    Raises:
+        UnsupportedContentError: If the response is not an HTML page
+    """
+    content_type_header = response.headers.get('Content-Type', '')
+    content_type = content_type_header.split(';')[0].strip().lower()
+    if content_type and content_type not in HTML_CONTENT_TYPES:
+        raise UnsupportedContentError(f"Unsupported content type: {content_type}", response=response)
+
+    decoder = BodyDecoder(header_charset(content_type_header))
+    received = 0
+    truncated = False
+
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+        if not chunk:
+            continue
+        if received == 0 and not content_type and b'\x00' in chunk[:1024]:
+            raise UnsupportedContentError("Response body is binary, not HTML", response=response)
+
+        if received + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - received]
+            truncated = True
+
+        decoder.feed(chunk)
+        received += len(chunk)
+        if truncated:
+            # Stop reading; closing the response drops the rest of the body
+            break
+
+    html = decoder.finish(complete=not truncated)
+    return decoder.content, html, decoder.encoding, truncated
@@ -14,9 +14,9 @@ from http.server import HTTPServer, SimpleHTTPRequestHandler
 import urllib.parse
 from urllib.parse import urljoin
 
-try:
-    from playwright.sync_api import sync_playwright
-except ImportError:
+from browser_pool import get_default_pool, PLAYWRIGHT_AVAILABLE
+
+if not PLAYWRIGHT_AVAILABLE:
     print("ERROR: Playwright not installed. Run: python -m pip install playwright")
     sys.exit(1)
 
@@ -546,17 +546,9 @@ class PDFPreviewHandler(SimpleHTTPRequestHandler):
         template = env.get_template(template_file)
         html_content = template.render(**data)
 
-        # Convert HTML to PDF using Playwright
+        # Convert HTML to PDF on a warm pooled browser
         try:
-            with sync_playwright() as p:
-                # Launch browser with optimizations
-                browser = p.chromium.launch(headless=True, args=['--no-sandbox', '--disable-setuid-sandbox'])
-                page = browser.new_page()
-                page.set_content(html_content, wait_until='networkidle')
-                pdf_bytes = page.pdf(format='A4')
-                page.close()
-                browser.close()
-            return pdf_bytes
+            return get_default_pool().render_pdf(html_content, pdf_options={'format': 'A4'})
         except Exception as e:
             print(f"PDF rendering error: {e}")
             raise
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Single flight - Coalesce identical in-flight analyses and audits.
+
+A double tap in the app, or a team auditing the same prospect at once, used
+to start one full fetch + Claude pipeline per request. Requests are now
+keyed by normalized URL plus the options that change the result. While a
+pipeline for a key is running in this process, further requests with the
+same key await that pipeline instead of starting their own. Each request
+still saves its own history record from the shared result.
+
+Across worker processes the running pipeline is claimed with a row in a
+small SQLite file. When the pipeline finishes, its result (JSON) is
+published on the claim row for a short while; a process that found the key
+claimed elsewhere waits and then takes that result instead of running the
+pipeline again, even for force_refresh or uncached requests. If the
+pipeline failed, the claim is dropped and the waiting process runs its own.
+A running pipeline keeps refreshing its claim, so only claims left by a
+crashed process expire. The SQLite calls run on a worker thread, never on
+the event loop.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for coalescing.
+
+    Adds https:// when no scheme is given, lower-cases scheme and host,
+    drops default ports and the fragment, and uses "/" for an empty path.
+    """
+    url = url.strip()
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    netloc = host if port is None or (scheme, port) in (('http', 80), ('https', 443)) else f"{host}:{port}"
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+
+def flight_key(kind: str, url: str, **options) -> str:
+    """Coalescing key for a pipeline of the given kind, URL and options."""
+    return json.dumps([kind, normalize_url(url), options], sort_keys=True, default=str)
+
+
+class SingleFlight:
+    """Runs at most one pipeline per key at a time, sharing its result."""
+
+    def __init__(
+        self,
+        path: Optional[str] = "single_flight.db",
+        claim_timeout: float = 600.0,
+        poll_interval: float = 0.25,
+        result_ttl: float = 60.0
+    ):
+        """
+        Initialize the coalescer.
+
+        Args:
+            path: SQLite file for cross-process claims (None: this process only)
+            claim_timeout: Seconds without a refresh after which another
+                process's claim is treated as abandoned (refreshed every
+                third of it)
+            poll_interval: Seconds between checks of another process's claim
+            result_ttl: Seconds a finished run's result stays on its claim
+                row for processes that were waiting on it
+        """
+        self.path = path
+        self.claim_timeout = claim_timeout
+        self.poll_interval = poll_interval
+        self.result_ttl = result_ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.cross_process_waits = 0
+        self.cross_process_results = 0
+
+        self._flights: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS flights (
+                    key TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    claimed_at REAL NOT NULL,
+                    result TEXT,
+                    finished_at REAL
+                )
+            """)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(flights)")}
+            if 'finished_at' not in columns:
+                # Databases created before results were published
+                self._conn.execute("ALTER TABLE flights ADD COLUMN result TEXT")
+                self._conn.execute("ALTER TABLE flights ADD COLUMN finished_at REAL")
+            # Claims of a previous run of this process are stale
+            self._conn.execute("DELETE FROM flights WHERE owner = ?", (self.owner,))
+            self._conn.commit()
+
+    async def run(self, key: str, pipeline: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run pipeline for key, or join the run already in flight.
+
+        The shared run is shielded, so a caller that goes away does not
+        cancel it for the others.
+
+        Args:
+            key: Coalescing key (see flight_key)
+            pipeline: Zero-argument callable returning an awaitable result
+
+        Returns:
+            The pipeline's result (shared by every caller of the run)
+
+        Raises:
+            Whatever the pipeline raised, for every caller of the run
+
+        The result must be JSON-serialisable to be shared with other
+        processes; callers in other processes receive the decoded JSON.
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            print(f"🔗 Joined in-flight pipeline: {key}")
+            return await asyncio.shield(flight)
+
+        self.leaders += 1
+        flight = asyncio.ensure_future(self._lead(key, pipeline))
+        self._flights[key] = flight
+        flight.add_done_callback(lambda _: self._flights.pop(key, None))
+        return await asyncio.shield(flight)
+
+    async def _lead(self, key: str, pipeline: Callable[[], Awaitable[Any]]) -> Any:
+        """Claim key across processes and run the pipeline, or take the result of another process's run."""
+        if self._conn is None:
+            return await pipeline()
+
+        arrived = time.time()
+        waited = False
+        while True:
+            claimed, published = await asyncio.to_thread(self._claim, key, arrived)
+            if claimed:
+                break
+            if published is not None:
+                self.cross_process_results += 1
+                print(f"🔗 Took result of pipeline run in another process: {key}")
+                return json.loads(published)
+            if not waited:
+                waited = True
+                self.cross_process_waits += 1
+                print(f"⏳ Pipeline in flight in another process, waiting: {key}")
+            await asyncio.sleep(self.poll_interval)
+
+        refresher = asyncio.ensure_future(self._keep_claimed(key))
+        try:
+            result = await pipeline()
+        except BaseException:
+            refresher.cancel()
+            await asyncio.to_thread(self._release, key)
+            raise
+        refresher.cancel()
+        await asyncio.to_thread(self._publish, key, result)
+        return result
+
+    async def _keep_claimed(self, key: str) -> None:
+        """Refresh this process's claim on key until cancelled."""
+        interval = max(self.poll_interval, self.claim_timeout / 3)
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self._refresh, key)
+
+    def _claim(self, key: str, arrived: float) -> Tuple[bool, Optional[str]]:
+        """
+        Claim key for this process.
+
+        Args:
+            key: Coalescing key
+            arrived: When the caller started waiting; only results of runs
+                finished since then are taken
+
+        Returns:
+            (True, None) if claimed; (False, result JSON) if a run this
+            caller waited on has finished; (False, None) while another live
+            claim holds the key
+        """
+        now = time.time()
+        with self._lock:
+            # Abandoned claims and expired results
+            self._conn.execute(
+                "DELETE FROM flights WHERE (finished_at IS NULL AND claimed_at < ?) OR finished_at < ?",
+                (now - self.claim_timeout, now - self.result_ttl)
+            )
+            row = self._conn.execute(
+                "SELECT result, finished_at FROM flights WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] is not None:
+                if row[1] >= arrived:
+                    self._conn.commit()
+                    return False, row[0]
+                # Finished before this caller arrived: start a fresh run
+                self._conn.execute("DELETE FROM flights WHERE key = ?", (key,))
+            claimed = self._conn.execute(
+                "INSERT OR IGNORE INTO flights (key, owner, claimed_at) VALUES (?, ?, ?)",
+                (key, self.owner, now)
+            ).rowcount == 1
+            self._conn.commit()
+            return claimed, None
+
+    def _refresh(self, key: str) -> None:
+        """Mark this process's claim on key as still alive."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE flights SET claimed_at = ? WHERE key = ? AND owner = ? AND finished_at IS NULL",
+                (time.time(), key, self.owner)
+            )
+            self._conn.commit()
+
+    def _publish(self, key: str, result: Any) -> None:
+        """Store a finished run's result on this process's claim for waiting processes."""
+        try:
+            encoded = json.dumps(result)
+        except (TypeError, ValueError):
+            # Not shareable: waiting processes run their own pipeline
+            self._release(key)
+            return
+        with self._lock:
+            self._conn.execute(
+                "UPDATE flights SET result = ?, finished_at = ? WHERE key = ? AND owner = ?",
+                (encoded, time.time(), key, self.owner)
+            )
+            self._conn.commit()
+
+    def _release(self, key: str) -> None:
+        """Release this process's claim on key."""
+        with self._lock:
+            self._conn.execute("DELETE FROM flights WHERE key = ? AND owner = ?", (key, self.owner))
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Coalescing counters for this process."""
+        runs = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._flights),
+            "pipelines": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesce_rate": round(self.coalesced / runs, 3) if runs else 0.0,
+            "cross_process_waits": self.cross_process_waits,
+            "cross_process_results": self.cross_process_results,
+        }
+
+
+_default_flights: Optional[SingleFlight] = None
+_default_flights_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Process-wide coalescer configured from the environment.
+
+    SINGLE_FLIGHT_PATH (default "single_flight.db"; empty disables
+    cross-process claims), SINGLE_FLIGHT_CLAIM_TIMEOUT (default 600 seconds).
+    """
+    global _default_flights
+
+    with _default_flights_lock:
+        if _default_flights is None:
+            _default_flights = SingleFlight(
+                path=os.getenv('SINGLE_FLIGHT_PATH', 'single_flight.db') or None,
+                claim_timeout=float(os.getenv('SINGLE_FLIGHT_CLAIM_TIMEOUT', 600))
+            )
+        return _default_flights
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Structured output - Schema-constrained Claude replies validated by typed models.
+
+Instead of asking for JSON in the prompt and scanning the reply text for
+braces, each call offers Claude a single tool whose input schema is
+generated from a pydantic model and forces Claude to call it. The tool
+input arrives already parsed and is validated against the model.
+
+If some fields are missing or invalid (for example because the reply hit
+max_tokens), a follow-up turn asks for those fields only, using a tool whose
+schema covers just them. The partial answer is then merged with what was
+already valid, so a bad reply costs one small request instead of a full
+re-run. Validated replies are stored in the LLM response cache as JSON.
+"""
+
+import json
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from llm_cache import LLMResponseCache
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a reply still fails validation after the repair attempts."""
+
+    def __init__(self, message: str, data: Dict, invalid_fields: List[str]):
+        super().__init__(message)
+        self.data = data  # Best-effort reply, including the valid fields
+        self.invalid_fields = invalid_fields
+
+
+def tool_definition(schema: Type[BaseModel], name: str, description: str) -> Dict:
+    """Tool definition whose input schema is the model's JSON schema."""
+    return {
+        "name": name,
+        "description": description,
+        "input_schema": schema.model_json_schema(),
+    }
+
+
+def structured_request(request: Dict, schema: Type[BaseModel], name: str, description: str) -> Dict:
+    """Add the model's tool to a messages.create() request and force its use."""
+    return {
+        **request,
+        "tools": [tool_definition(schema, name, description)],
+        "tool_choice": {"type": "tool", "name": name},
+    }
+
+
+def tool_input(message, name: str) -> Tuple[Optional[str], Dict]:
+    """(tool_use id, input) of the named tool call in a reply; (None, {}) if absent."""
+    for block in message.content:
+        if getattr(block, "type", None) == "tool_use" and block.name == name:
+            return block.id, dict(block.input or {})
+    return None, {}
+
+
+def validate(schema: Type[BaseModel], data: Dict) -> Tuple[Optional[BaseModel], List[str], str]:
+    """
+    Validate a reply against the model.
+
+    Returns:
+        (model instance or None, invalid top-level field names, error summary)
+    """
+    try:
+        return schema.model_validate(data), [], ""
+    except ValidationError as e:
+        fields = []
+        for error in e.errors():
+            field = str(error["loc"][0]) if error["loc"] else None
+            if field is not None and field not in fields:
+                fields.append(field)
+        if not fields:
+            # Not an object at all: ask for everything
+            fields = list(schema.model_json_schema()["properties"])
+        summary = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or '(root)'}: {error['msg']}"
+            for error in e.errors()[:20]
+        )
+        return None, fields, summary
+
+
+def repair_request(
+    request: Dict,
+    tool_use_id: Optional[str],
+    data: Dict,
+    fields: List[str],
+    errors: str,
+    schema: Type[BaseModel],
+    name: str
+) -> Dict:
+    """
+    Follow-up request asking only for the invalid fields of a reply.
+
+    The repair tool's schema holds just those fields (all required), so the
+    reply is small and cannot disturb the fields that were already valid.
+    """
+    full_schema = schema.model_json_schema()
+    repair_name = f"{name}_fields"
+    repair_schema = {
+        "type": "object",
+        "properties": {field: full_schema["properties"][field] for field in fields},
+        "required": fields,
+    }
+    if "$defs" in full_schema:
+        repair_schema["$defs"] = full_schema["$defs"]
+
+    instruction = (
+        f"Some fields of your {name} call were missing or invalid ({errors}). "
+        f"Call {repair_name} with only these fields: {', '.join(fields)}."
+    )
+
+    messages = list(request["messages"])
+    if tool_use_id:
+        messages.append({
+            "role": "assistant",
+            "content": [{"type": "tool_use", "id": tool_use_id, "name": name, "input": data}],
+        })
+        messages.append({
+            "role": "user",
+            "content": [
+                {"type": "tool_result", "tool_use_id": tool_use_id, "is_error": True, "content": errors},
+                {"type": "text", "text": instruction},
+            ],
+        })
+    else:
+        messages.append({"role": "user", "content": instruction})
+
+    return {
+        **request,
+        "messages": messages,
+        "tools": request["tools"] + [{
+            "name": repair_name,
+            "description": f"Resend the listed fields of {name}.",
+            "input_schema": repair_schema,
+        }],
+        "tool_choice": {"type": "tool", "name": repair_name},
+    }
+
+
+def complete_structured(
+    create: Callable,
+    request: Dict,
+    schema: Type[BaseModel],
+    name: str,
+    description: str,
+    cache: Optional[LLMResponseCache] = None,
+    on_message: Optional[Callable] = None,
+    on_cache_hit: Optional[Callable[[], None]] = None,
+    max_repairs: int = 1
+) -> BaseModel:
+    """
+    Send a schema-constrained request and return the validated reply.
+
+    Args:
+        create: messages.create callable of an Anthropic client
+        request: messages.create() arguments (model, max_tokens, system, messages)
+        schema: pydantic model the reply must satisfy
+        name: Tool name the reply is recorded with
+        description: Tool description shown to Claude
+        cache: Optional response cache for validated replies
+        on_message: Optional callable(message) invoked for every reply
+            (e.g. to record token usage)
+        on_cache_hit: Optional callable invoked when the cache answers
+        max_repairs: Follow-up requests allowed for invalid fields
+
+    Returns:
+        Validated model instance
+
+    Raises:
+        StructuredOutputError: If the reply is still invalid after the repairs
+    """
+    request = structured_request(request, schema, name, description)
+
+    key = cache.make_key(request) if cache else None
+    if key:
+        cached = cache.get(key)
+        if cached is not None:
+            result, _, _ = validate(schema, json.loads(cached))
+            if result is not None:
+                if on_cache_hit is not None:
+                    on_cache_hit()
+                return result
+
+    message = create(**request)
+    if on_message is not None:
+        on_message(message)
+    tool_use_id, data = tool_input(message, name)
+    result, fields, errors = validate(schema, data)
+
+    attempts = 0
+    while result is None and attempts < max_repairs:
+        attempts += 1
+        print(f"⚠️ {name}: invalid fields {', '.join(fields)}, re-requesting them")
+        repair = repair_request(request, tool_use_id, data, fields, errors, schema, name)
+        message = create(**repair)
+        if on_message is not None:
+            on_message(message)
+        _, patch = tool_input(message, f"{name}_fields")
+        data = {**data, **{field: patch[field] for field in fields if field in patch}}
+        result, fields, errors = validate(schema, data)
+
+    if result is None:
+        raise StructuredOutputError(f"Invalid {name} reply: {errors}", data, fields)
+
+    if key:
+        cache.set(key, request["model"], result.model_dump_json(by_alias=True))
+    return result
@@ -0,0 +1,142 @@
+"""Batched audit scoring: one Claude call for every criterion, with per-criterion fallback."""
+
+import re
+from types import SimpleNamespace
+
+from audit_engine import WebsiteAuditor, criterion_key
+
+
+CRITERIA = WebsiteAuditor.CRITERIA[:3]
+
+
+def evaluation(score=7):
+    return {'score': score, 'observations': ['Clear layout'], 'recommendations': ['Add reviews']}
+
+
+# Property keys the API accepts in a tool input_schema
+PROPERTY_KEY_RE = re.compile(r'^[a-zA-Z0-9_.-]{1,64}$')
+
+
+def batched(evaluations):
+    """record_evaluations input for {criterion: evaluation}."""
+    return {criterion_key(criterion): value for criterion, value in evaluations.items()}
+
+
+def property_keys(schema):
+    """Every property key in a JSON schema, including nested definitions."""
+    keys = list(schema.get('properties', {}))
+    for value in list(schema.get('properties', {}).values()) + list(schema.get('$defs', {}).values()):
+        if isinstance(value, dict):
+            keys.extend(property_keys(value))
+    return keys
+
+
+def reply(name, data):
+    """Claude message holding one tool call."""
+    block = SimpleNamespace(type='tool_use', id=f'toolu_{name}', name=name, input=data)
+    return SimpleNamespace(content=[block], usage=SimpleNamespace(input_tokens=100, output_tokens=50))
+
+
+class FakeGateway:
+    """Answers each create() call with the next scripted reply for its tool."""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.requests = []
+
+    def create(self, priority, api_key, deadline=None, **request):
+        self.requests.append(request)
+        tool = request['tool_choice']['name']
+        answer = self.replies[tool].pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return reply(tool, answer)
+
+
+def evaluate(replies, criteria=CRITERIA):
+    gateway = FakeGateway(replies)
+    auditor = WebsiteAuditor(api_key='test', gateway=gateway)
+    auditor._build_site_prompt = lambda *args: [{'type': 'text', 'text': 'SITE'}]
+    stats = {'llm_calls': 0, 'llm_cache_hits': 0, 'fallback_criteria': [], 'failed_criteria': []}
+    results = auditor._evaluate_criteria_batched(
+        list(criteria), 'https://example.com', '', {}, {}, True, stats
+    )
+    return results, stats, gateway
+
+
+def test_batched_reply_scores_every_criterion_in_one_call():
+    results, stats, gateway = evaluate({
+        'record_evaluations': [batched({criterion: evaluation(6) for criterion in CRITERIA})],
+    })
+
+    assert {criterion: results[criterion][0] for criterion in CRITERIA} == dict.fromkeys(CRITERIA, 6)
+    assert [results[criterion][1].name for criterion in CRITERIA] == list(CRITERIA)
+    assert len(gateway.requests) == 1
+    assert stats['llm_calls'] == 1
+    assert stats['fallback_criteria'] == []
+
+
+def test_failed_batched_call_falls_back_for_every_criterion():
+    results, stats, gateway = evaluate({
+        'record_evaluations': [RuntimeError('overloaded')],
+        'record_evaluation': [evaluation(6) for _ in CRITERIA],
+    })
+
+    assert [results[criterion][0] for criterion in CRITERIA] == [6, 6, 6]
+    assert sorted(stats['fallback_criteria']) == sorted(CRITERIA)
+    assert len(gateway.requests) == 1 + len(CRITERIA)
+
+
+def test_failed_fallback_call_gets_default_score():
+    results, stats, _ = evaluate({
+        'record_evaluations': [RuntimeError('overloaded')],
+        'record_evaluation': [evaluation(6), RuntimeError('overloaded'), evaluation(6)],
+    })
+
+    assert sorted(score for score, _ in results.values()) == [5.0, 6, 6]
+    assert len(stats['failed_criteria']) == 1
+
+
+def test_batched_schema_keys_are_accepted_by_the_api():
+    criteria = WebsiteAuditor.CRITERIA
+    _, stats, gateway = evaluate({
+        'record_evaluations': [batched({criterion: evaluation() for criterion in criteria})],
+    }, criteria)
+
+    schema = gateway.requests[0]['tools'][0]['input_schema']
+    assert set(schema['properties']) == {criterion_key(criterion) for criterion in criteria}
+    assert all(PROPERTY_KEY_RE.match(key) for key in property_keys(schema))
+    assert len(set(schema['properties'])) == len(criteria)
+    assert stats['fallback_criteria'] == []
+
+
+def test_invalid_entry_is_repaired_in_a_follow_up_turn():
+    first, second, third = CRITERIA
+    results, stats, gateway = evaluate({
+        'record_evaluations': [batched({first: evaluation(8), second: evaluation(15), third: evaluation(4)})],
+        'record_evaluations_fields': [batched({second: evaluation(5)})],
+    })
+
+    assert [results[criterion][0] for criterion in CRITERIA] == [8, 5, 4]
+    assert len(gateway.requests) == 2
+    repair = gateway.requests[1]
+    assert repair['tool_choice'] == {'type': 'tool', 'name': 'record_evaluations_fields'}
+    assert repair['tools'][-1]['input_schema']['required'] == [criterion_key(second)]
+    assert all(PROPERTY_KEY_RE.match(key) for key in property_keys(repair['tools'][-1]['input_schema']))
+    assert stats['fallback_criteria'] == []
+
+
+def test_entries_still_invalid_after_repair_fall_back_to_per_criterion_calls():
+    first, second, third = CRITERIA
+    results, stats, gateway = evaluate({
+        'record_evaluations': [batched({first: evaluation(8), third: evaluation(4)})],
+        'record_evaluations_fields': [{}],
+        'record_evaluation': [evaluation(3)],
+    })
+
+    assert [results[criterion][0] for criterion in CRITERIA] == [8, 3, 4]
+    assert stats['fallback_criteria'] == [second]
+    assert stats['failed_criteria'] == []
+    fallback = gateway.requests[-1]
+    assert fallback['tool_choice']['name'] == 'record_evaluation'
+    assert second in fallback['messages'][0]['content']
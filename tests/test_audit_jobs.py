@@ -0,0 +1,113 @@
+"""Audit job queue: completion, failure and lease fencing."""
+
+import sqlite3
+import threading
+import time
+
+from audit_jobs import COMPLETED, FAILED, QUEUED, RUNNING, AuditJobQueue
+
+
+def run_one(queue):
+    """Claim and run the next job on the calling thread."""
+    job = queue._claim()
+    assert job is not None
+    queue._run(*job)
+    return job
+
+
+def test_completed_job_records_what_on_complete_returns(tmp_path):
+    completed = []
+
+    def on_complete(job_id, user_id, result):
+        completed.append((job_id, user_id, result))
+        return {**result, 'id': job_id}
+
+    queue = AuditJobQueue(lambda user_id, request, progress: {'url': request['url']},
+                          path=str(tmp_path / 'jobs.db'), on_complete=on_complete)
+    job_id = queue.submit('user-1', {'url': 'https://example.com'})
+    assert queue.get(job_id)['status'] == QUEUED
+
+    run_one(queue)
+
+    job = queue.get(job_id)
+    assert job['status'] == COMPLETED
+    assert job['result'] == {'url': 'https://example.com', 'id': job_id}
+    assert completed == [(job_id, 'user-1', {'url': 'https://example.com'})]
+
+
+def test_runner_error_fails_the_job(tmp_path):
+    def runner(user_id, request, progress):
+        raise RuntimeError('fetch failed')
+
+    queue = AuditJobQueue(runner, path=str(tmp_path / 'jobs.db'))
+    job_id = queue.submit('user-1', {})
+    run_one(queue)
+
+    job = queue.get(job_id)
+    assert job['status'] == FAILED
+    assert job['error'] == 'fetch failed'
+
+
+def test_worker_that_lost_its_lease_does_not_complete_the_job(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    completed = []
+
+    def runner(user_id, request, progress):
+        # Meanwhile the lease expired and another worker claimed the job
+        conn = sqlite3.connect(path)
+        conn.execute("UPDATE audit_jobs SET lease_token = 'other-worker'")
+        conn.commit()
+        conn.close()
+        progress('fetched', {})
+        return {'score': 1}
+
+    queue = AuditJobQueue(runner, path=path, on_complete=lambda *args: completed.append(args) or {})
+    job_id = queue.submit('user-1', {})
+    run_one(queue)
+
+    job = queue.get(job_id)
+    assert job['status'] == RUNNING
+    assert job['result'] is None
+    assert job['progress']['stage'] != 'fetched'  # progress from the stale worker was dropped
+    assert completed == []
+
+
+def test_expired_lease_is_requeued_and_reclaimed_with_a_new_token(tmp_path):
+    queue = AuditJobQueue(lambda *args: {}, path=str(tmp_path / 'jobs.db'), lease_seconds=60)
+    job_id = queue.submit('user-1', {})
+    _, _, _, first_token = queue._claim()
+
+    conn = queue._connection()
+    conn.execute("UPDATE audit_jobs SET updated_at = ?", (time.time() - 120,))
+
+    reclaimed_id, _, _, second_token = queue._claim()
+    assert reclaimed_id == job_id
+    assert second_token != first_token
+    assert not queue._update_leased(job_id, first_token, "progress = progress", ())
+
+
+def test_repeatedly_orphaned_job_is_failed(tmp_path):
+    queue = AuditJobQueue(lambda *args: {}, path=str(tmp_path / 'jobs.db'), lease_seconds=60, max_attempts=1)
+    job_id = queue.submit('user-1', {})
+    queue._claim()
+    queue._connection().execute("UPDATE audit_jobs SET updated_at = ?", (time.time() - 120,))
+
+    assert queue._claim() is None
+    assert queue.get(job_id)['status'] == FAILED
+
+
+def test_heartbeat_keeps_a_long_job_leased(tmp_path):
+    queue = AuditJobQueue(lambda *args: {}, path=str(tmp_path / 'jobs.db'), lease_seconds=2)
+    job_id = queue.submit('user-1', {})
+    _, _, _, token = queue._claim()
+    done = threading.Event()
+    heartbeat = threading.Thread(target=queue._heartbeat, args=(job_id, token, done))
+    heartbeat.start()
+    try:
+        time.sleep(2.5)
+        # Another worker looking for orphaned jobs finds none
+        assert queue._claim() is None
+    finally:
+        done.set()
+        heartbeat.join()
+    assert queue.get(job_id)['status'] == RUNNING
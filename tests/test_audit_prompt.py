@@ -0,0 +1,63 @@
+"""Audit prompt prefix: shared by every criterion call and cached once it is long enough."""
+
+from types import SimpleNamespace
+
+from audit_engine import WebsiteAuditor
+from page_snapshot import PageSnapshot
+
+
+def snapshot(paragraphs):
+    body = ''.join(
+        f"<p>Paragraph {i}: licensed plumbers for blocked drains, hot water and gas fitting across Sydney.</p>"
+        for i in range(paragraphs)
+    )
+    html = f"<html><head><title>Acme Plumbing</title></head><body><main><h1>Acme</h1>{body}</main></body></html>"
+    return PageSnapshot.parse('https://acme.example', 'https://acme.example', 200, {}, html.encode(), html, 'utf-8')
+
+
+def site_prompt(paragraphs, deep_scan):
+    auditor = WebsiteAuditor(api_key='test', gateway=SimpleNamespace())
+    page = snapshot(paragraphs)
+    content_analysis = auditor._analyze_content(page, page.url, deep_scan=False)
+    return auditor._build_site_prompt(page.url, page.metadata, content_analysis, deep_scan)
+
+
+def cached(system):
+    return any('cache_control' in block for block in system)
+
+
+def test_prefix_holds_the_page_text():
+    assert 'Paragraph 3: licensed plumbers' in site_prompt(5, True)[-1]['text']
+
+
+def test_long_prefix_is_cached_on_the_deep_scan_model():
+    assert cached(site_prompt(60, deep_scan=True))
+
+
+def test_short_prefix_is_not_marked_for_caching():
+    assert not cached(site_prompt(1, deep_scan=True))
+
+
+def test_quick_scan_prefix_is_below_the_small_model_minimum():
+    assert not cached(site_prompt(60, deep_scan=False))
+
+
+def test_criterion_calls_share_the_tool_definition():
+    requests = []
+
+    class Gateway:
+        def create(self, priority, api_key, deadline=None, **request):
+            requests.append(request)
+            block = SimpleNamespace(type='tool_use', id='toolu_1', name='record_evaluation',
+                                    input={'score': 7, 'observations': ['a'], 'recommendations': ['b']})
+            return SimpleNamespace(content=[block], usage=None)
+
+    auditor = WebsiteAuditor(api_key='test', gateway=Gateway(), max_concurrency=1)
+    page = snapshot(60)
+    content_analysis = auditor._analyze_content(page, page.url, deep_scan=False)
+    auditor._evaluate_criteria(['Performance', 'Security'], page.url, page.html, page.metadata, content_analysis, True)
+
+    assert len(requests) == 2
+    assert requests[0]['tools'] == requests[1]['tools']
+    assert requests[0]['system'] == requests[1]['system']
+    assert requests[0]['messages'] != requests[1]['messages']
@@ -0,0 +1,85 @@
+"""Charset handling: encoding choice order and incremental decoding."""
+
+import codecs
+
+import charset
+from charset import BodyDecoder, header_charset, normalize_encoding, sniff_charset
+
+
+def decode(chunks, declared=None, complete=True):
+    decoder = BodyDecoder(declared)
+    for chunk in chunks:
+        decoder.feed(chunk)
+    return decoder.finish(complete=complete), decoder
+
+
+def no_detector(monkeypatch):
+    """Fail the test if the slow detector is consulted."""
+    def detect(sample):
+        raise AssertionError('detector should not run')
+    monkeypatch.setattr(charset, 'detect_encoding', detect)
+
+
+def test_charset_names_are_normalized():
+    assert header_charset('text/html; charset="UTF-8"') == 'utf-8'
+    assert header_charset('text/html') is None
+    assert normalize_encoding('ISO-8859-1') == 'cp1252'
+    assert normalize_encoding('us-ascii') == 'cp1252'
+    assert normalize_encoding('no-such-charset') is None
+
+
+def test_sniff_finds_bom_and_meta_declarations():
+    assert sniff_charset(codecs.BOM_UTF8 + b'<html>') == 'utf-8-sig'
+    assert sniff_charset(b'<head><meta charset="windows-1251"></head>') == 'cp1251'
+    assert sniff_charset(
+        b'<meta http-equiv="Content-Type" content="text/html; charset=shift_jis">'
+    ) == 'shift_jis'
+    assert sniff_charset(b'<html><body>no declaration</body></html>') is None
+
+
+def test_header_charset_wins_over_meta(monkeypatch):
+    no_detector(monkeypatch)
+    body = '<meta charset="utf-8"><p>café</p>'.encode('cp1252')
+    text, decoder = decode([body], declared='windows-1252')
+    assert 'café' in text
+    assert decoder.source == 'header'
+
+
+def test_meta_charset_is_used_without_a_header(monkeypatch):
+    no_detector(monkeypatch)
+    body = '<meta charset="koi8-r"><p>Привет</p>'.encode('koi8_r')
+    text, decoder = decode([body])
+    assert 'Привет' in text
+    assert decoder.source == 'meta'
+
+
+def test_undeclared_utf8_takes_the_fast_path(monkeypatch):
+    no_detector(monkeypatch)
+    body = ('<p>' + 'naïve ☃ ' * 2000 + '</p>').encode('utf-8')
+    # Split inside a multi-byte character
+    split = body.index('☃'.encode('utf-8')) + 1
+    text, decoder = decode([body[:split], body[split:]])
+    assert text == body.decode('utf-8')
+    assert decoder.source == 'utf-8'
+
+
+def test_invalid_utf8_falls_back_to_the_detector(monkeypatch):
+    samples = []
+
+    def detect(sample):
+        samples.append(len(sample))
+        return 'cp1252'
+
+    monkeypatch.setattr(charset, 'detect_encoding', detect)
+    body = ('<p>' + 'x' * 10000 + ' café</p>').encode('cp1252')
+    text, decoder = decode([body[:5000], body[5000:]])
+    assert text.endswith('café</p>')
+    assert decoder.source == 'detected'
+    assert samples and samples[0] <= charset.DETECT_SAMPLE_BYTES
+
+
+def test_truncated_body_drops_a_partial_character():
+    body = ('<p>' + 'a' * 5000 + '€').encode('utf-8')[:-1]
+    text, decoder = decode([body], declared='utf-8', complete=False)
+    assert text == '<p>' + 'a' * 5000
+    assert decoder.content == body
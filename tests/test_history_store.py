@@ -0,0 +1,121 @@
+"""History store: per-record storage, per-user listing, fingerprint lookup and JSON migration."""
+
+import json
+import sqlite3
+import threading
+import time
+
+from history_store import ANALYSES, AUDITS, HistoryStore
+
+
+def analysis(user_id, created_at, fingerprint=None):
+    return {'user_id': user_id, 'url': 'https://example.com/', 'created_at': created_at,
+            'content_fingerprint': fingerprint}
+
+
+def test_records_are_stored_replaced_and_deleted(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    store.put(ANALYSES, 'a1', analysis('u1', '2026-01-01'))
+    store.put(ANALYSES, 'a1', {**analysis('u1', '2026-01-01'), 'summary': 'new'})
+
+    assert store.get(ANALYSES, 'a1')['summary'] == 'new'
+    assert store.get(AUDITS, 'a1') is None
+    assert store.delete(ANALYSES, 'a1')
+    assert not store.delete(ANALYSES, 'a1')
+    assert store.get(ANALYSES, 'a1') is None
+
+
+def test_user_history_is_newest_first_with_total(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    for day in range(1, 6):
+        store.put(ANALYSES, f'a{day}', analysis('u1', f'2026-01-0{day}'))
+    store.put(ANALYSES, 'other', analysis('u2', '2026-01-09'))
+
+    records, total = store.list_for_user(ANALYSES, 'u1', limit=2)
+    assert [record_id for record_id, _ in records] == ['a5', 'a4']
+    assert total == 5
+
+    store.clear(ANALYSES)
+    assert store.list_for_user(ANALYSES, 'u1') == ([], 0)
+
+
+def test_find_by_fingerprint_returns_recent_matches_newest_first(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'))
+    store.put(ANALYSES, 'old', analysis('u1', '2025-01-01', 'f1'))
+    store.put(ANALYSES, 'new', analysis('u2', '2026-01-02', 'f1'))
+    store.put(ANALYSES, 'newer', analysis('u1', '2026-01-03', 'f1'))
+    store.put(ANALYSES, 'other', analysis('u1', '2026-01-04', 'f2'))
+
+    matches = store.find_by_fingerprint(ANALYSES, 'f1', since='2026-01-01')
+    assert [record_id for record_id, _ in matches] == ['newer', 'new']
+
+
+def test_json_history_is_migrated_once(tmp_path):
+    legacy = tmp_path / 'analysis_history.json'
+    legacy.write_text(json.dumps({'a1': analysis('u1', '2026-01-01'), 'a2': analysis('u1', '2026-01-02')}))
+    store = HistoryStore(str(tmp_path / 'history.db'))
+
+    assert store.migrate_json(ANALYSES, str(legacy)) == 2
+    assert not legacy.exists()
+    assert (tmp_path / 'analysis_history.json.migrated').exists()
+    assert store.migrate_json(ANALYSES, str(legacy)) == 0
+    assert store.list_for_user(ANALYSES, 'u1')[1] == 2
+
+
+def test_file_migrated_by_another_process_meanwhile_counts_as_migrated(tmp_path):
+    legacy = tmp_path / 'audit_history.json'
+    legacy.write_text(json.dumps({'r1': {'user_id': 'u1', 'audit_timestamp': '2026-01-01'}}))
+    path = str(tmp_path / 'history.db')
+    store = HistoryStore(path)
+
+    # Another worker is mid-migration: it holds the write lock
+    other = sqlite3.connect(path)
+    other.execute("BEGIN IMMEDIATE")
+
+    results, errors = [], []
+
+    def migrate():
+        try:
+            results.append(store.migrate_json(AUDITS, str(legacy)))
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=migrate)
+    thread.start()
+    time.sleep(0.3)
+    legacy.rename(tmp_path / 'audit_history.json.migrated')
+    other.commit()
+    thread.join()
+
+    assert errors == []
+    assert results == [0]
+
+
+def test_concurrent_migrations_import_the_file_once(tmp_path):
+    legacy = tmp_path / 'audit_history.json'
+    records = {f'r{i}': {'user_id': 'u1', 'audit_timestamp': f'2026-01-01T00:00:{i:02d}'} for i in range(50)}
+    legacy.write_text(json.dumps(records))
+    path = str(tmp_path / 'history.db')
+    HistoryStore(path)
+
+    # One store per worker process, all starting at once
+    results, errors = [], []
+    barrier = threading.Barrier(4)
+
+    def worker():
+        store = HistoryStore(path)
+        barrier.wait()
+        try:
+            results.append(store.migrate_json(AUDITS, str(legacy)))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(results) == [0, 0, 0, 50]
+    assert HistoryStore(path).list_for_user(AUDITS, 'u1', limit=1)[1] == 50
@@ -0,0 +1,61 @@
+"""Parser conformance: every installed backend extracts identical page fields."""
+
+import glob
+import os
+
+import pytest
+
+from html_parser import available_backends, compare_backends, parse_html
+
+
+TEMPLATES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), '..', 'templates', '*.html')))
+
+PAGE = b"""<!DOCTYPE html>
+<html lang="en-AU">
+<head>
+  <meta charset="utf-8">
+  <title>Acme Plumbing</title>
+  <meta name="description" content="Emergency plumbing in Sydney">
+  <meta property="og:title" content="Acme">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <script src="https://consent.cookiebot.com/uc.js"></script>
+  <script>gtag('config', 'G-1');</script>
+</head>
+<body>
+  <nav><a href="/">Home</a> <a href="/contact">Contact us</a></nav>
+  <main>
+    <h1>Fast, licensed plumbers</h1>
+    <p>Call <a href="tel:+61299999999">02 9999 9999</a> any time.</p>
+    <img src="van.jpg" alt="Our van"><img src="team.jpg">
+    <form><input type="email" name="email"><input type="checkbox"> <button>Subscribe</button></form>
+  </main>
+  <div id="cookie-banner" class="cookie-notice">We use cookies</div>
+  <footer>ABN 51 824 753 556 <a href="/privacy">Privacy</a> <a href="/returns">Returns</a></footer>
+</body>
+</html>
+"""
+
+
+def test_default_backend_is_installed():
+    assert available_backends()
+    assert parse_html('<p>x</p>').p.get_text() == 'x'
+
+
+@pytest.mark.skipif(len(available_backends()) < 2, reason="only one parser backend installed")
+def test_backends_extract_identical_fields():
+    assert compare_backends(PAGE) == []
+
+
+@pytest.mark.skipif(len(available_backends()) < 2, reason="only one parser backend installed")
+@pytest.mark.parametrize('path', TEMPLATES, ids=os.path.basename)
+def test_templates_extract_identically(path):
+    with open(path, 'rb') as f:
+        assert compare_backends(f.read()) == []
+
+
+@pytest.mark.skipif(len(available_backends()) < 2, reason="only one parser backend installed")
+def test_compare_backends_reports_field_mismatches():
+    # Backends disagree on tags inside <title>, where lxml follows the HTML spec
+    mismatches = compare_backends(b'<html><head><title>A <b>B</b></title></head><body>x</body></html>')
+    assert mismatches
+    assert all(len(mismatch) == 5 for mismatch in mismatches)
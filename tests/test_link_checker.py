@@ -0,0 +1,111 @@
+"""Link checker: link states, malformed links and the per-host limit."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import requests
+
+from link_checker import LinkChecker, _http_links
+
+
+class FakeClient:
+    """HTTP client answering from a table of url -> status code or exception."""
+
+    def __init__(self, answers, get_answers=None, delay=0.0):
+        self.answers = answers
+        self.get_answers = get_answers or {}
+        self.delay = delay
+        self.running = {}
+        self.peak = {}
+        self.lock = threading.Lock()
+
+    def _answer(self, answers, url):
+        host = url.split('/')[2]
+        with self.lock:
+            self.running[host] = self.running.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.running[host])
+        try:
+            time.sleep(self.delay)
+            answer = answers.get(url, 200)
+            if isinstance(answer, Exception):
+                raise answer
+            return SimpleNamespace(status_code=answer)
+        finally:
+            with self.lock:
+                self.running[host] -= 1
+
+    def head(self, url, **kwargs):
+        return self._answer(self.answers, url)
+
+    def get(self, url, **kwargs):
+        response = self._answer(self.get_answers, url)
+        return _Closing(response)
+
+
+class _Closing:
+    def __init__(self, response):
+        self.response = response
+
+    def __enter__(self):
+        return self.response
+
+    def __exit__(self, *exc):
+        return False
+
+
+def test_http_links_resolves_and_keeps_malformed_links():
+    hrefs = ['/a#top', '/a', '#section', 'mailto:x@example.com', 'http://[::1', '']
+    assert _http_links(hrefs, 'https://example.com/page') == ['https://example.com/a', 'http://[::1']
+
+
+def test_link_states_are_counted():
+    client = FakeClient(
+        {
+            'https://example.com/missing': 404,
+            'https://example.com/no-head': 405,
+            'https://example.com/slow': requests.Timeout(),
+            'https://gone.example/': requests.ConnectionError(),
+        },
+        get_answers={'https://example.com/no-head': 200},
+    )
+    checker = LinkChecker(client=client)
+    result = checker.check(
+        ['/ok', '/missing', '/no-head', '/slow', 'https://gone.example/'], 'https://example.com/'
+    )
+    assert result['checked'] == 4
+    assert result['broken'] == 2
+    assert result['unverified'] == 1
+    assert sorted(result['broken_urls']) == ['https://example.com/missing', 'https://gone.example/']
+
+
+def test_links_that_cannot_be_probed_are_unverified():
+    client = FakeClient({
+        'http://xn--bad.example/': UnicodeError('label empty or too long'),
+        'https://example.com/odd': ValueError('bad location'),
+        'https://example.com/boom': RuntimeError('unexpected'),
+    })
+    checker = LinkChecker(client=client)
+    result = checker.check(
+        ['http://xn--bad.example/', '/odd', '/boom', 'http://[::1', '/ok'], 'https://example.com/'
+    )
+    assert result['checked'] == 1
+    assert result['broken'] == 0
+    assert result['unverified'] == 4
+
+
+def test_unverified_links_are_not_cached():
+    client = FakeClient({'https://example.com/slow': requests.Timeout()})
+    checker = LinkChecker(client=client)
+    checker.check(['/slow', '/ok'], 'https://example.com/')
+    client.answers = {}
+    assert checker.check(['/slow', '/ok'], 'https://example.com/')['checked'] == 2
+
+
+def test_per_host_limit_caps_concurrent_requests():
+    client = FakeClient({}, delay=0.05)
+    checker = LinkChecker(max_workers=8, per_host_limit=2, client=client)
+    hrefs = [f'https://a.example/{i}' for i in range(6)] + [f'https://b.example/{i}' for i in range(6)]
+    result = checker.check(hrefs, 'https://a.example/')
+    assert result['checked'] == 12
+    assert client.peak == {'a.example': 2, 'b.example': 2}
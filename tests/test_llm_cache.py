@@ -0,0 +1,76 @@
+"""LLM response cache: keys, TTL, LRU eviction and persistence."""
+
+import itertools
+
+import llm_cache
+from llm_cache import LLMResponseCache
+
+
+def request(text, **extra):
+    return {
+        'model': 'claude-test',
+        'max_tokens': 100,
+        'system': [{'type': 'text', 'text': 'You are an auditor.'}],
+        'messages': [{'role': 'user', 'content': text}],
+        **extra,
+    }
+
+
+def clock(monkeypatch, start=1000.0):
+    """Make time.time() tick one second per call."""
+    ticks = itertools.count(start)
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: next(ticks))
+
+
+def test_key_ignores_whitespace_and_cache_control():
+    key = LLMResponseCache.make_key(request('Rate  this\npage'))
+    marked = request('Rate this page')
+    marked['system'][0]['cache_control'] = {'type': 'ephemeral'}
+    assert LLMResponseCache.make_key(marked) == key
+    assert LLMResponseCache.make_key(request('Rate this page', temperature=0.5)) == key
+
+
+def test_key_changes_with_anything_affecting_the_reply():
+    key = LLMResponseCache.make_key(request('Rate this page'))
+    assert LLMResponseCache.make_key(request('Rate that page')) != key
+    assert LLMResponseCache.make_key({**request('Rate this page'), 'model': 'other'}) != key
+    assert LLMResponseCache.make_key({**request('Rate this page'), 'tool_choice': {'type': 'any'}}) != key
+
+
+def test_hits_misses_and_persistence(tmp_path):
+    path = str(tmp_path / 'llm.db')
+    cache = LLMResponseCache(path)
+    assert cache.get('k') is None
+    cache.set('k', 'claude-test', 'reply')
+    assert cache.get('k') == 'reply'
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+    # Another process opening the same file sees the entry
+    assert LLMResponseCache(path).get('k') == 'reply'
+
+
+def test_expired_entries_miss_and_are_removed(tmp_path, monkeypatch):
+    clock(monkeypatch)
+    cache = LLMResponseCache(str(tmp_path / 'llm.db'), ttl_seconds=5)
+    cache.set('k', 'claude-test', 'reply')
+    assert cache.get('k') == 'reply'
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: 2000.0)
+    assert cache.get('k') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    clock(monkeypatch)
+    cache = LLMResponseCache(str(tmp_path / 'llm.db'), max_entries=2)
+    cache.set('a', 'claude-test', 'A')
+    cache.set('b', 'claude-test', 'B')
+    cache.get('a')
+    cache.set('c', 'claude-test', 'C')
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A' and cache.get('c') == 'C'
+    assert cache.stats()['evictions'] == 1
+
+
+def test_default_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setenv('LLM_CACHE_ENABLED', '0')
+    assert llm_cache.get_default_cache() is None
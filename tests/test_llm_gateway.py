@@ -0,0 +1,146 @@
+"""LLM gateway: token accounting, retries, priorities and deadlines."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import anthropic
+import httpx
+import pytest
+
+from llm_gateway import BATCH, INTERACTIVE, LLMDeadlineExceeded, LLMGateway, estimate_input_tokens
+
+
+def usage(input_tokens=0, output_tokens=0, cache_creation=0, cache_read=0):
+    return SimpleNamespace(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cache_creation_input_tokens=cache_creation,
+        cache_read_input_tokens=cache_read,
+    )
+
+
+def api_error(status, headers=None):
+    response = httpx.Response(status, headers=headers or {}, request=httpx.Request('POST', 'https://api.test/v1/messages'))
+    error_class = anthropic.RateLimitError if status == 429 else anthropic.APIStatusError
+    return error_class(f'status {status}', response=response, body=None)
+
+
+class FakeMessages:
+    """messages.create() answering from a script of replies or exceptions."""
+
+    def __init__(self, script=None, gate=None):
+        self.script = list(script or [])
+        self.gate = gate
+        self.calls = []
+
+    def create(self, **request):
+        self.calls.append(request)
+        if self.gate is not None:
+            self.gate.wait()
+        reply = self.script.pop(0) if self.script else SimpleNamespace(usage=usage())
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+def gateway_with(messages, **kwargs):
+    gateway = LLMGateway(**kwargs)
+    gateway._clients[None] = SimpleNamespace(messages=messages)
+    return gateway
+
+
+def request(text='hello', max_tokens=500):
+    return {'model': 'test', 'max_tokens': max_tokens, 'messages': [{'role': 'user', 'content': text}]}
+
+
+def test_budgets_are_settled_against_reported_usage():
+    messages = FakeMessages([SimpleNamespace(usage=usage(
+        input_tokens=100, output_tokens=10, cache_creation=50, cache_read=1000
+    ))])
+    gateway = gateway_with(messages, input_tokens_per_minute=6000, output_tokens_per_minute=6000)
+    gateway.create(**request(max_tokens=500))
+
+    remaining = gateway.stats()['budget_remaining']
+    # Uncached input and cache writes count against ITPM; cache reads do not
+    assert 6000 - 150 <= remaining['input_tokens'] <= 6000 - 150 + 5
+    # The unused part of max_tokens is returned
+    assert 6000 - 10 <= remaining['output_tokens'] <= 6000 - 10 + 5
+    assert remaining['requests'] == 999
+
+
+def test_estimate_counts_system_messages_and_tools():
+    short = estimate_input_tokens(request('x'))
+    longer = estimate_input_tokens({**request('x'), 'system': 'y' * 400, 'tools': [{'name': 't'}]})
+    assert longer >= short + 100
+
+
+def test_rate_limited_calls_are_retried_after_retry_after():
+    messages = FakeMessages([api_error(429, {'retry-after-ms': '20'}), SimpleNamespace(usage=usage())])
+    gateway = gateway_with(messages, base_delay=0.01)
+    gateway.create(**request())
+
+    stats = gateway.stats()
+    assert len(messages.calls) == 2
+    assert stats['retries'] == 1
+    assert stats['rate_limited'] == 1
+    assert stats['retry_reasons'] == {'429': 1}
+
+
+def test_non_retryable_errors_are_raised_at_once():
+    messages = FakeMessages([api_error(400)])
+    gateway = gateway_with(messages, base_delay=0.01)
+    with pytest.raises(anthropic.APIStatusError):
+        gateway.create(**request())
+    assert len(messages.calls) == 1
+    assert gateway.stats()['errors'] == 1
+
+
+def test_retries_stop_after_max_retries():
+    messages = FakeMessages([api_error(529)] * 5)
+    gateway = gateway_with(messages, max_retries=2, base_delay=0.001)
+    with pytest.raises(anthropic.APIStatusError):
+        gateway.create(**request())
+    assert len(messages.calls) == 3
+
+
+def test_interactive_calls_are_sent_before_queued_batch_calls():
+    gate = threading.Event()
+    messages = FakeMessages(gate=gate)
+    gateway = gateway_with(messages, max_concurrency=1)
+
+    def call(priority, text):
+        gateway.create(priority=priority, **request(text))
+
+    threads = [threading.Thread(target=call, args=(BATCH, 'first'))]
+    threads[0].start()
+    while not messages.calls:
+        time.sleep(0.005)
+    for priority, text in ((BATCH, 'batch'), (INTERACTIVE, 'interactive')):
+        threads.append(threading.Thread(target=call, args=(priority, text)))
+        threads[-1].start()
+        while gateway.stats()['queue_depth'] < len(threads) - 1:
+            time.sleep(0.005)
+    gate.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    sent = [call['messages'][0]['content'] for call in messages.calls]
+    assert sent == ['first', 'interactive', 'batch']
+
+
+def test_queued_call_fails_at_its_deadline():
+    gate = threading.Event()
+    messages = FakeMessages(gate=gate)
+    gateway = gateway_with(messages, max_concurrency=1)
+    blocker = threading.Thread(target=lambda: gateway.create(**request()))
+    blocker.start()
+    while not messages.calls:
+        time.sleep(0.005)
+    try:
+        with pytest.raises(LLMDeadlineExceeded):
+            gateway.create(deadline=0.05, **request())
+        assert gateway.stats()['deadline_exceeded'] == 1
+    finally:
+        gate.set()
+        blocker.join(timeout=5)
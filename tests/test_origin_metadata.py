@@ -0,0 +1,103 @@
+"""Origin metadata: bounded cache, wait timeout and sitemap probe limits."""
+
+import threading
+import time
+
+import origin_metadata
+from origin_metadata import MAX_SITEMAP_CANDIDATES, OriginMetadataCache
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b''):
+        self.status_code = status_code
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+class FakeClient:
+    """Answers GETs from a table of url -> (status, body); everything else is a 404."""
+
+    def __init__(self, pages, delay=0.0):
+        self.pages = pages
+        self.delay = delay
+        self.requested = []
+        self.lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        with self.lock:
+            self.requested.append(url)
+        time.sleep(self.delay)
+        return FakeResponse(*self.pages.get(url, (404, b'')))
+
+
+def use_client(monkeypatch, client):
+    monkeypatch.setattr(origin_metadata, 'get_http_client', lambda: client)
+    return client
+
+
+def test_sitemap_found_and_cached(monkeypatch):
+    client = use_client(monkeypatch, FakeClient({
+        'https://a.example/robots.txt': (200, b'Sitemap: /maps/main.xml\n'),
+        'https://a.example/maps/main.xml': (200, b'<urlset><loc>1</loc><loc>2</loc></urlset>'),
+    }))
+    cache = OriginMetadataCache()
+    metadata = cache.get('https://a.example/page')
+    assert metadata.has_robots and metadata.has_sitemap
+    assert metadata.sitemap_url == 'https://a.example/maps/main.xml'
+    assert metadata.sitemap_url_count == 2
+    cache.get('https://a.example/other')
+    assert len(client.requested) == 2
+
+
+def test_sitemap_candidates_are_capped(monkeypatch):
+    directives = ''.join(f'Sitemap: /sitemap-{i}.xml\n' for i in range(20))
+    client = use_client(monkeypatch, FakeClient({
+        'https://a.example/robots.txt': (200, directives.encode()),
+    }))
+    metadata = OriginMetadataCache().get('https://a.example/')
+    assert not metadata.has_sitemap
+    sitemaps = client.requested[1:]
+    assert len(sitemaps) == MAX_SITEMAP_CANDIDATES
+    assert sitemaps[-1] == 'https://a.example/sitemap.xml'
+
+
+def test_probes_stop_at_the_fetch_budget(monkeypatch):
+    directives = ''.join(f'Sitemap: /sitemap-{i}.xml\n' for i in range(5))
+    client = use_client(monkeypatch, FakeClient({
+        'https://a.example/robots.txt': (200, directives.encode()),
+    }, delay=0.1))
+    metadata = OriginMetadataCache(fetch_budget_seconds=0.15).get('https://a.example/')
+    assert not metadata.complete
+    assert len(client.requested) == 2
+
+
+def test_get_times_out_but_probe_is_cached(monkeypatch):
+    use_client(monkeypatch, FakeClient({
+        'https://a.example/robots.txt': (200, b''),
+    }, delay=0.2))
+    cache = OriginMetadataCache(wait_timeout=0.05)
+    assert cache.get('https://a.example/') is None
+    time.sleep(0.5)
+    assert cache.get('https://a.example/').has_robots
+
+
+def test_cache_evicts_least_recently_used_origins(monkeypatch):
+    client = use_client(monkeypatch, FakeClient({}))
+    cache = OriginMetadataCache(max_entries=2)
+    cache.get('https://a.example/')
+    cache.get('https://b.example/')
+    cache.get('https://a.example/')  # a is now the most recently used
+    cache.get('https://c.example/')
+    assert list(cache._entries) == ['https://a.example', 'https://c.example']
+    before = len(client.requested)
+    cache.get('https://b.example/')
+    assert len(client.requested) > before
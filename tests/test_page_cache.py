@@ -0,0 +1,115 @@
+"""Page cache: storability, validators, expiry, eviction and 304 revalidation."""
+
+import itertools
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import page_cache
+import page_snapshot
+from page_cache import PageCache
+
+PAGE = b'<html><head><title>Cached</title></head><body><h1>Hello</h1></body></html>'
+
+
+def store(cache, url='https://example.com/', etag='"v1"'):
+    cache.set(url, url, 200, {'Content-Type': 'text/html', 'ETag': etag}, PAGE, 'utf-8')
+
+
+def test_only_complete_validated_responses_are_storable():
+    assert PageCache.is_storable(200, {'ETag': '"v1"'}, truncated=False)
+    assert PageCache.is_storable(200, {'last-modified': 'Tue, 01 Sep 2026 00:00:00 GMT'}, truncated=False)
+    assert not PageCache.is_storable(200, {}, truncated=False)
+    assert not PageCache.is_storable(200, {'ETag': '"v1"'}, truncated=True)
+    assert not PageCache.is_storable(404, {'ETag': '"v1"'}, truncated=False)
+    assert not PageCache.is_storable(200, {'ETag': '"v1"', 'Cache-Control': 'private, no-store'}, truncated=False)
+
+
+def test_stored_page_carries_its_validators(tmp_path):
+    cache = PageCache(str(tmp_path / 'pages.db'))
+    cache.set('https://example.com/', 'https://example.com/home', 200,
+              {'etag': '"v1"', 'Last-Modified': 'Tue, 01 Sep 2026 00:00:00 GMT'}, PAGE, 'utf-8')
+    cached = cache.get('https://example.com/')
+    assert cached.content == PAGE
+    assert cached.final_url == 'https://example.com/home'
+    assert cached.conditional_headers() == {
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Tue, 01 Sep 2026 00:00:00 GMT',
+    }
+
+
+def test_expiry_and_revalidation(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(page_cache.time, 'time', lambda: now[0])
+    cache = PageCache(str(tmp_path / 'pages.db'), ttl_seconds=10)
+    store(cache)
+
+    now[0] = 1008.0
+    cache.mark_revalidated('https://example.com/')  # A 304 restarts the TTL
+    now[0] = 1015.0
+    assert cache.get('https://example.com/') is not None
+    now[0] = 1030.0
+    assert cache.get('https://example.com/') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path, monkeypatch):
+    ticks = itertools.count(1000.0)
+    monkeypatch.setattr(page_cache.time, 'time', lambda: next(ticks))
+    cache = PageCache(str(tmp_path / 'pages.db'), max_entries=2)
+    store(cache, 'https://a.example/')
+    store(cache, 'https://b.example/')
+    cache.mark_revalidated('https://a.example/')
+    store(cache, 'https://c.example/')
+    assert cache.get('https://b.example/') is None
+    assert cache.get('https://a.example/') is not None
+    assert cache.stats()['evictions'] == 1
+
+
+class ValidatingHandler(BaseHTTPRequestHandler):
+    """Serves PAGE with an ETag and answers 304 when it is sent back."""
+
+    requests = []
+
+    def do_GET(self):
+        type(self).requests.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    ValidatingHandler.requests = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), ValidatingHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}/'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_repeat_fetch_is_revalidated_with_a_conditional_request(server, tmp_path, monkeypatch):
+    cache = PageCache(str(tmp_path / 'pages.db'))
+    monkeypatch.setattr(page_snapshot, 'get_default_page_cache', lambda: cache)
+
+    first = page_snapshot.get_snapshot(server, use_cache=False)
+    second = page_snapshot.get_snapshot(server, use_cache=False)
+
+    assert ValidatingHandler.requests == [None, '"v1"']
+    assert first.cache_status == page_snapshot.FETCHED
+    assert second.cache_status == page_snapshot.REVALIDATED
+    assert second.html == first.html
+    assert second.title == 'Cached'
+    assert cache.stats()['revalidated'] == 1
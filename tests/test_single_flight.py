@@ -0,0 +1,112 @@
+"""Single flight: in-process coalescing and result sharing across processes."""
+
+import asyncio
+
+import pytest
+
+from single_flight import SingleFlight, flight_key, normalize_url
+
+
+def counting(result, delay=0.2, error=None):
+    """Pipeline factory that counts its runs."""
+    runs = []
+
+    async def pipeline():
+        runs.append(1)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    return pipeline, runs
+
+
+def processes(tmp_path):
+    """Two coalescers sharing one claims file, as two worker processes would."""
+    path = str(tmp_path / 'flights.db')
+    first = SingleFlight(path, poll_interval=0.02)
+    second = SingleFlight(path, poll_interval=0.02)
+    first.owner, second.owner = 'host:1', 'host:2'
+    return first, second
+
+
+def test_flight_key_normalizes_urls():
+    assert normalize_url('Example.COM:443') == 'https://example.com/'
+    assert flight_key('audits', 'example.com', deep=True) == flight_key('audits', 'https://example.com/#top', deep=True)
+    assert flight_key('audits', 'example.com', deep=True) != flight_key('audits', 'example.com', deep=False)
+
+
+def test_concurrent_requests_share_one_run():
+    flights = SingleFlight(None)
+    pipeline, runs = counting({'score': 7})
+
+    async def main():
+        return await asyncio.gather(*(flights.run('k', pipeline) for _ in range(5)))
+
+    assert asyncio.run(main()) == [{'score': 7}] * 5
+    assert len(runs) == 1
+    assert flights.stats()['coalesced'] == 4
+
+
+def test_error_is_shared_and_the_next_request_runs_again():
+    flights = SingleFlight(None)
+    pipeline, runs = counting(None, error=RuntimeError('fetch failed'))
+
+    async def main():
+        return await asyncio.gather(*(flights.run('k', pipeline) for _ in range(3)), return_exceptions=True)
+
+    assert [str(result) for result in asyncio.run(main())] == ['fetch failed'] * 3
+    with pytest.raises(RuntimeError):
+        asyncio.run(flights.run('k', pipeline))
+    assert len(runs) == 2
+
+
+def test_waiting_process_takes_the_published_result(tmp_path):
+    first, second = processes(tmp_path)
+    lead, lead_runs = counting({'score': 7})
+    follow, follow_runs = counting({'score': 1})
+
+    async def main():
+        leader = asyncio.ensure_future(first.run('k', lead))
+        await asyncio.sleep(0.05)
+        return await asyncio.gather(leader, second.run('k', follow))
+
+    assert asyncio.run(main()) == [{'score': 7}, {'score': 7}]
+    assert (len(lead_runs), len(follow_runs)) == (1, 0)
+    assert second.stats()['cross_process_results'] == 1
+
+
+def test_later_request_does_not_take_an_earlier_result(tmp_path):
+    first, second = processes(tmp_path)
+    lead, _ = counting({'score': 7}, delay=0)
+    later, later_runs = counting({'score': 1}, delay=0)
+
+    asyncio.run(first.run('k', lead))
+    assert asyncio.run(second.run('k', later)) == {'score': 1}
+    assert len(later_runs) == 1
+
+
+def test_waiting_process_runs_its_own_pipeline_when_the_leader_fails(tmp_path):
+    first, second = processes(tmp_path)
+    lead, _ = counting(None, error=RuntimeError('overloaded'))
+    follow, follow_runs = counting({'score': 1})
+
+    async def main():
+        leader = asyncio.ensure_future(first.run('k', lead))
+        await asyncio.sleep(0.05)
+        return await asyncio.gather(leader, second.run('k', follow), return_exceptions=True)
+
+    failed, result = asyncio.run(main())
+    assert isinstance(failed, RuntimeError)
+    assert result == {'score': 1}
+    assert len(follow_runs) == 1
+
+
+def test_abandoned_claim_expires(tmp_path):
+    first, second = processes(tmp_path)
+    second.claim_timeout = 0.1
+    assert first._claim('k', 0) == (True, None)  # the owning process then crashed
+
+    follow, follow_runs = counting({'score': 1}, delay=0)
+    assert asyncio.run(second.run('k', follow)) == {'score': 1}
+    assert len(follow_runs) == 1